@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the JSON codecs used for Anki Connect traffic.
+
+Encodes an `addNotes` request and decodes a `notesInfo` response built from a
+synthetic collection with every installed codec, and reports throughput.
+
+    uv run --extra fast python benchmarks/bench_codec.py --notes 20000
+"""
+
+import argparse
+import gc
+import time
+
+from anki_mcp.testing.collection import FakeCollection, note_info
+from anki_mcp.tools import codec
+
+
+def _best_of(repeat: int, fn, *args) -> float:
+    # Like timeit, keep garbage collection from skewing allocation-heavy decoding
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(*args)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=20000, help="Notes per payload (default 20000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, the best is reported (default 5)")
+    args = parser.parse_args(argv)
+
+    collection = FakeCollection.generate(args.notes)
+    add_notes = {
+        "action": "addNotes",
+        "version": 6,
+        "params": {"notes": [
+            {"deckName": "Default", "modelName": note.model_name, "fields": note.fields, "tags": note.tags}
+            for note in collection.notes.values()
+        ]},
+    }
+    notes_info = codec.CODECS["json"].dumps(
+        {"result": [note_info(note) for note in collection.notes.values()], "error": None}
+    )
+
+    print(f"addNotes request with {args.notes} notes, notesInfo response of {len(notes_info) / 1e6:.1f} MB")
+    print(f"{'codec':<10} {'encode addNotes':>18} {'decode notesInfo':>18}")
+    timings = {}
+    for name in codec.PREFERENCE:
+        if name not in codec.CODECS:
+            print(f"{name:<10} {'not installed':>18}")
+            continue
+        json_codec = codec.CODECS[name]
+        encoded_size = len(json_codec.dumps(add_notes))
+        encode = _best_of(args.repeat, json_codec.dumps, add_notes)
+        decode = _best_of(args.repeat, json_codec.loads, notes_info)
+        timings[name] = (encode, decode)
+        print(f"{name:<10} {encoded_size / encode / 1e6:13.0f} MB/s {len(notes_info) / decode / 1e6:13.0f} MB/s")
+
+    stdlib_encode, stdlib_decode = timings["json"]
+    for name, (encode, decode) in timings.items():
+        if name != "json":
+            print(f"{name} vs json: encode {stdlib_encode / encode:.1f}x, decode {stdlib_decode / decode:.1f}x faster")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of every tool against the fake AnkiConnect server.
+
+For each collection size a fake AnkiConnect server is started in a separate
+process, and every tool is called through the MCP app a number of times. Per
+tool, the benchmark reports latency percentiles, AnkiConnect requests by
+action, bytes sent and received, and the peak RSS of this process (the MCP
+side only; the fake server's memory is not included). Calls that fail are
+counted per tool and left out of the latencies, and the benchmark exits with
+an error if any call failed.
+
+    uv run python benchmarks/bench_tools.py --sizes 1000,50000,500000 --output bench_results.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import platform
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import mcp.types as types
+
+from anki_mcp.server import app
+from anki_mcp.tools import utils
+from anki_mcp.tools.backends import DEFAULT_BACKEND, configure_backends
+from anki_mcp.tools.metrics import metrics
+
+DEFAULT_SIZES = "1000,50000,500000"
+
+# Lines of text results that report a failed call rather than a result
+FAILURE = re.compile(
+    r"^(Failed|Invalid|Unknown|Unsupported|Provide either)|not found|must be at least|^No \w+( \w+)? provided"
+)
+
+
+def _tool_calls(iteration: int, card_ids: list[int]) -> dict[str, dict]:
+    """Arguments for each tool. Writes use fresh data on every iteration."""
+    return {
+        "get-collection-overview": {},
+        "find-notes": {"query": "deck:Languages", "limit": 20},
+        "find-cards": {"query": "prop:lapses>3", "limit": 100},
+        "add-or-update-notes": {"notes": [
+            {
+                "name": f"bench-{iteration}-{i}",
+                "id": None,
+                "deck": "Benchmark",
+                "model": "Basic",
+                "fields": {"Front": f"benchmark {iteration} {i} {time.time_ns()}", "Back": "answer"},
+                "tags": ["benchmark"],
+            }
+            for i in range(50)
+        ]},
+        "suspend-cards": {"card_ids": card_ids},
+        "unsuspend-cards": {"card_ids": card_ids},
+        "get-review-stats": {"time_range": "all"},
+        "analyze-cards": {"query": "deck:Science", "per_deck": 5},
+    }
+
+
+def _reset_peak_rss() -> None:
+    # Linux allows resetting the peak RSS (VmHWM) of the process
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _start_fake_anki(notes: int, latency: float) -> tuple[subprocess.Popen, str]:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "anki_mcp.testing", "--notes", str(notes), "--port", "0",
+         "--latency", str(latency)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    line = process.stdout.readline()
+    if " at " not in line:
+        process.kill()
+        raise RuntimeError(f"Fake AnkiConnect failed to start: {line!r}")
+    return process, line.rsplit(" at ", 1)[1].strip()
+
+
+def _failure(result) -> str | None:
+    """Return the failure message of a tool result, or None if the call succeeded."""
+    if isinstance(result, types.CallToolResult):
+        if result.isError:
+            return _text(result.content) or "tool error"
+        result = result.content
+    elif isinstance(result, tuple):
+        # Unstructured and structured content
+        result = result[0]
+    if isinstance(result, dict):
+        return None
+    for line in _text(result).splitlines():
+        if FAILURE.search(line):
+            return line
+    return None
+
+
+def _text(content) -> str:
+    return "\n".join(block.text for block in content if isinstance(block, types.TextContent))
+
+
+async def _bench_tool(name: str, arguments_for, iterations: int) -> dict:
+    latencies = []
+    failures = []
+    metrics.reset()
+    _reset_peak_rss()
+    for iteration in range(iterations):
+        start = time.perf_counter()
+        try:
+            failure = _failure(await app.call_tool(name, arguments_for(iteration)))
+        except Exception as e:
+            # Invalid arguments and tool errors
+            failure = str(e) or type(e).__name__
+        elapsed = (time.perf_counter() - start) * 1000
+        if failure is None:
+            latencies.append(elapsed)
+        else:
+            failures.append(failure)
+
+    snapshot = metrics.snapshot()["actions"]
+    return {
+        "tool": name,
+        "iterations": iterations,
+        "failures": len(failures),
+        "first_failure": failures[0] if failures else None,
+        # Failed calls are left out, as they often return early
+        "latency_ms": {
+            "mean": statistics.fmean(latencies),
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+            "max": max(latencies),
+        } if latencies else None,
+        "anki_connect_calls": {action: data["count"] for action, data in snapshot.items()},
+        "anki_connect_calls_per_iteration": sum(data["count"] for data in snapshot.values()) / iterations,
+        "bytes_sent": sum(data["bytes_sent"] for data in snapshot.values()),
+        "bytes_received": sum(data["bytes_received"] for data in snapshot.values()),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+async def _bench_size(size: int, iterations: int, tools: list[str]) -> list[dict]:
+    card_ids_result = await utils.make_anki_request("findCards", query="deck:History")
+    card_ids = (card_ids_result.get("result") or [])[:100]
+
+    results = []
+    for name in tools:
+        result = await _bench_tool(name, lambda i: _tool_calls(i, card_ids)[name], iterations)
+        result["collection_notes"] = size
+        results.append(result)
+        latency = result["latency_ms"] or {"p50": math.nan, "p95": math.nan}
+        print(
+            f"{size:>8} notes  {name:<24} p50 {latency['p50']:9.1f} ms  p95 {latency['p95']:9.1f} ms  "
+            f"{result['anki_connect_calls_per_iteration']:6.1f} calls  "
+            f"{result['bytes_received'] / iterations / 1024:10.1f} KB/call  "
+            f"peak RSS {result['peak_rss_mb']:7.1f} MB",
+            flush=True,
+        )
+        if result["failures"]:
+            print(f"{'':>8}        {name:<24} {result['failures']} of {iterations} calls failed: "
+                  f"{result['first_failure']}", flush=True)
+    return results
+
+
+def main(argv=None):
+    tool_names = list(_tool_calls(0, []))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma-separated collection sizes in notes (default {DEFAULT_SIZES})")
+    parser.add_argument("--iterations", type=int, default=5, help="Calls per tool and size (default 5)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency the fake AnkiConnect adds to every request, in seconds")
+    parser.add_argument("--tools", default=",".join(tool_names), help="Comma-separated tools to benchmark (default: all)")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    # Don't log every request to Anki Connect
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    tools = args.tools.split(",")
+    unknown = set(tools) - set(tool_names)
+    if unknown:
+        parser.error(f"unknown tools: {', '.join(sorted(unknown))}")
+
+    results = []
+    for size in sizes:
+        process, url = _start_fake_anki(size, args.latency)
+        try:
+            configure_backends({DEFAULT_BACKEND: url})
+            results.extend(asyncio.run(_bench_size(size, args.iterations, tools)))
+        finally:
+            process.terminate()
+            process.wait()
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "latency_seconds": args.latency,
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote {len(results)} results to {args.output}")
+
+    failed = sorted({result["tool"] for result in results if result["failures"]})
+    if failed:
+        sys.exit(f"Calls failed for: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
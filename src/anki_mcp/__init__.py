@@ -5,11 +5,122 @@ This allows the package to be run directly with `python -m anki_mcp`
 or as an installed executable.
 """
 
-from .server import app
+import argparse
 
-def main():
+from .profiling import profiler
+from .server import app, enable_metrics_endpoint, register_tools
+from .tools.backends import configure_backends, parse_backends
+from .tools.config import Settings, configure, env_name, load_settings
+from .tools.output import OUTPUT_FORMATS, set_output_format
+
+TRANSPORTS = ("stdio", "streamable-http", "sse")
+
+# Settings with a flag of their own, outside the generated "settings" group;
+# backends are given with --backend
+OWN_FLAGS = ("backends", "output_format", "profile_dir", "slow_call_ms")
+SETTING_FLAGS = [name for name in Settings.model_fields if name not in OWN_FLAGS]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(prog="anki-mcp", description="Run the Anki MCP server.")
+    parser.add_argument(
+        "--transport",
+        choices=TRANSPORTS,
+        default="stdio",
+        help="Transport to serve the MCP app over (default: stdio). "
+             "The HTTP transports let several clients share one server process.",
+    )
+    parser.add_argument("--host", default=app.settings.host, help="Host to bind for HTTP transports")
+    parser.add_argument("--port", type=int, default=app.settings.port, help="Port to bind for HTTP transports")
+    parser.add_argument(
+        "--metrics-endpoint",
+        action="store_true",
+        help="Serve Prometheus metrics at /metrics (HTTP transports only)",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=None,
+        help="Write a cProfile dump of every tool call and the slow-call log to this directory "
+             "(default: $ANKI_MCP_PROFILE_DIR)",
+    )
+    parser.add_argument(
+        "--slow-call-ms",
+        type=float,
+        default=None,
+        help="Log tool calls taking at least this many milliseconds, with their arguments "
+             "and a timing breakdown (default: $ANKI_MCP_SLOW_CALL_MS)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default=None,
+        help="Return human-readable text, or structured JSON content with an output schema for "
+             "every tool (default: $ANKI_MCP_OUTPUT_FORMAT, or text)",
+    )
+    parser.add_argument(
+        "--backend",
+        action="append",
+        metavar="NAME=URL",
+        default=None,
+        help="Anki Connect backend that tools select with their profile argument. Repeat for "
+             "several backends; the one named 'default', or else the first, is the default "
+             "(default: $ANKI_CONNECT_BACKENDS, or default=http://localhost:8765)",
+    )
+    parser.add_argument(
+        "--config",
+        default=None,
+        metavar="FILE",
+        help="JSON file with an object of settings, overridden by environment variables and "
+             "flags (default: $ANKI_MCP_CONFIG)",
+    )
+    tuning = parser.add_argument_group("settings")
+    for name in SETTING_FLAGS:
+        field = Settings.model_fields[name]
+        default = f"${env_name(name)}" if field.default is None else f"${env_name(name)}, or {field.default}"
+        tuning.add_argument(
+            "--" + name.replace("_", "-"),
+            dest=name,
+            default=None,
+            metavar="VALUE",
+            help=f"{field.description} (default: {default})",
+        )
+    args = parser.parse_args(argv)
+    overrides = {
+        name: getattr(args, name) for name in Settings.model_fields
+        if name != "backends" and getattr(args, name) is not None
+    }
+    try:
+        args.backend = parse_backends(args.backend) if args.backend else None
+        args.settings = load_settings(args.config, overrides)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.settings.profile_dir is not None:
+        try:
+            args.settings.profile_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            parser.error(f"Could not create the profile directory: {e}")
+    return args
+
+
+def main(argv=None):
     """Run the Anki MCP server."""
-    app.run(transport='stdio')
+    args = parse_args(argv)
+    settings = args.settings
+    configure(settings)
+    if settings.profile_dir is not None or settings.slow_call_ms is not None:
+        profiler.configure(settings.profile_dir, settings.slow_call_ms)
+    if args.backend is not None:
+        configure_backends(args.backend)
+    if settings.output_format != "text":
+        set_output_format(settings.output_format)
+        register_tools()
+    if args.transport != "stdio":
+        app.settings.host = args.host
+        app.settings.port = args.port
+        if args.metrics_endpoint:
+            enable_metrics_endpoint()
+    app.run(transport=args.transport)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
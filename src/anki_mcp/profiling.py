@@ -0,0 +1,132 @@
+"""
+Opt-in profiling of tool invocations.
+
+Enabled with the `--profile-dir`/`--slow-call-ms` command line options or the
+`ANKI_MCP_PROFILE_DIR`/`ANKI_MCP_SLOW_CALL_MS` environment variables.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict
+
+from pydantic import BaseModel
+
+from anki_mcp.tools.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SLOW_CALL_LOG = "slow_calls.jsonl"
+MAX_ARGUMENT_LENGTH = 200
+
+
+class ToolProfiler:
+    """Profile tool calls with cProfile and log calls slower than a threshold.
+
+    Each profiled call is written to `<directory>/<timestamp>-<tool>.prof`, which
+    can be inspected with `python -m pstats` or snakeviz. Slow calls are appended
+    to `<directory>/slow_calls.jsonl` together with their arguments and a
+    breakdown of the time spent in Anki Connect requests and processing stages.
+    Without a directory, slow calls are logged instead.
+    """
+
+    def __init__(self):
+        self.directory: Path | None = None
+        self.slow_call_ms: float | None = None
+        self._active = False
+        self._sequence = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None or self.slow_call_ms is not None
+
+    def configure(self, directory: str | os.PathLike | None = None, slow_call_ms: float | None = None) -> None:
+        self.directory = Path(directory) if directory else None
+        self.slow_call_ms = slow_call_ms
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    async def run(self, tool: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Run a tool call, profiling it and logging it if it is slow."""
+        # cProfile can only trace one call at a time, so concurrent calls are
+        # timed but not profiled. The profiler stays enabled across awaits, so a
+        # dump also includes whatever other tasks ran on the event loop in the
+        # meantime, including calls of other clients.
+        profile = None
+        if self.directory is not None and not self._active:
+            profile = cProfile.Profile()
+            self._active = True
+
+        start = time.perf_counter()
+        with metrics.breakdown() as timings:
+            try:
+                if profile is not None:
+                    profile.enable()
+                return await fn(*args, **kwargs)
+            finally:
+                if profile is not None:
+                    profile.disable()
+                    self._active = False
+                elapsed = time.perf_counter() - start
+                # Failing to record the call mustn't replace its result or exception
+                profile_path = None
+                if profile is not None:
+                    try:
+                        profile_path = self._dump_profile(tool, profile)
+                    except Exception:
+                        logger.exception("Could not write the profile of a %s call", tool)
+                if self.slow_call_ms is not None and elapsed * 1000 >= self.slow_call_ms:
+                    try:
+                        self._log_slow_call(tool, elapsed, timings, kwargs, profile_path)
+                    except Exception:
+                        logger.exception("Could not log a slow %s call", tool)
+
+    def _dump_profile(self, tool: str, profile: cProfile.Profile) -> Path:
+        self._sequence += 1
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        path = self.directory / f"{timestamp}-{self._sequence:05d}-{tool}.prof"
+        profile.dump_stats(path)
+        return path
+
+    def _log_slow_call(self, tool: str, elapsed: float, timings: Dict[str, float],
+                       arguments: Dict[str, Any], profile_path: Path | None) -> None:
+        breakdown = {key: round(seconds * 1000, 3) for key, seconds in sorted(timings.items())}
+        # Time not spent in requests or recorded stages. Concurrent requests overlap,
+        # so the recorded timings can add up to more than the call took.
+        breakdown["other"] = round(max(0.0, elapsed * 1000 - sum(breakdown.values())), 3)
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "tool": tool,
+            "duration_ms": round(elapsed * 1000, 3),
+            "threshold_ms": self.slow_call_ms,
+            "arguments": {name: _summarize_argument(value) for name, value in arguments.items()},
+            "breakdown_ms": breakdown,
+            "profile": str(profile_path) if profile_path else None,
+        }
+        line = json.dumps(entry, default=str)
+        if self.directory is None:
+            logger.warning("Slow tool call: %s", line)
+            return
+        with open(self.directory / SLOW_CALL_LOG, "a", encoding="utf-8") as log:
+            log.write(line + "\n")
+
+
+def _summarize_argument(value: Any) -> Any:
+    """Make an argument JSON-serializable and truncate long values."""
+    if isinstance(value, BaseModel):
+        value = value.model_dump()
+    elif isinstance(value, list):
+        if len(value) > 10:
+            return f"<list of {len(value)} items>"
+        return [_summarize_argument(item) for item in value]
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    if len(text) > MAX_ARGUMENT_LENGTH:
+        return text[:MAX_ARGUMENT_LENGTH] + "..."
+    return value
+
+
+profiler = ToolProfiler()
@@ -1,25 +1,256 @@
+import asyncio
+import functools
+import inspect
+import time
+from typing import Annotated, Dict, Optional
+
 import mcp.server.stdio
+import mcp.types as types
 from mcp.server.fastmcp import FastMCP
+from pydantic import Field, create_model
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
-from anki_mcp.tools.get_collection_overview import get_collection_overview
-from anki_mcp.tools.add_or_update_notes import add_or_update_notes
-from anki_mcp.tools.get_review_stats import get_review_stats
-from anki_mcp.tools.find_notes import find_notes
-from anki_mcp.tools.find_cards import find_cards
-from anki_mcp.tools.suspend_cards import suspend_cards, unsuspend_cards
+from anki_mcp.profiling import profiler
+from anki_mcp.tools.get_collection_overview import CollectionOverviewOutput, get_collection_overview
+from anki_mcp.tools.add_or_update_notes import AddOrUpdateNotesOutput, add_or_update_notes
+from anki_mcp.tools.get_deck_tree import DeckTreeOutput, get_deck_tree
+from anki_mcp.tools.get_tag_stats import TagStatsOutput, get_tag_stats
+from anki_mcp.tools.get_review_stats import ReviewStatsOutput, get_review_stats
+from anki_mcp.tools.find_notes import FindNotesOutput, find_notes
+from anki_mcp.tools.find_cards import FindCardsOutput, find_cards
+from anki_mcp.tools.change_deck import ChangeDeckOutput, change_deck
+from anki_mcp.tools.find_and_replace_fields import FindAndReplaceOutput, find_and_replace_fields
+from anki_mcp.tools.store_media import StoreMediaOutput, store_media
+from anki_mcp.tools.suspend_cards import SuspendCardsOutput, suspend_cards, unsuspend_cards
+from anki_mcp.tools.analyze_cards import AnalyzeCardsOutput, analyze_cards
+from anki_mcp.tools.import_notes import ImportNotesOutput, import_notes
+from anki_mcp.tools.tag_notes import RenameTagOutput, TagNotesOutput, add_tags, remove_tags, rename_tag
+from anki_mcp.tools.get_job_status import CancelJobOutput, JobStatusOutput, cancel_job, get_job_status
+from anki_mcp.tools.get_server_metrics import ServerMetricsOutput, get_server_metrics, server_gauges
+from anki_mcp.tools.backends import UnknownBackendError, current_backend, select_backends
+from anki_mcp.tools.jobs import jobs
+from anki_mcp.tools.metrics import metrics
+from anki_mcp.tools.output import failure, json_output, structured
+from anki_mcp.tools.progress import progress_reporter
+from anki_mcp.tools.scheduler import current_client
 
 app = FastMCP("anki")
 
-# Register tools with the app
-app.tool(name="get-collection-overview", description="Get comprehensive information about the Anki collection including decks, models, and fields")(get_collection_overview)
-app.tool(name="get-review-stats", description="Get review statistics from Anki showing cards reviewed per day, with optional time range filtering")(get_review_stats)
-app.tool(name='find-notes', description='Find notes matching a query in Anki')(find_notes)
-app.tool(name='find-cards', description='Find card IDs matching a query in Anki')(find_cards)
-app.tool(name='add-or-update-notes', description="Add new notes or update existing ones in Anki")(add_or_update_notes)
-app.tool(name='suspend-cards', description="Suspend cards by their card IDs")(suspend_cards)
-app.tool(name='unsuspend-cards', description="Unsuspend cards by their card IDs")(unsuspend_cards)
+BACKGROUND_PARAMETER = Annotated[bool, Field(
+    description="Run as a background job and return its ID at once. Follow it with get-job-status.",
+)]
+
+PROFILE_PARAMETER = Annotated[Optional[str], Field(
+    description="Name of the Anki profile (backend) to use instead of the default one. "
+                "Read-only tools also take several names separated by commas, or '*' for all "
+                "profiles, and return the result of each.",
+)]
+
+# Tools about this server process rather than an Anki backend
+UNROUTED_TOOLS = frozenset({"get-job-status", "cancel-job", "get-server-metrics"})
+
+
+def _client_id() -> str:
+    """Identify the MCP session of the current request."""
+    try:
+        session = app.get_context().session
+    except ValueError:
+        # Called outside of a request
+        return "default"
+    return f"session-{id(session)}"
+
+
+def _progress_reporter():
+    """Forward progress reported by a tool to the client, which ignores it unless it asked for progress."""
+    context = app.get_context()
+    if context._request_context is None:
+        # Called outside of a request
+        return None
+    return context.report_progress
+
+
+def _tool(name: str, fn, background: bool = False, output=None):
+    """Wrap a tool to record its latency, profile it if enabled and attribute
+    its Anki Connect requests to the calling client.
+
+    With `background`, the tool gets a `background` parameter to run it as a job.
+    With json output, `output` is the model of the tool's structured content.
+    Tools for an Anki backend get a `profile` parameter selecting it, and
+    read-only tools, those that can't run in the background, can run on
+    several backends at once.
+    """
+    routed = name not in UNROUTED_TOOLS
+    fan_out = routed and not background
+
+    async def run(target, *args, **kwargs):
+        start = time.perf_counter()
+        error = False
+        try:
+            if profiler.enabled:
+                return await profiler.run(name, target, *args, **kwargs)
+            return await target(*args, **kwargs)
+        except Exception:
+            error = True
+            raise
+        finally:
+            metrics.record_tool(name, time.perf_counter() - start, error)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        try:
+            profiles = select_backends(kwargs.pop("profile", None)) if routed else [None]
+        except UnknownBackendError as e:
+            return failure(str(e))
+        if len(profiles) > 1 and not fan_out:
+            return failure(f"{name} can only run on one profile at a time.")
+        target = functools.partial(_fan_out, fn, profiles) if len(profiles) > 1 else fn
+
+        token = current_client.set(_client_id())
+        backend_token = current_backend.set(profiles[0])
+        try:
+            if background and kwargs.pop("background", False):
+                # The job keeps the profile, as it runs in a copy of this context
+                job = jobs.submit(name, run, target, *args, **kwargs)
+                if json_output():
+                    return structured({"job_id": job.id})
+                return [
+                    types.TextContent(
+                        type="text",
+                        text=f"Started job {job.id} ({name}). Use get-job-status to follow its progress.",
+                    )
+                ]
+            with progress_reporter(_progress_reporter()):
+                return await run(target, *args, **kwargs)
+        finally:
+            current_backend.reset(backend_token)
+            current_client.reset(token)
+
+    if background:
+        _add_parameter(wrapper, "background", BACKGROUND_PARAMETER, False)
+    if routed:
+        _add_parameter(wrapper, "profile", PROFILE_PARAMETER, None)
+    if output is not None and fan_out:
+        output = _fan_out_output(output)
+    if output is not None and json_output():
+        # FastMCP takes the output schema from the model annotated on the result
+        wrapper.__signature__ = inspect.signature(wrapper).replace(
+            return_annotation=Annotated[types.CallToolResult, output]
+        )
+    return wrapper
+
+
+async def _fan_out(fn, profiles: list[str], *args, **kwargs):
+    """Run a read-only tool on several profiles concurrently and return the result of each.
+
+    Results are returned side by side rather than merged: one section per
+    profile in text output, and a map from profile to result in json output.
+    """
+    async def on(profile: str):
+        # Each call runs in its own task, with a copy of the context
+        current_backend.set(profile)
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            return e
+
+    results = dict(zip(profiles, await asyncio.gather(*(on(profile) for profile in profiles))))
+    errors = {profile: str(result) for profile, result in results.items() if isinstance(result, Exception)}
+
+    if json_output():
+        return structured({
+            "profiles": {
+                profile: result.structuredContent
+                for profile, result in results.items() if not isinstance(result, Exception)
+            },
+            "profile_errors": errors,
+        })
+
+    sections = []
+    for profile, result in results.items():
+        if profile in errors:
+            sections.append(f"Profile '{profile}': {errors[profile]}")
+        else:
+            sections.append(f"Profile '{profile}':\n" + "\n".join(content.text for content in result))
+    return [types.TextContent(type="text", text="\n\n".join(sections))]
+
+
+def _fan_out_output(output):
+    """The output model of a tool run on one profile, or on several with the result of each in `profiles`."""
+    fields = {
+        name: (Optional[field.annotation], Field(None, description=field.description))
+        for name, field in output.model_fields.items()
+    }
+    return create_model(
+        output.__name__,
+        __doc__=output.__doc__,
+        profiles=(Optional[Dict[str, output]], Field(None, description="Result per profile, when run on several")),
+        profile_errors=(Optional[Dict[str, str]], Field(None, description="Error per profile that failed")),
+        **fields,
+    )
+
+
+def _add_parameter(wrapper, name: str, annotation, default) -> None:
+    """Add a keyword parameter to the signature FastMCP derives the tool's input schema from."""
+    signature = inspect.signature(wrapper)
+    parameter = inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=annotation, default=default)
+    wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), parameter])
+    wrapper.__annotations__ = {**wrapper.__annotations__, name: annotation}
+
+
+def _register(name: str, description: str, fn, background: bool = False, output=None) -> None:
+    app.tool(name=name, description=description)(_tool(name, fn, background, output))
+
+
+def enable_metrics_endpoint(path: str = "/metrics") -> None:
+    """Serve metrics in the Prometheus text format at `path` when running over HTTP."""
+    @app.custom_route(path, methods=["GET"])
+    async def prometheus_metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(
+            metrics.render_prometheus(server_gauges()),
+            media_type="text/plain; version=0.0.4",
+        )
+
+
+TOOLS = [
+    ("get-collection-overview", "Get comprehensive information about the Anki collection including decks, models, and fields", get_collection_overview, False, CollectionOverviewOutput),
+    ("get-deck-tree", "Get the deck hierarchy with new, learning, review and total card counts per deck, optionally for a subtree", get_deck_tree, False, DeckTreeOutput),
+    ("get-tag-stats", "Get the tag hierarchy with the number of notes per tag, most used first, optionally for a subtree", get_tag_stats, False, TagStatsOutput),
+    ("get-review-stats", "Get review statistics from Anki showing cards reviewed per day, with optional time range filtering", get_review_stats, False, ReviewStatsOutput),
+    ('find-notes', 'Find notes matching a query in Anki', find_notes, False, FindNotesOutput),
+    ('find-cards', 'Find card IDs matching a query in Anki', find_cards, False, FindCardsOutput),
+    ('add-or-update-notes', "Add new notes or update existing ones in Anki", add_or_update_notes, True, AddOrUpdateNotesOutput),
+    ('store-media', "Store images and sounds from local paths or base64 data in Anki's media folder, skipping files already there", store_media, True, StoreMediaOutput),
+    ('suspend-cards', "Suspend cards by their card IDs", suspend_cards, True, SuspendCardsOutput),
+    ('unsuspend-cards', "Unsuspend cards by their card IDs", unsuspend_cards, True, SuspendCardsOutput),
+    ('change-deck', "Move the cards with the given IDs or matching a query to a deck, with an optional dry run", change_deck, True, ChangeDeckOutput),
+    ('find-and-replace-fields', "Find and replace text in the fields of the notes with the given IDs or matching a query, with an optional dry run", find_and_replace_fields, True, FindAndReplaceOutput),
+    ('add-tags', "Add tags to the notes with the given IDs or matching a query", add_tags, True, TagNotesOutput),
+    ('remove-tags', "Remove tags from the notes with the given IDs or matching a query", remove_tags, True, TagNotesOutput),
+    ('rename-tag', "Rename a tag and its subtags on all notes or on the notes matching a query", rename_tag, True, RenameTagOutput),
+    ('analyze-cards', "Rank leeches and low-ease outliers per deck, optionally suspending the leeches", analyze_cards, True, AnalyzeCardsOutput),
+    ('import-notes', "Import notes from a local CSV, TSV or JSONL file in chunks, resuming interrupted imports", import_notes, True, ImportNotesOutput),
+    ('get-job-status', "Get the status, progress and result of background jobs", get_job_status, False, JobStatusOutput),
+    ('cancel-job', "Cancel a queued or running background job", cancel_job, False, CancelJobOutput),
+    ('get-server-metrics', "Get latency, payload size and error metrics for Anki Connect actions and tools", get_server_metrics, False, ServerMetricsOutput),
+]
+
+
+def register_tools() -> None:
+    """Register the tools with the app, replacing earlier registrations.
+
+    Output schemas depend on the output format, so the tools are registered
+    again after the format was changed.
+    """
+    for name, description, fn, background, output in TOOLS:
+        if app._tool_manager.get_tool(name) is not None:
+            app.remove_tool(name)
+        _register(name, description, fn, background, output)
+
+
+register_tools()
 
 if __name__ == "__main__":
     # Initialize and run the server
     import mcp
-    mcp.run(transport='stdio')
\ No newline at end of file
+    mcp.run(transport='stdio')
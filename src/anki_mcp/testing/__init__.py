@@ -0,0 +1,8 @@
+"""
+Test helpers: a synthetic Anki collection and an AnkiConnect stand-in serving it.
+"""
+
+from .collection import FakeCollection
+from .server import FakeAnkiConnect
+
+__all__ = ["FakeAnkiConnect", "FakeCollection"]
@@ -0,0 +1,3 @@
+from anki_mcp.testing.server import main
+
+main()
@@ -0,0 +1,352 @@
+import fnmatch
+import random
+import re
+import shlex
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+MODELS = {
+    "Basic": ["Front", "Back"],
+    "Basic (and reversed card)": ["Front", "Back"],
+    "Cloze": ["Text", "Back Extra"],
+}
+
+# Cards generated per note for models with more than one card template
+CARDS_PER_NOTE = {"Basic (and reversed card)": 2}
+
+DECK_NAMES = [
+    "Default",
+    "Languages",
+    "Languages::Spanish",
+    "Languages::Spanish::Verbs",
+    "Languages::French",
+    "Science",
+    "Science::Biology",
+    "Science::Chemistry",
+    "History",
+]
+
+TAGS = [
+    "vocabulary",
+    "grammar",
+    "verbs",
+    "irregular",
+    "exam",
+    "lang::es",
+    "lang::fr",
+    "science::bio",
+    "science::chem",
+    "history::modern",
+]
+
+WORDS = (
+    "alpha beta gamma delta river mountain forest ocean cell atom molecule energy "
+    "history empire treaty revolution verb noun adjective tense mood clause question "
+    "answer memory review interval ease lapse card deck model field tag sound image"
+).split()
+
+# Queue values used by Anki
+QUEUE_SUSPENDED = -1
+QUEUE_NEW = 0
+QUEUE_REVIEW = 2
+
+
+@dataclass(slots=True)
+class FakeNote:
+    note_id: int
+    model_name: str
+    fields: Dict[str, str]
+    tags: List[str]
+    mod: int
+    cards: List[int] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class FakeCard:
+    card_id: int
+    note_id: int
+    deck_name: str
+    ord: int
+    factor: int
+    interval: int
+    reps: int
+    lapses: int
+    queue: int
+    due: int
+    mod: int
+
+
+class FakeCollection:
+    """An in-memory Anki collection with a subset of Anki's search syntax."""
+
+    def __init__(self):
+        self.decks: Dict[str, int] = {}
+        self.models: Dict[str, List[str]] = dict(MODELS)
+        self.notes: Dict[int, FakeNote] = {}
+        self.cards: Dict[int, FakeCard] = {}
+        self.reviews_by_day: Dict[str, int] = {}
+        self.media: Dict[str, bytes] = {}
+        self._next_id = 1_500_000_000_000
+        for deck in DECK_NAMES[:1]:
+            self.add_deck(deck)
+
+    @classmethod
+    def generate(cls, num_notes: int, seed: int = 0, html: bool = True,
+                 review_days: int = 365) -> "FakeCollection":
+        """Generate a reproducible synthetic collection with `num_notes` notes.
+
+        Field values contain some HTML, media references and cloze markup like
+        real collections do, and card statistics include a tail of leeches.
+        """
+        rng = random.Random(seed)
+        collection = cls()
+        for deck in DECK_NAMES:
+            collection.add_deck(deck)
+
+        model_names = list(MODELS)
+        for _ in range(num_notes):
+            model = rng.choices(model_names, weights=(6, 2, 2))[0]
+            fields = {name: _random_text(rng, html) for name in MODELS[model]}
+            if model == "Cloze":
+                word = rng.choice(WORDS)
+                fields["Text"] = f"{fields['Text']} {{{{c1::{word}}}}}"
+            tags = rng.sample(TAGS, rng.randint(0, 3))
+            note = collection.add_note(model, rng.choice(DECK_NAMES), fields, tags)
+
+            for card_id in note.cards:
+                card = collection.cards[card_id]
+                if rng.random() < 0.2:
+                    continue  # stays new
+                card.queue = QUEUE_SUSPENDED if rng.random() < 0.02 else QUEUE_REVIEW
+                card.reps = rng.randint(1, 60)
+                # Most cards rarely lapse, a few become leeches
+                card.lapses = min(card.reps, int(rng.expovariate(0.6)))
+                card.factor = max(1300, 2500 - 150 * card.lapses + rng.randint(-200, 200))
+                card.interval = rng.randint(1, 400)
+
+        today = date(2026, 1, 1)
+        for days_ago in range(review_days):
+            if rng.random() < 0.85:
+                day = (today - timedelta(days=days_ago)).isoformat()
+                collection.reviews_by_day[day] = rng.randint(5, 400)
+
+        return collection
+
+    def new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def add_deck(self, name: str) -> int:
+        # Parent decks are created implicitly, like in Anki
+        parts = name.split("::")
+        for depth in range(1, len(parts) + 1):
+            self.decks.setdefault("::".join(parts[:depth]), self.new_id())
+        return self.decks[name]
+
+    def add_note(self, model: str, deck: str, fields: Dict[str, str], tags: Iterable[str]) -> FakeNote:
+        self.add_deck(deck)
+        note = FakeNote(
+            note_id=self.new_id(),
+            model_name=model,
+            fields={name: fields.get(name, "") for name in self.models[model]},
+            tags=list(tags),
+            mod=1_700_000_000,
+        )
+        self.notes[note.note_id] = note
+        for ord_ in range(CARDS_PER_NOTE.get(model, 1)):
+            card = FakeCard(
+                card_id=self.new_id(),
+                note_id=note.note_id,
+                deck_name=deck,
+                ord=ord_,
+                factor=0,
+                interval=0,
+                reps=0,
+                lapses=0,
+                queue=QUEUE_NEW,
+                due=len(self.cards),
+                mod=note.mod,
+            )
+            self.cards[card.card_id] = card
+            note.cards.append(card.card_id)
+        return note
+
+    def tags(self) -> List[str]:
+        return sorted({tag for note in self.notes.values() for tag in note.tags})
+
+    def find_cards(self, query: str) -> List[int]:
+        matches = compile_query(query)
+        return [card.card_id for card in self.cards.values() if matches(self.notes[card.note_id], card)]
+
+    def find_notes(self, query: str) -> List[int]:
+        matches = compile_query(query)
+        found = []
+        for note in self.notes.values():
+            if any(matches(note, self.cards[card_id]) for card_id in note.cards):
+                found.append(note.note_id)
+        return found
+
+
+def _random_text(rng: random.Random, html: bool) -> str:
+    text = " ".join(rng.choices(WORDS, k=rng.randint(2, 12)))
+    if not html:
+        return text
+    roll = rng.random()
+    if roll < 0.15:
+        text = f"<b>{text}</b>"
+    elif roll < 0.25:
+        text = f'{text}<br><img src="img_{rng.randint(1, 500)}.jpg">'
+    elif roll < 0.3:
+        text = f"{text} [sound:audio_{rng.randint(1, 500)}.mp3]"
+    elif roll < 0.35:
+        text = f"{text} &amp; more"
+    return text
+
+
+Predicate = Callable[[FakeNote, FakeCard], bool]
+
+_PROP = re.compile(r"^(ivl|due|reps|lapses|ease)(<=|>=|!=|=|<|>)(-?[\d.]+)$")
+_OPERATORS = {
+    "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b,
+    "<=": lambda a, b: a <= b,
+    ">=": lambda a, b: a >= b,
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+}
+
+
+def compile_query(query: str) -> Predicate:
+    """Compile a search query into a predicate over (note, card) pairs.
+
+    Supports terms joined by AND (implicit) or OR, negation with `-`, and the
+    deck:, tag:, note:, nid:, cid:, is:, prop: and field:value searches.
+    """
+    try:
+        tokens = shlex.split(query)
+    except ValueError:
+        tokens = query.split()
+
+    groups: List[List[Predicate]] = [[]]
+    for token in tokens:
+        if token.upper() == "OR":
+            groups.append([])
+        elif token.upper() != "AND":
+            groups[-1].append(_term(token))
+
+    def matches(note: FakeNote, card: FakeCard) -> bool:
+        return any(all(term(note, card) for term in group) for group in groups)
+
+    return matches
+
+
+def _glob(pattern: str) -> re.Pattern:
+    return re.compile(fnmatch.translate(pattern.lower()), re.IGNORECASE)
+
+
+def _term(token: str) -> Predicate:
+    if token.startswith("-") and len(token) > 1:
+        inner = _term(token[1:])
+        return lambda note, card: not inner(note, card)
+
+    key, sep, value = token.partition(":")
+    key = key.lower()
+    if not sep:
+        needle = token.lower().replace("*", "")
+        return lambda note, card: any(needle in text.lower() for text in note.fields.values())
+
+    if key == "deck":
+        if value == "*":
+            return lambda note, card: True
+        pattern = _glob(value)
+        return lambda note, card: _self_or_parent_matches(pattern, card.deck_name)
+    if key == "tag":
+        pattern = _glob(value)
+        return lambda note, card: any(_self_or_parent_matches(pattern, tag) for tag in note.tags)
+    if key == "note":
+        pattern = _glob(value)
+        return lambda note, card: bool(pattern.match(note.model_name))
+    if key == "nid":
+        ids = {int(part) for part in value.split(",") if part}
+        return lambda note, card: note.note_id in ids
+    if key == "cid":
+        ids = {int(part) for part in value.split(",") if part}
+        return lambda note, card: card.card_id in ids
+    if key == "is":
+        state = value.lower()
+        if state == "suspended":
+            return lambda note, card: card.queue == QUEUE_SUSPENDED
+        if state == "new":
+            return lambda note, card: card.reps == 0
+        if state == "review":
+            return lambda note, card: card.reps > 0
+        return lambda note, card: False
+    if key == "prop":
+        match = _PROP.match(value)
+        if not match:
+            raise ValueError(f"invalid property search: {value}")
+        prop, operator, number = match.groups()
+        compare = _OPERATORS[operator]
+        threshold = float(number)
+        getters = {
+            "ivl": lambda card: card.interval,
+            "due": lambda card: card.due,
+            "reps": lambda card: card.reps,
+            "lapses": lambda card: card.lapses,
+            "ease": lambda card: card.factor / 1000,
+        }
+        getter = getters[prop]
+        return lambda note, card: compare(getter(card), threshold)
+
+    # field:value
+    pattern = _glob(value)
+    return lambda note, card: any(
+        name.lower() == key and bool(pattern.match(text)) for name, text in note.fields.items()
+    )
+
+
+def _self_or_parent_matches(pattern: re.Pattern, name: str) -> bool:
+    """Match `name` or any of its parents, so deck:A and tag:a include their children."""
+    parts = name.split("::")
+    return any(pattern.match("::".join(parts[:depth])) for depth in range(1, len(parts) + 1))
+
+
+def card_info(collection: FakeCollection, card: FakeCard) -> Dict:
+    """Format a card as returned by the cardsInfo action."""
+    note = collection.notes[card.note_id]
+    values = list(note.fields.values())
+    return {
+        "cardId": card.card_id,
+        "note": note.note_id,
+        "deckName": card.deck_name,
+        "modelName": note.model_name,
+        "fieldOrder": card.ord,
+        "fields": {name: {"value": value, "order": order} for order, (name, value) in enumerate(note.fields.items())},
+        "question": values[card.ord % len(values)],
+        "answer": values[(card.ord + 1) % len(values)],
+        "ord": card.ord,
+        "factor": card.factor,
+        "interval": card.interval,
+        "type": 0 if card.reps == 0 else 2,
+        "queue": card.queue,
+        "due": card.due,
+        "reps": card.reps,
+        "lapses": card.lapses,
+        "left": 0,
+        "mod": card.mod,
+    }
+
+
+def note_info(note: Optional[FakeNote]) -> Dict:
+    """Format a note as returned by the notesInfo action."""
+    if note is None:
+        return {}
+    return {
+        "noteId": note.note_id,
+        "modelName": note.model_name,
+        "tags": list(note.tags),
+        "fields": {name: {"value": value, "order": order} for order, (name, value) in enumerate(note.fields.items())},
+        "mod": note.mod,
+        "cards": list(note.cards),
+    }
@@ -0,0 +1,379 @@
+"""
+A stand-in for the AnkiConnect add-on, serving a synthetic collection over HTTP.
+
+Run it on its own with:
+
+    python -m anki_mcp.testing --notes 50000 --port 8765 --latency 0.005
+"""
+
+import argparse
+import base64
+import fnmatch
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List
+
+from anki_mcp.testing.collection import (
+    QUEUE_NEW,
+    QUEUE_REVIEW,
+    QUEUE_SUSPENDED,
+    FakeCollection,
+    card_info,
+    note_info,
+)
+
+ANKI_CONNECT_VERSION = 6
+
+
+class AnkiConnectError(Exception):
+    """Raised by action handlers to produce an AnkiConnect error response."""
+
+
+class FakeAnkiConnect:
+    """Serve the AnkiConnect actions used by the tools from a FakeCollection.
+
+    Like Anki, requests are executed one at a time. `latency` adds a fixed delay
+    to every request and `action_latency` per-action delays, both in seconds.
+
+    Can be used as a context manager that starts and stops the HTTP server:
+
+        with FakeAnkiConnect(FakeCollection.generate(1000)) as anki:
+            monkeypatch.setitem(backends.backend_urls, "default", anki.url)
+    """
+
+    def __init__(self, collection: FakeCollection | None = None, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, action_latency: Dict[str, float] | None = None):
+        self.collection = collection if collection is not None else FakeCollection()
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.action_latency = dict(action_latency or {})
+        self.request_counts: Counter = Counter()
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+        self._actions: Dict[str, Callable[..., Any]] = {
+            name[len("action_"):]: getattr(self, name)
+            for name in dir(self)
+            if name.startswith("action_")
+        }
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "FakeAnkiConnect":
+        self._server = ThreadingHTTPServer((self.host, self.port), _handler_for(self))
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeAnkiConnect":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reset_stats(self) -> None:
+        self.request_counts.clear()
+        self.bytes_received = 0
+        self.bytes_sent = 0
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one AnkiConnect request and return its response body."""
+        action = request.get("action")
+        with self._lock:
+            self.request_counts[action] += 1
+            delay = self.latency + self.action_latency.get(action, 0.0)
+            if delay:
+                time.sleep(delay)
+            return self._execute(action, request.get("params") or {})
+
+    def _execute(self, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        handler = self._actions.get(action)
+        if handler is None:
+            return {"result": None, "error": "unsupported action"}
+        try:
+            return {"result": handler(**params), "error": None}
+        except AnkiConnectError as e:
+            return {"result": None, "error": str(e)}
+        except (TypeError, ValueError, KeyError) as e:
+            return {"result": None, "error": f"{type(e).__name__}: {e}"}
+
+    # Actions
+
+    def action_version(self) -> int:
+        return ANKI_CONNECT_VERSION
+
+    def action_multi(self, actions: List[Dict[str, Any]]) -> List[Any]:
+        results = []
+        for request in actions:
+            self.request_counts[request.get("action")] += 1
+            response = self._execute(request.get("action"), request.get("params") or {})
+            # Like AnkiConnect, actions without a version of at least 5 get API v4
+            # replies: the bare result, with errors dropped
+            results.append(response if request.get("version", 4) >= 5 else response["result"])
+        return results
+
+    def action_deckNames(self) -> List[str]:
+        return sorted(self.collection.decks)
+
+    def action_deckNamesAndIds(self) -> Dict[str, int]:
+        return dict(sorted(self.collection.decks.items()))
+
+    def action_createDeck(self, deck: str) -> int:
+        return self.collection.add_deck(deck)
+
+    def action_getDeckStats(self, decks: List[str]) -> Dict[str, Dict[str, Any]]:
+        # Like Anki's deck tree, due counts include subdecks while total_in_deck does not
+        stats = {}
+        for name in decks:
+            if name not in self.collection.decks:
+                continue
+            deck_id = self.collection.decks[name]
+            stats[str(deck_id)] = {
+                "deck_id": deck_id,
+                "name": name,
+                "new_count": 0,
+                "learn_count": 0,
+                "review_count": 0,
+                "total_in_deck": 0,
+            }
+        by_name = {entry["name"]: entry for entry in stats.values()}
+        for card in self.collection.cards.values():
+            own = by_name.get(card.deck_name)
+            if own is not None:
+                own["total_in_deck"] += 1
+            parts = card.deck_name.split("::")
+            for depth in range(1, len(parts) + 1):
+                entry = by_name.get("::".join(parts[:depth]))
+                if entry is None:
+                    continue
+                if card.queue == QUEUE_NEW:
+                    entry["new_count"] += 1
+                # Cards with the shortest intervals stand in for the ones due today
+                elif card.queue == QUEUE_REVIEW and card.interval <= 1:
+                    entry["review_count"] += 1
+        return stats
+
+    def action_modelNames(self) -> List[str]:
+        return sorted(self.collection.models)
+
+    def action_modelFieldNames(self, modelName: str) -> List[str]:
+        if modelName not in self.collection.models:
+            raise AnkiConnectError(f"model was not found: {modelName}")
+        return list(self.collection.models[modelName])
+
+    def action_modelFieldDescriptions(self, modelName: str) -> List[str]:
+        return ["" for _ in self.action_modelFieldNames(modelName)]
+
+    def action_getTags(self) -> List[str]:
+        return self.collection.tags()
+
+    def action_findNotes(self, query: str) -> List[int]:
+        return self.collection.find_notes(query)
+
+    def action_findCards(self, query: str) -> List[int]:
+        return self.collection.find_cards(query)
+
+    def action_notesInfo(self, notes: List[int] | None = None, query: str | None = None) -> List[Dict[str, Any]]:
+        if notes is None:
+            notes = self.collection.find_notes(query or "")
+        return [note_info(self.collection.notes.get(note_id)) for note_id in notes]
+
+    def action_cardsInfo(self, cards: List[int]) -> List[Dict[str, Any]]:
+        return [
+            card_info(self.collection, self.collection.cards[card_id]) if card_id in self.collection.cards else {}
+            for card_id in cards
+        ]
+
+    def action_cardsToNotes(self, cards: List[int]) -> List[int]:
+        return sorted({self.collection.cards[card_id].note_id for card_id in cards if card_id in self.collection.cards})
+
+    def action_addNote(self, note: Dict[str, Any]) -> int:
+        deck = note.get("deckName", "Default")
+        model = note.get("modelName", "Basic")
+        fields = note.get("fields", {})
+        if model not in self.collection.models:
+            raise AnkiConnectError(f"model was not found: {model}")
+        field_names = self.collection.models[model]
+        first = fields.get(field_names[0], "")
+        if not first.strip():
+            raise AnkiConnectError("cannot create note because it is empty")
+        allow_duplicate = note.get("options", {}).get("allowDuplicate", False)
+        if not allow_duplicate and self._is_duplicate(model, field_names[0], first):
+            raise AnkiConnectError("cannot create note because it is a duplicate")
+        return self.collection.add_note(model, deck, fields, note.get("tags", [])).note_id
+
+    def action_addNotes(self, notes: List[Dict[str, Any]]) -> List[int | None]:
+        ids = []
+        for note in notes:
+            try:
+                ids.append(self.action_addNote(note))
+            except AnkiConnectError:
+                ids.append(None)
+        return ids
+
+    def action_updateNoteFields(self, note: Dict[str, Any]) -> None:
+        stored = self._note(note["id"])
+        for name, value in note.get("fields", {}).items():
+            if name in stored.fields:
+                stored.fields[name] = value
+        stored.mod = int(time.time())
+
+    def action_updateNote(self, note: Dict[str, Any]) -> None:
+        stored = self._note(note["id"])
+        if "fields" in note:
+            self.action_updateNoteFields(note)
+        if "tags" in note:
+            stored.tags = list(note["tags"])
+            stored.mod = int(time.time())
+
+    def action_addTags(self, notes: List[int], tags: str) -> None:
+        for note_id in notes:
+            stored = self._note(note_id)
+            for tag in tags.split():
+                if tag not in stored.tags:
+                    stored.tags.append(tag)
+
+    def action_removeTags(self, notes: List[int], tags: str) -> None:
+        removed = {tag.lower() for tag in tags.split()}
+        for note_id in notes:
+            stored = self._note(note_id)
+            stored.tags = [tag for tag in stored.tags if tag.lower() not in removed]
+
+    def action_replaceTags(self, notes: List[int], tag_to_replace: str, replace_with_tag: str) -> None:
+        for note_id in notes:
+            stored = self._note(note_id)
+            stored.tags = [replace_with_tag if tag == tag_to_replace else tag for tag in stored.tags]
+
+    def action_replaceTagsInAllNotes(self, tag_to_replace: str, replace_with_tag: str) -> None:
+        self.action_replaceTags(list(self.collection.notes), tag_to_replace, replace_with_tag)
+
+    def action_changeDeck(self, cards: List[int], deck: str) -> None:
+        self.collection.add_deck(deck)
+        for card_id in cards:
+            if card_id in self.collection.cards:
+                self.collection.cards[card_id].deck_name = deck
+
+    def action_suspend(self, cards: List[int]) -> bool:
+        changed = False
+        for card_id in cards:
+            card = self.collection.cards.get(card_id)
+            if card is not None and card.queue != QUEUE_SUSPENDED:
+                card.queue = QUEUE_SUSPENDED
+                changed = True
+        return changed
+
+    def action_unsuspend(self, cards: List[int]) -> bool:
+        changed = False
+        for card_id in cards:
+            card = self.collection.cards.get(card_id)
+            if card is not None and card.queue == QUEUE_SUSPENDED:
+                card.queue = QUEUE_NEW if card.reps == 0 else QUEUE_REVIEW
+                changed = True
+        return changed
+
+    def action_areSuspended(self, cards: List[int]) -> List[bool | None]:
+        return [
+            self.collection.cards[card_id].queue == QUEUE_SUSPENDED if card_id in self.collection.cards else None
+            for card_id in cards
+        ]
+
+    def action_getNumCardsReviewedByDay(self) -> List[List[Any]]:
+        return [[day, count] for day, count in sorted(self.collection.reviews_by_day.items(), reverse=True)]
+
+    def action_storeMediaFile(self, filename: str, data: str) -> str:
+        self.collection.media[filename] = base64.b64decode(data)
+        return filename
+
+    def action_retrieveMediaFile(self, filename: str) -> str | bool:
+        if filename not in self.collection.media:
+            return False
+        return base64.b64encode(self.collection.media[filename]).decode()
+
+    def action_getMediaFilesNames(self, pattern: str = "*") -> List[str]:
+        return sorted(name for name in self.collection.media if fnmatch.fnmatch(name, pattern))
+
+    def action_deleteMediaFile(self, filename: str) -> None:
+        self.collection.media.pop(filename, None)
+
+    def _note(self, note_id: int):
+        note = self.collection.notes.get(note_id)
+        if note is None:
+            raise AnkiConnectError(f"Note was not found: {note_id}")
+        return note
+
+    def _is_duplicate(self, model: str, field_name: str, value: str) -> bool:
+        return any(
+            note.model_name == model and note.fields.get(field_name) == value
+            for note in self.collection.notes.values()
+        )
+
+
+def _handler_for(anki: FakeAnkiConnect):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; without this, delayed ACKs
+        # add ~40 ms to every request on a kept-alive connection
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            anki.bytes_received += len(body)
+            try:
+                response = anki.handle(json.loads(body))
+            except json.JSONDecodeError as e:
+                response = {"result": None, "error": f"invalid JSON: {e}"}
+            payload = json.dumps(response).encode()
+            anki.bytes_sent += len(payload)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            try:
+                self.wfile.write(payload)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client stopped reading a streamed response early
+                self.close_connection = True
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a synthetic Anki collection over the AnkiConnect API.")
+    parser.add_argument("--notes", type=int, default=1000, help="Number of notes to generate")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the generated collection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay added to every request, in seconds")
+    args = parser.parse_args(argv)
+
+    collection = FakeCollection.generate(args.notes, seed=args.seed)
+    anki = FakeAnkiConnect(collection, host=args.host, port=args.port, latency=args.latency)
+    anki.start()
+    print(f"Serving {len(collection.notes)} notes ({len(collection.cards)} cards) at {anki.url}", flush=True)
+    try:
+        anki._thread.join()
+    except KeyboardInterrupt:
+        anki.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,41 @@ from typing import Dict, List, Optional, Annotated
 import mcp.types as types
 from pydantic import BaseModel, Field
 
-from anki_mcp.tools.utils import DEFAULT_DECK_NAME, DEFAULT_MODEL_NAME, make_anki_request
+from anki_mcp.tools import journal as journal_module
+from anki_mcp.tools.backends import DEFAULT_BACKEND, selected_backend
+from anki_mcp.tools.config import settings
+from anki_mcp.tools.media import MediaFile, StoredMedia, store_media_files
+from anki_mcp.tools.output import BackgroundOutput, json_output, structured
+from anki_mcp.tools.progress import report_progress
+from anki_mcp.tools.utils import make_anki_request
+
+# Notes written between progress reports
+PROGRESS_INTERVAL = 50
+
+# Idempotency keys of notes being written by a call that hasn't finished yet
+_in_flight: set[str] = set()
 
 
 class Note(BaseModel):
     name: Annotated[str, Field(description="Name of the note", max_length=64)]
     id: Annotated[int | None, Field(description="Note ID, if the note already exists. If this is populated the existing note will be updated. If this is `None` a new note will be created.")]
-    deck: Annotated[str, Field(description="Deck name (optional)", default=DEFAULT_DECK_NAME)]
-    model: Annotated[str, Field(description="Model name (optional)", default=DEFAULT_MODEL_NAME)]
+    deck: Annotated[str, Field(description="Deck name (optional)", default_factory=lambda: settings.default_deck)]
+    model: Annotated[str, Field(description="Model name (optional)", default_factory=lambda: settings.default_model)]
     fields: Annotated[Dict[str, str], Field(description="Field values for the note (varies by model)")]
     tags: Annotated[Optional[List[str]], Field(description="Tags to assign to the note (optional)", default=None)]
+    key: Annotated[Optional[str], Field(description="Idempotency key (optional). A note whose key was already written is skipped when the notes are submitted again.", default=None, max_length=256)]
+    media: Annotated[Optional[List[MediaFile]], Field(description="Images and sounds to store, each referenced at the end of its field (optional)", default=None)]
+
+
+class NoteOutcome(BaseModel):
+    name: str
+    status: Annotated[str, Field(description="added, updated, skipped or failed")]
+    note_id: Optional[int] = None
+    message: str
+
+
+class AddOrUpdateNotesOutput(BackgroundOutput):
+    notes: List[NoteOutcome] = []
 
 
 async def add_or_update_notes(notes: list[Note]) -> list[types.TextContent]:
@@ -20,34 +45,150 @@ async def add_or_update_notes(notes: list[Note]) -> list[types.TextContent]:
     
     Notes are processed individually to allow partial success. This means
     if some notes fail to add, others can still be added successfully.
+
+    Notes with an idempotency key are recorded in the write journal, so
+    re-submitting a batch after an interruption skips the notes already written.
+
+    The media of all notes are stored first, uploading only files that aren't
+    in Anki yet, and references to them are added to the notes' fields.
     """
     if not notes:
         raise ValueError("No notes provided")
 
-    response_lines = []
-    
-    for note in notes:
-        if note.id:
-            response = await update_note(note)
-            response_lines.append(
-                f"Updated note '{note.name}' with ID {note.id}"
-                if response['success']
-                else f"Failed to update note '{note.name}' with ID {note.id}: {response['error']}"
-            )
-        else:
-            response = await add_note(note)
-            response_lines.append(
-                f"Added note '{note.name}' with ID {response['result']}"
-                if response['success']
-                else f"Failed to add note '{note.name}': {response['error']}"
-            )
-    
+    journal = journal_module.journal
+    keys = {_journal_key(note) for note in notes if note.key and _journal_key(note) not in _in_flight}
+    # Keys whose write was interrupted before, which Anki may have completed
+    in_doubt = {key for key in keys if journal.in_doubt(key)}
+    journal.record_intent(keys)
+    _in_flight.update(keys)
+
+    outcomes = []
+
+    try:
+        media = await _store_media(notes)
+        current_fields, current_error = await _current_fields(notes)
+
+        for index, note in enumerate(notes):
+            if index and index % PROGRESS_INTERVAL == 0:
+                await report_progress(index, len(notes), f"Processed {index} of {len(notes)} notes")
+
+            if note.key:
+                skipped = _skipped(note, keys, journal)
+                if skipped:
+                    outcomes.append(skipped)
+                    continue
+
+            if note.media:
+                note, error = _with_media(note, media[index], current_fields, current_error)
+                if error:
+                    action = "update" if note.id else "add"
+                    outcomes.append(_outcome(note, "failed", note.id, f"Failed to {action} note '{note.name}': {error}"))
+                    continue
+
+            if note.id:
+                response = await update_note(note)
+                if response['success'] and note.key:
+                    journal.record_done(_journal_key(note), note.id, "updated")
+                outcomes.append(
+                    _outcome(note, "updated", note.id, f"Updated note '{note.name}' with ID {note.id}")
+                    if response['success']
+                    else _outcome(note, "failed", note.id, f"Failed to update note '{note.name}' with ID {note.id}: {response['error']}")
+                )
+            else:
+                response = await add_note(note)
+                if response['success'] and note.key:
+                    journal.record_done(_journal_key(note), response['result'], "added")
+                if response['success']:
+                    outcomes.append(_outcome(note, "added", response['result'], f"Added note '{note.name}' with ID {response['result']}"))
+                elif _journal_key(note) in in_doubt and "duplicate" in str(response['error']):
+                    outcomes.append(_outcome(
+                        note, "skipped", None,
+                        f"Skipped note '{note.name}': it was probably added by an interrupted earlier request ({response['error']})",
+                    ))
+                else:
+                    outcomes.append(_outcome(note, "failed", None, f"Failed to add note '{note.name}': {response['error']}"))
+    finally:
+        _in_flight.difference_update(keys)
+
+    if json_output():
+        return structured({"notes": outcomes})
+
     return [
         types.TextContent(
             type="text",
-            text="\n".join(response_lines)
+            text="\n".join(outcome["message"] for outcome in outcomes)
+        )
+    ]
+
+
+def _outcome(note: Note, status: str, note_id: Optional[int], message: str) -> dict:
+    return {"name": note.name, "status": status, "note_id": note_id, "message": message}
+
+
+def _skipped(note: Note, keys: set[str], journal: journal_module.WriteJournal) -> Optional[dict]:
+    """Return why a note with an idempotency key is skipped, or None to write it."""
+    done = journal.completed(_journal_key(note))
+    if done is not None:
+        return _outcome(
+            note, "skipped", done['note_id'],
+            f"Skipped note '{note.name}': already {done['action']} with ID {done['note_id']} (key '{note.key}')",
         )
+    if _journal_key(note) not in keys:
+        return _outcome(note, "skipped", None, f"Skipped note '{note.name}': a request with key '{note.key}' is still in progress")
+    return None
+
+
+def _journal_key(note: Note) -> str:
+    """The note's idempotency key in the journal, which is shared by all backends."""
+    backend = selected_backend()
+    return note.key if backend == DEFAULT_BACKEND else f"{backend}:{note.key}"
+
+
+async def _store_media(notes: List[Note]) -> Dict[int, List[StoredMedia]]:
+    """Store the media of all notes in one batch, returning the outcomes by note index."""
+    files = [(index, file) for index, note in enumerate(notes) for file in note.media or ()]
+    if not files:
+        return {}
+    stored: Dict[int, List[StoredMedia]] = {}
+    for (index, _), result in zip(files, await store_media_files([file for _, file in files])):
+        stored.setdefault(index, []).append(result)
+    return stored
+
+
+async def _current_fields(notes: List[Note]) -> tuple[Dict[int, Dict[str, str]], Optional[str]]:
+    """Fetch the fields of updated notes whose media go into fields not being updated."""
+    note_ids = [
+        note.id for note in notes
+        if note.id and any(file.field and file.field not in note.fields for file in note.media or ())
     ]
+    if not note_ids:
+        return {}, None
+    result = await make_anki_request("notesInfo", notes=note_ids)
+    if not result["success"]:
+        return {}, f"could not retrieve the note's fields: {result['error']}"
+    return {info.note_id: info.fields for info in result["result"] if info is not None}, None
+
+
+def _with_media(note: Note, stored: List[StoredMedia], current_fields: Dict[int, Dict[str, str]],
+                current_error: Optional[str]) -> tuple[Note, Optional[str]]:
+    """Add references to the note's stored media to its fields, or return why they can't be added."""
+    fields = dict(note.fields)
+    for file, result in zip(note.media, stored):
+        if result.error:
+            return note, f"media file {result.source} could not be stored: {result.error}"
+        if file.field is None:
+            continue
+        reference = result.reference
+        if reference is None:
+            return note, f"media file {result.source} is neither an image nor a sound, so it can't be referenced in a field"
+        if file.field not in fields:
+            if note.id and note.id not in current_fields:
+                return note, current_error or f"note {note.id} was not found"
+            fields[file.field] = current_fields.get(note.id, {}).get(file.field, "")
+        # Re-submitted notes already refer to their media
+        if reference not in fields[file.field]:
+            fields[file.field] += reference
+    return note.model_copy(update={"fields": fields}), None
 
 
 async def update_note(note: Note):
@@ -0,0 +1,250 @@
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import mcp.types as types
+from pydantic import BaseModel
+from .config import settings
+from .output import BackgroundOutput, failure, json_output, structured
+from .progress import report_progress
+from .records import CardInfo
+from .utils import make_anki_request
+
+
+# Anki's default leech threshold
+LEECH_LAPSES = 8
+
+# Cards whose ease is this many standard deviations below their deck's mean are outliers
+OUTLIER_STDDEVS = 2.0
+
+
+class Leech(BaseModel):
+    card_id: int
+    lapses: int
+    reps: int
+    factor: int
+
+
+class EaseOutlier(BaseModel):
+    card_id: int
+    factor: int
+    lapses: int
+
+
+class DeckAnalysis(BaseModel):
+    deck: str
+    cards: int
+    leeches: int
+    average_factor: Optional[float]
+    top_leeches: List[Leech]
+    ease_outliers: List[EaseOutlier]
+
+
+class AnalyzeCardsOutput(BackgroundOutput):
+    query: str = ""
+    cards: int = 0
+    min_lapses: int = LEECH_LAPSES
+    leeches: int = 0
+    suspended: int = 0
+    suspend_error: Optional[str] = None
+    decks: List[DeckAnalysis] = []
+
+
+@dataclass
+class _DeckStats:
+    """Running statistics for one deck, kept at a constant size while scanning."""
+    cards: int = 0
+    leeches: int = 0
+    ease_count: int = 0
+    ease_mean: float = 0.0
+    ease_m2: float = 0.0
+    top_leeches: list = field(default_factory=list)
+    lowest_ease: list = field(default_factory=list)
+
+    def add(self, card: CardInfo, min_lapses: int, per_deck: int) -> None:
+        self.cards += 1
+
+        lapses = card.lapses
+        if lapses >= min_lapses:
+            self.leeches += 1
+            _push_bounded(self.top_leeches, (lapses, card.card_id, card.reps, card.factor), per_deck)
+
+        # New cards have no ease factor yet
+        factor = card.factor
+        if factor > 0:
+            # Welford's online algorithm for mean and variance
+            self.ease_count += 1
+            delta = factor - self.ease_mean
+            self.ease_mean += delta / self.ease_count
+            self.ease_m2 += delta * (factor - self.ease_mean)
+            _push_bounded(self.lowest_ease, (-factor, card.card_id, lapses), per_deck)
+
+    @property
+    def ease_stddev(self) -> float:
+        if self.ease_count < 2:
+            return 0.0
+        return math.sqrt(self.ease_m2 / (self.ease_count - 1))
+
+    def outliers(self) -> list[tuple[int, int, int]]:
+        """Return (card_id, factor, lapses) for low-ease outliers, lowest ease first."""
+        stddev = self.ease_stddev
+        if stddev == 0:
+            return []
+        cutoff = self.ease_mean - OUTLIER_STDDEVS * stddev
+        candidates = sorted(((-neg_factor, card_id, lapses) for neg_factor, card_id, lapses in self.lowest_ease))
+        return [(card_id, factor, lapses) for factor, card_id, lapses in candidates if factor <= cutoff]
+
+
+def _push_bounded(heap: list, item: tuple, size: int) -> None:
+    """Keep the `size` largest items in a min-heap."""
+    if len(heap) < size:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+
+async def analyze_cards(
+    query: str = "deck:*",
+    min_lapses: int = LEECH_LAPSES,
+    per_deck: int = 5,
+    suspend_leeches: bool = False,
+) -> list[types.TextContent]:
+    """Find leeches and ease outliers per deck.
+
+    Cards are fetched in chunks so memory stays bounded regardless of collection size.
+
+    Args:
+        query: Anki search query selecting the cards to analyze (default "deck:*").
+        min_lapses: Number of lapses at which a card counts as a leech (default 8).
+        per_deck: Maximum number of leeches and outliers listed per deck (default 5).
+        suspend_leeches: Suspend all unsuspended leeches found in a single request.
+
+    Returns:
+        TextContent with the per-deck analysis.
+    """
+    if per_deck < 1:
+        return failure("per_deck must be at least 1.")
+
+    result = await make_anki_request("findCards", query=query)
+
+    if not result["success"]:
+        return failure(f"Failed to find cards: {result['error']}")
+
+    card_ids = result["result"]
+
+    if not card_ids and not json_output():
+        return [
+            types.TextContent(
+                type="text",
+                text=f"No cards found matching query: '{query}'",
+            )
+        ]
+
+    decks: dict[str, _DeckStats] = {}
+    leech_ids = []
+
+    for start in range(0, len(card_ids), settings.analyze_batch_size):
+        chunk = card_ids[start:start + settings.analyze_batch_size]
+        info_result = await make_anki_request("cardsInfo", cards=chunk)
+        if not info_result["success"]:
+            return failure(f"Failed to retrieve card info: {info_result['error']}")
+
+        for card in info_result["result"]:
+            if card is None:
+                continue
+            deck_name = card.deck_name or "(unknown deck)"
+            stats = decks.get(deck_name)
+            if stats is None:
+                stats = decks[deck_name] = _DeckStats()
+            stats.add(card, min_lapses, per_deck)
+            if card.lapses >= min_lapses and not card.suspended:
+                leech_ids.append(card.card_id)
+
+        analyzed = start + len(chunk)
+        await report_progress(analyzed, len(card_ids), f"Analyzed {analyzed} of {len(card_ids)} cards")
+
+    total_leeches = sum(stats.leeches for stats in decks.values())
+    suspended = 0
+    suspend_error = None
+    if suspend_leeches and leech_ids:
+        suspend_result = await make_anki_request("suspend", cards=leech_ids)
+        if suspend_result["success"]:
+            suspended = len(leech_ids)
+        else:
+            suspend_error = suspend_result["error"]
+
+    # Decks with the most leeches first
+    ranked = sorted(decks.items(), key=lambda item: (-item[1].leeches, item[0]))
+
+    if json_output():
+        return structured({
+            "query": query,
+            "cards": len(card_ids),
+            "min_lapses": min_lapses,
+            "leeches": total_leeches,
+            "suspended": suspended,
+            "suspend_error": suspend_error,
+            "decks": [_deck_data(deck_name, stats) for deck_name, stats in ranked],
+        })
+
+    lines = [
+        f"Analyzed {len(card_ids)} card(s) in {len(decks)} deck(s) matching query: '{query}'",
+        f"Leeches (>= {min_lapses} lapses): {total_leeches}",
+    ]
+
+    if suspend_leeches:
+        if suspend_error is not None:
+            lines.append(f"Failed to suspend leeches: {suspend_error}")
+        elif suspended:
+            lines.append(f"Suspended {suspended} leech(es).")
+        else:
+            lines.append("No unsuspended leeches to suspend.")
+
+    for deck_name, stats in ranked:
+        lines.append("")
+        lines.append(_format_deck(deck_name, stats))
+
+    return [
+        types.TextContent(
+            type="text",
+            text="\n".join(lines),
+        )
+    ]
+
+
+def _deck_data(deck_name: str, stats: _DeckStats) -> dict:
+    """Return the analysis of a single deck for structured output."""
+    return {
+        "deck": deck_name,
+        "cards": stats.cards,
+        "leeches": stats.leeches,
+        "average_factor": stats.ease_mean if stats.ease_count else None,
+        "top_leeches": [
+            {"card_id": card_id, "lapses": lapses, "reps": reps, "factor": factor}
+            for lapses, card_id, reps, factor in sorted(stats.top_leeches, reverse=True)
+        ],
+        "ease_outliers": [
+            {"card_id": card_id, "factor": factor, "lapses": lapses}
+            for card_id, factor, lapses in stats.outliers()
+        ],
+    }
+
+
+def _format_deck(deck_name: str, stats: _DeckStats) -> str:
+    """Format the analysis of a single deck."""
+    average = f"{stats.ease_mean / 10:.0f}%" if stats.ease_count else "n/a"
+    lines = [f"Deck '{deck_name}' ({stats.cards} cards, {stats.leeches} leeches, average ease {average}):"]
+
+    if stats.top_leeches:
+        lines.append("  Top leeches:")
+        for lapses, card_id, reps, factor in sorted(stats.top_leeches, reverse=True):
+            lines.append(f"    - Card {card_id}: {lapses} lapses, {reps} reviews, ease {factor / 10:.0f}%")
+
+    outliers = stats.outliers()
+    if outliers:
+        lines.append("  Ease outliers:")
+        for card_id, factor, lapses in outliers:
+            lines.append(f"    - Card {card_id}: ease {factor / 10:.0f}%, {lapses} lapses")
+
+    return "\n".join(lines)
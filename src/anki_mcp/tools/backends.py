@@ -0,0 +1,99 @@
+"""
+Named Anki Connect backends.
+
+One server process can talk to several Anki instances, each serving Anki
+Connect at its own URL. Tools run against the backend named by their `profile`
+argument, or the default backend without it. Connections, request scheduling,
+the circuit breaker and caches are kept per backend, so a slow or unavailable
+instance doesn't hold up the others.
+
+Backends are configured with `--backend NAME=URL`, the `backends` setting or
+the `ANKI_CONNECT_BACKENDS` environment variable, as comma-separated `NAME=URL`
+pairs. The backend named "default", or else the first one, is the default.
+"""
+
+import re
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+DEFAULT_BACKEND = "default"
+DEFAULT_URL = "http://localhost:8765"
+
+# Selects every backend, for read-only tools
+ALL_BACKENDS = "*"
+
+_NAME = re.compile(r"^[\w.-]+$")
+
+# URL of every backend by name, the default backend first
+backend_urls: Dict[str, str] = {DEFAULT_BACKEND: DEFAULT_URL}
+
+# Backend the requests of the running tool are sent to, None for the default
+current_backend: ContextVar[Optional[str]] = ContextVar("anki_mcp_backend", default=None)
+
+
+class UnknownBackendError(ValueError):
+    """A profile names a backend that isn't configured."""
+
+
+def configure_backends(urls: Dict[str, str]) -> None:
+    """Replace the configured backends. The first one is the default unless one is named "default"."""
+    check_backends(urls)
+    ordered = dict(urls)
+    if DEFAULT_BACKEND in ordered:
+        ordered = {DEFAULT_BACKEND: ordered.pop(DEFAULT_BACKEND), **ordered}
+    backend_urls.clear()
+    backend_urls.update(ordered)
+
+
+def parse_backends(specs: List[str]) -> Dict[str, str]:
+    """Parse `NAME=URL` pairs, each spec holding one or more separated by commas."""
+    urls: Dict[str, str] = {}
+    for spec in specs:
+        for pair in filter(None, (part.strip() for part in spec.split(","))):
+            name, sep, url = pair.partition("=")
+            if not sep:
+                raise ValueError(f"Invalid backend {pair!r}, expected NAME=URL")
+            urls[name.strip()] = url.strip()
+    check_backends(urls)
+    return urls
+
+
+def check_backends(urls: Dict[str, str]) -> None:
+    """Raise ValueError if a backend name or URL is invalid."""
+    if not urls:
+        raise ValueError("At least one backend is required")
+    for name, url in urls.items():
+        if not _NAME.match(name):
+            raise ValueError(f"Invalid backend name {name!r}: use letters, digits, '.', '_' and '-'")
+        if not url.startswith(("http://", "https://")):
+            raise ValueError(f"Invalid URL for backend {name!r}: {url!r}")
+
+
+def default_backend() -> str:
+    return next(iter(backend_urls))
+
+
+def selected_backend() -> str:
+    """Name of the backend the running tool uses."""
+    return current_backend.get() or default_backend()
+
+
+def select_backends(profile: Optional[str]) -> List[str]:
+    """Resolve a `profile` argument to backend names: one name, comma-separated names or "*" for all.
+
+    Raises:
+        UnknownBackendError: If a name isn't configured
+    """
+    if profile is None or not profile.strip():
+        return [default_backend()]
+    if profile.strip() == ALL_BACKENDS:
+        return list(backend_urls)
+    names = list(dict.fromkeys(name.strip() for name in profile.split(",") if name.strip()))
+    unknown = [name for name in names if name not in backend_urls]
+    if unknown:
+        raise UnknownBackendError(
+            f"Unknown profile {', '.join(repr(name) for name in unknown)}. "
+            f"Available profiles: {', '.join(backend_urls)}"
+        )
+    return names
+
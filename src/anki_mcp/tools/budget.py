@@ -0,0 +1,84 @@
+"""
+Token budgets for tool results.
+
+Tools that can return large results take a `max_tokens` parameter. They add
+items to the result while the estimated token count stays within the budget,
+and return a cursor to continue from the first item left out.
+"""
+
+import base64
+import binascii
+import json
+import zlib
+from typing import List, Optional, Union
+
+# Characters per token of typical English text and JSON. The estimate only has
+# to keep results within the same order of magnitude as the budget, and
+# counting characters costs nothing next to formatting the result.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens a client's model needs for `text`."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class TokenBudget:
+    """Estimated tokens left for a result. Unlimited if `max_tokens` is None."""
+
+    __slots__ = ("max_tokens", "used", "items")
+
+    def __init__(self, max_tokens: Optional[int] = None):
+        self.max_tokens = max_tokens
+        self.used = 0
+        self.items = 0
+
+    @property
+    def limited(self) -> bool:
+        return self.max_tokens is not None
+
+    def take(self, tokens: int) -> bool:
+        """Spend tokens on an item if they fit in the budget.
+
+        The first item is always taken, even if it exceeds the budget alone, so
+        that following the cursor makes progress.
+        """
+        if self.max_tokens is not None and self.items and self.used + tokens > self.max_tokens:
+            return False
+        self.used += tokens
+        self.items += 1
+        return True
+
+
+def encode_cursor(scope: str, position: Union[int, List[int]]) -> str:
+    """Return an opaque cursor for continuing a result at `position`, an offset
+    or a list of offsets into nested results.
+
+    `scope` identifies the result, for example the tool and its query, so a
+    cursor can't be used to continue a different one.
+    """
+    payload = json.dumps([_checksum(scope), position], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, scope: str) -> Union[int, List[int]]:
+    """Return the position a cursor continues at.
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another result
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        checksum, position = json.loads(payload)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("malformed cursor") from None
+    if checksum != _checksum(scope):
+        raise ValueError("the cursor belongs to a different query")
+    offsets = position if isinstance(position, list) else [position]
+    if not all(type(offset) is int and offset >= 0 for offset in offsets):
+        raise ValueError("malformed cursor")
+    return position
+
+
+def _checksum(scope: str) -> int:
+    return zlib.crc32(scope.encode())
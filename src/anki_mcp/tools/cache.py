@@ -0,0 +1,77 @@
+"""
+Cache of results derived from the collection.
+
+Entries expire after a time to live, which bounds how long changes made in Anki
+itself go unnoticed, and are dropped whenever this server sends a write to
+Anki Connect. Every backend has a cache of its own. The time to live is the
+`cache_ttl` setting unless given.
+"""
+
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .backends import selected_backend
+from .config import settings
+
+
+class CollectionCache:
+    """Results derived from the collection, kept until they expire or the next write."""
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = settings.cache_ttl if ttl is None else ttl
+        # Incremented by every write, so results read before it aren't stored after it
+        self.generation = 0
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if time.monotonic() >= expires:
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: int) -> None:
+        """Store a value computed from reads that started at `generation`.
+
+        The value is discarded if a write was sent since, as it may predate it.
+        """
+        if generation == self.generation:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+
+class BackendCaches:
+    """A collection cache per backend, used as the cache of the backend the running tool uses."""
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self._caches: Dict[str, CollectionCache] = {}
+
+    def current(self) -> CollectionCache:
+        name = selected_backend()
+        cache = self._caches.get(name)
+        if cache is None:
+            cache = self._caches[name] = CollectionCache(self.ttl)
+        return cache
+
+    @property
+    def generation(self) -> int:
+        return self.current().generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self.current().get(key)
+
+    def set(self, key: Hashable, value: Any, generation: int) -> None:
+        self.current().set(key, value, generation)
+
+    def invalidate(self) -> None:
+        self.current().invalidate()
+
+
+collection_cache = BackendCaches()
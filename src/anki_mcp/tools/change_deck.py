@@ -0,0 +1,100 @@
+from collections import Counter
+from contextlib import aclosing
+from typing import Dict, List, Optional, Tuple
+
+import mcp.types as types
+
+from .config import settings
+from .output import BackgroundOutput, failure, json_output, structured
+from .progress import report_progress
+from .utils import AnkiConnectError, make_anki_request, stream_anki_request
+
+
+class ChangeDeckOutput(BackgroundOutput):
+    deck: str = ""
+    dry_run: bool = False
+    cards: int = 0
+    moved: int = 0
+    chunks: List[int] = []
+    from_decks: Dict[str, int] = {}
+
+
+async def change_deck(
+    deck: str,
+    card_ids: Optional[List[int]] = None,
+    query: Optional[str] = None,
+    dry_run: bool = False,
+) -> list[types.TextContent]:
+    """Move cards selected by ID or by a query to a deck, in chunks.
+
+    Args:
+        deck: Deck to move the cards to. It is created if it doesn't exist.
+        card_ids: Cards to move.
+        query: Anki search query selecting the cards to move, instead of card_ids.
+        dry_run: Only report how many cards would be moved and from which decks.
+
+    Returns:
+        TextContent with the number of cards moved per chunk.
+    """
+    if not deck:
+        return failure("No deck provided. Please specify the deck to move the cards to.")
+
+    card_ids, error = await _select_cards(card_ids, query)
+    if error:
+        return failure(error)
+
+    if dry_run:
+        return await _preview(deck, card_ids)
+
+    chunks: List[int] = []
+    for start in range(0, len(card_ids), settings.change_deck_batch_size):
+        chunk = card_ids[start:start + settings.change_deck_batch_size]
+        result = await make_anki_request("changeDeck", cards=chunk, deck=deck)
+        if not result["success"]:
+            return failure(f"Failed to move cards after {start} of {len(card_ids)} cards: {result['error']}")
+        chunks.append(len(chunk))
+        await report_progress(start + len(chunk), len(card_ids), f"Moved {start + len(chunk)} of {len(card_ids)} cards")
+
+    if json_output():
+        return structured({"deck": deck, "cards": len(card_ids), "moved": len(card_ids), "chunks": chunks})
+
+    text = f"Moved {len(card_ids)} card(s) to deck '{deck}'"
+    if len(chunks) > 1:
+        text += f" in {len(chunks)} chunks of {', '.join(str(count) for count in chunks)} cards"
+    return [types.TextContent(type="text", text=text + ".")]
+
+
+async def _preview(deck: str, card_ids: List[int]) -> list[types.TextContent]:
+    """Count the selected cards by their current deck, without moving them."""
+    from_decks: Counter = Counter()
+    try:
+        async with aclosing(stream_anki_request("cardsInfo", cards=card_ids)) as stream:
+            async for card in stream:
+                if card is not None:
+                    from_decks[card.deck_name] += 1
+    except AnkiConnectError as e:
+        return failure(f"Failed to retrieve cards: {e}")
+
+    moved = sum(count for name, count in from_decks.items() if name != deck)
+    chunks = [min(settings.change_deck_batch_size, len(card_ids) - start) for start in range(0, len(card_ids), settings.change_deck_batch_size)]
+
+    if json_output():
+        return structured({"deck": deck, "dry_run": True, "cards": len(card_ids), "moved": moved,
+                           "chunks": chunks, "from_decks": dict(from_decks.most_common())})
+
+    lines = [f"Dry run: would move {moved} of {len(card_ids)} card(s) to deck '{deck}' in {len(chunks)} chunk(s)."]
+    for name, count in from_decks.most_common():
+        lines.append(f"- {name}: {count} card(s)" + (" (already there)" if name == deck else ""))
+    return [types.TextContent(type="text", text="\n".join(lines))]
+
+
+async def _select_cards(card_ids: Optional[List[int]], query: Optional[str]) -> Tuple[List[int], Optional[str]]:
+    """Return the IDs of the selected cards, or an error."""
+    if (card_ids is None) == (query is None):
+        return [], "Provide either card_ids or query."
+    if card_ids is not None:
+        return card_ids, None
+    result = await make_anki_request("findCards", query=query)
+    if not result["success"]:
+        return [], f"Failed to find cards: {result['error']}"
+    return result["result"], None
@@ -0,0 +1,67 @@
+import time
+from typing import Callable
+
+
+class CircuitBreaker:
+    """Fail fast while Anki Connect is unreachable.
+
+    After `failure_threshold` consecutive failures the circuit opens and requests
+    are rejected without contacting Anki Connect. Once `recovery_timeout` seconds
+    have passed a single probe request is let through; its outcome closes the
+    circuit again or keeps it open for another `recovery_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_started_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at < self.recovery_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self.recovery_timeout - self._clock())
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent now."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.OPEN:
+            return False
+
+        # Half open: let one probe through. A probe that never reported back
+        # (e.g. because its caller was cancelled) is replaced after a timeout.
+        now = self._clock()
+        if self._probe_started_at is None or now - self._probe_started_at >= self.recovery_timeout:
+            self._probe_started_at = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probe_started_at is not None or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+            self._probe_started_at = None
@@ -0,0 +1,69 @@
+"""
+JSON encoding and decoding of Anki Connect requests and responses.
+
+Uses orjson or msgspec when one of them is installed (`pip install anki-mcp[fast]`)
+and falls back to the standard library otherwise. The `json_codec` setting
+(`ANKI_MCP_JSON`) picks one of `orjson`, `msgspec` or `json` explicitly.
+"""
+
+import json
+from typing import Any, Callable, Dict, NamedTuple
+
+
+class JsonCodec(NamedTuple):
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+CODECS: Dict[str, JsonCodec] = {"json": JsonCodec("json", _stdlib_dumps, json.loads)}
+
+try:
+    import msgspec
+except ImportError:
+    pass
+else:
+    CODECS["msgspec"] = JsonCodec("msgspec", msgspec.json.Encoder().encode, msgspec.json.Decoder().decode)
+
+try:
+    import orjson
+except ImportError:
+    pass
+else:
+    CODECS["orjson"] = JsonCodec("orjson", orjson.dumps, orjson.loads)
+
+# In order of preference
+PREFERENCE = ("orjson", "msgspec", "json")
+
+_codec = CODECS["json"]
+
+
+def use_codec(name: str | None = None) -> JsonCodec:
+    """Switch to the named codec, or to the fastest one installed if `name` is None."""
+    global _codec
+    if name is None:
+        name = next(name for name in PREFERENCE if name in CODECS)
+    elif name not in CODECS:
+        raise ValueError(f"JSON codec {name!r} is not available, installed: {', '.join(CODECS)}")
+    _codec = CODECS[name]
+    return _codec
+
+
+def current_codec() -> JsonCodec:
+    return _codec
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode `obj` as compact UTF-8 JSON."""
+    return _codec.dumps(obj)
+
+
+def loads(data: bytes | str) -> Any:
+    return _codec.loads(data)
+
+
+use_codec()
@@ -0,0 +1,174 @@
+"""
+Settings for tuning the server to a deployment.
+
+Every setting has a default, which is overridden, in increasing order of
+precedence, by a JSON config file (`--config` or `ANKI_MCP_CONFIG`), an
+environment variable named `ANKI_MCP_` followed by the setting's name in
+capitals, and a command line flag named like the setting with dashes. Settings
+applied to the MCP app itself, like the output format and profiling, are
+applied by `main` as well.
+
+Settings keep their defaults until `main` loads and applies them with
+`configure`, so invalid values are reported as command line errors rather than
+failing the import. Modules read the settings when they use them, so settings
+applied at startup take effect without patching code.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Literal, Mapping, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+from . import journal as journal_module
+from .backends import check_backends, configure_backends, parse_backends
+from .codec import CODECS, use_codec
+from .journal import DEFAULT_JOURNAL_PATH, WriteJournal
+
+CONFIG_ENV = "ANKI_MCP_CONFIG"
+ENV_PREFIX = "ANKI_MCP_"
+
+# Settings read from environment variables not named after them
+ENV_NAMES = {"backends": "ANKI_CONNECT_BACKENDS", "json_codec": "ANKI_MCP_JSON"}
+
+
+class ConfigError(ValueError):
+    """The configuration can't be read or holds an invalid setting."""
+
+
+class Settings(BaseModel):
+    model_config = ConfigDict(extra="forbid", validate_assignment=True)
+
+    # Anki Connect
+    backends: Optional[Dict[str, str]] = Field(None, description="Anki Connect URL of every backend by name")
+    anki_connect_version: int = Field(6, ge=1, description="Anki Connect API version requested")
+    default_deck: str = Field("Default", min_length=1, description="Deck of notes added without one")
+    default_model: str = Field("Basic", min_length=1, description="Model of notes added without one")
+
+    # Requests
+    connect_timeout: float = Field(3.0, gt=0, description="Seconds to wait for a connection to Anki Connect")
+    read_timeout: float = Field(30.0, gt=0, description="Seconds to wait for Anki Connect to respond")
+    retry_attempts: int = Field(3, ge=1, description="Attempts per request, including the first")
+    backoff_base: float = Field(0.25, ge=0, description="Seconds to wait before the first retry, doubled with every retry")
+    backoff_max: float = Field(4.0, ge=0, description="Upper bound for a single wait between retries in seconds")
+    failure_threshold: int = Field(5, ge=1, description="Consecutive failures after which requests to a backend fail fast")
+    recovery_timeout: float = Field(10.0, gt=0, description="Seconds to fail fast before probing a failed backend again")
+
+    # Connection pool and concurrency
+    max_in_flight: int = Field(2, ge=1, description="Concurrent requests sent to each backend")
+    max_connections: int = Field(100, ge=1, description="Open connections to each backend")
+    max_keepalive_connections: int = Field(20, ge=0, description="Idle connections kept open to each backend")
+    keepalive_expiry: float = Field(5.0, ge=0, description="Seconds an idle connection is kept open")
+    max_running_jobs: int = Field(2, ge=1, description="Background jobs running at once")
+    max_finished_jobs: int = Field(100, ge=1, description="Finished background jobs kept for get-job-status")
+    max_parallel_uploads: int = Field(4, ge=1, description="Media files uploaded at the same time")
+
+    # Caches
+    cache_ttl: float = Field(30.0, ge=0, description="Seconds results derived from the collection are cached")
+    media_manifest_ttl: float = Field(30.0, ge=0, description="Seconds the list of stored media files is cached")
+    max_cached_fields: int = Field(10_000, ge=0, description="Normalized note fields kept in memory")
+
+    # Batch sizes
+    import_batch_size: int = Field(250, ge=1, description="Rows added per request by import-notes")
+    tag_batch_size: int = Field(1000, ge=1, description="Notes tagged per request by add-tags, remove-tags and rename-tag")
+    change_deck_batch_size: int = Field(1000, ge=1, description="Cards moved per request by change-deck")
+    replace_batch_size: int = Field(500, ge=1, description="Notes updated per request by find-and-replace-fields")
+    analyze_batch_size: int = Field(500, ge=1, description="Cards fetched per cardsInfo request by analyze-cards")
+
+    # Output and state
+    output_format: Literal["text", "json"] = Field(
+        "text", description="Return human-readable text, or structured JSON content with an output schema for every tool"
+    )
+    json_codec: Optional[str] = Field(
+        None, description="JSON codec for Anki Connect traffic: orjson, msgspec or json, by default the fastest installed"
+    )
+    journal: Path = Field(DEFAULT_JOURNAL_PATH, description="Journal of the idempotency keys of written notes")
+
+    # Profiling
+    profile_dir: Optional[Path] = Field(
+        None, description="Write a cProfile dump of every tool call and the slow-call log to this directory"
+    )
+    slow_call_ms: Optional[float] = Field(
+        None, ge=0, description="Log tool calls taking at least this many milliseconds, with their arguments and a timing breakdown"
+    )
+
+    @field_validator("backends", mode="before")
+    @classmethod
+    def _parse_backends(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            return parse_backends([value])
+        return value
+
+    @field_validator("backends")
+    @classmethod
+    def _check_backends(cls, value: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        if value is not None:
+            check_backends(value)
+        return value
+
+    @field_validator("json_codec")
+    @classmethod
+    def _check_json_codec(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and value not in CODECS:
+            raise ValueError(f"JSON codec {value!r} is not available, installed: {', '.join(CODECS)}")
+        return value
+
+
+def env_name(name: str) -> str:
+    """Name of the environment variable a setting is read from."""
+    return ENV_NAMES.get(name, ENV_PREFIX + name.upper())
+
+
+def load_settings(path: Optional[str] = None, overrides: Optional[Mapping[str, Any]] = None,
+                  environ: Optional[Mapping[str, str]] = None) -> Settings:
+    """Read the settings from a config file, the environment and `overrides`, in increasing precedence.
+
+    Args:
+        path: JSON config file, by default the one named by ANKI_MCP_CONFIG, if any.
+        overrides: Settings given on the command line.
+        environ: Environment variables, by default those of the process.
+
+    Raises:
+        ConfigError: If the config file can't be read or a setting is invalid
+    """
+    environ = os.environ if environ is None else environ
+    values: Dict[str, Any] = {}
+    path = path or environ.get(CONFIG_ENV)
+    if path:
+        values.update(_read_file(Path(path).expanduser()))
+    for name in Settings.model_fields:
+        value = environ.get(env_name(name))
+        if value:
+            values[name] = value
+    values.update(overrides or {})
+    try:
+        return Settings(**values)
+    except ValidationError as e:
+        raise ConfigError("Invalid settings: " + "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        )) from e
+
+
+def _read_file(path: Path) -> Dict[str, Any]:
+    try:
+        values = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"Could not read config file {path}: {e}") from e
+    if not isinstance(values, dict):
+        raise ConfigError(f"Config file {path} must hold a JSON object of settings")
+    return values
+
+
+def configure(new: Settings) -> None:
+    """Apply settings to the running server."""
+    for name in Settings.model_fields:
+        setattr(settings, name, getattr(new, name))
+    if new.backends:
+        configure_backends(new.backends)
+    use_codec(new.json_codec)
+    if journal_module.journal.path != new.journal:
+        journal_module.journal = WriteJournal(new.journal)
+
+
+settings = Settings()
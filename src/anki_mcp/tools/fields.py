@@ -0,0 +1,90 @@
+"""
+Normalization of note field values to plain text.
+
+Field values are HTML, with media referenced by `<img>` tags and `[sound:...]`
+tags, and cloze deletions written as `{{c1::answer::hint}}`. Normalizing a field
+extracts the media file names, renders cloze deletions as their answer, turns
+block-level tags into line breaks, strips the other tags, decodes entities and
+collapses whitespace.
+
+Results are memoized by field content, since the same values recur across
+notes (empty fields, shared answers) and across calls paging through a query.
+"""
+
+import hashlib
+import html
+import re
+from collections import OrderedDict
+from typing import NamedTuple, Tuple, Union
+
+from .config import settings
+
+# Values up to this length are their own memo key. Longer ones are keyed by a
+# digest, so the memo doesn't keep large fields alive.
+MAX_KEY_LENGTH = 64
+
+# Characters that start markup. Values without any only have their whitespace collapsed.
+_MARKUP = re.compile(r"[<&\[{]")
+
+_SCRIPT = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+# Media in the order it appears, [sound:...] and tags mixed
+_MEDIA = re.compile(
+    r"""\[sound:([^\]]+)\]"""
+    r"""|<(?:img|audio|video|source)\b[^>]*?\bsrc\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))[^>]*>""",
+    re.IGNORECASE,
+)
+_CLOZE = re.compile(r"\{\{c\d+::(.*?)(?:::[^{}]*?)?\}\}", re.DOTALL)
+_BREAK = re.compile(r"<br\s*/?>|</?(?:div|p|li|tr|h[1-6]|ul|ol|table|blockquote)\b[^>]*>", re.IGNORECASE)
+_TAG = re.compile(r"<[^>]*>")
+_SPACES = re.compile(r"[ \t\r\f\v\xa0]+")
+_LINE_BREAKS = re.compile(r" ?\n[\s]*")
+
+
+class NormalizedField(NamedTuple):
+    """A field value as plain text, and the media files it references in order."""
+    text: str
+    media: Tuple[str, ...] = ()
+
+
+_cache: "OrderedDict[Union[str, bytes], NormalizedField]" = OrderedDict()
+
+
+def normalize_field(value: str) -> NormalizedField:
+    """Return the plain text of a field value and the media it references."""
+    if not _MARKUP.search(value):
+        return NormalizedField(_collapse_whitespace(value))
+
+    key = value if len(value) <= MAX_KEY_LENGTH else hashlib.blake2b(value.encode(), digest_size=16).digest()
+    normalized = _cache.get(key)
+    if normalized is not None:
+        _cache.move_to_end(key)
+        return normalized
+
+    normalized = _cache[key] = _normalize(value)
+    if len(_cache) > settings.max_cached_fields:
+        _cache.popitem(last=False)
+    return normalized
+
+
+def clear_cache() -> None:
+    _cache.clear()
+
+
+def _normalize(value: str) -> NormalizedField:
+    media = []
+
+    def extract(match: re.Match) -> str:
+        media.append(html.unescape(next(group for group in match.groups() if group is not None)))
+        return " "
+
+    text = _COMMENT.sub("", _SCRIPT.sub("", value))
+    text = _MEDIA.sub(extract, text)
+    text = _CLOZE.sub(r"\1", text)
+    text = _BREAK.sub("\n", text)
+    text = html.unescape(_TAG.sub("", text))
+    return NormalizedField(_collapse_whitespace(text), tuple(media))
+
+
+def _collapse_whitespace(text: str) -> str:
+    return _LINE_BREAKS.sub("\n", _SPACES.sub(" ", text)).strip()
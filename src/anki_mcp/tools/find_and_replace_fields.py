@@ -0,0 +1,187 @@
+import re
+from contextlib import aclosing
+from typing import Dict, List, Optional
+
+import mcp.types as types
+from pydantic import BaseModel
+
+from .config import settings
+from .output import BackgroundOutput, failure, json_output, structured
+from .progress import report_progress
+from .utils import AnkiConnectError, make_anki_request, stream_anki_request
+
+# Changes shown in a dry run, and failed notes listed in the result
+MAX_LISTED = 10
+
+# Characters of a field value shown around a change
+PREVIEW_CONTEXT = 40
+
+
+class FieldChange(BaseModel):
+    note_id: int
+    field: str
+    before: str
+    after: str
+
+
+class ChunkResult(BaseModel):
+    notes: int
+    updated: int
+    failed: int
+
+
+class FindAndReplaceOutput(BackgroundOutput):
+    dry_run: bool = False
+    matched_notes: int = 0
+    changed_notes: int = 0
+    replacements: int = 0
+    updated: int = 0
+    failed: int = 0
+    chunks: List[ChunkResult] = []
+    changes: List[FieldChange] = []
+    errors: List[str] = []
+
+
+async def find_and_replace_fields(
+    find: str,
+    replace: str,
+    note_ids: Optional[List[int]] = None,
+    query: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    regex: bool = False,
+    match_case: bool = True,
+    dry_run: bool = False,
+) -> list[types.TextContent]:
+    """Find and replace text in the fields of notes selected by ID or by a query.
+
+    The stored HTML of the fields is searched. Only notes with a change are
+    updated, in chunks.
+
+    Args:
+        find: Text to find, or a regular expression with regex.
+        replace: Replacement text. With regex, it can refer to groups as \\1 or \\g<name>.
+        note_ids: Notes to change.
+        query: Anki search query selecting the notes to change, instead of note_ids.
+        fields: Only change these fields (default: all fields).
+        regex: Treat find as a Python regular expression.
+        match_case: Match the case of find (default true).
+        dry_run: Only report what would change, with a preview of the first changes.
+
+    Returns:
+        TextContent with the number of notes updated per chunk.
+    """
+    if not find:
+        return failure("No text to find provided.")
+    if (note_ids is None) == (query is None):
+        return failure("Provide either note_ids or query.")
+    try:
+        pattern = re.compile(find if regex else re.escape(find), 0 if match_case else re.IGNORECASE)
+    except re.error as e:
+        return failure(f"Invalid regular expression: {e}")
+    if not regex:
+        # Replace literally, without interpreting backslashes
+        replace = replace.replace("\\", "\\\\")
+
+    # Notes are matched while they stream in, keeping only the changed fields
+    updates: List[Dict] = []
+    changes: List[dict] = []
+    matched = replacements = 0
+    selection = {"notes": note_ids} if note_ids is not None else {"query": query}
+    try:
+        async with aclosing(stream_anki_request("notesInfo", **selection)) as stream:
+            async for note in stream:
+                if note is None:
+                    continue
+                matched += 1
+                changed: Dict[str, str] = {}
+                for name, value in zip(note.field_names, note.field_values):
+                    if fields is not None and name not in fields:
+                        continue
+                    new_value, count = pattern.subn(replace, value)
+                    if count and new_value != value:
+                        changed[name] = new_value
+                        replacements += count
+                        if len(changes) < MAX_LISTED:
+                            changes.append(_change(note.note_id, name, value, new_value, pattern, replace))
+                if changed:
+                    updates.append({"id": note.note_id, "fields": changed})
+    except AnkiConnectError as e:
+        return failure(f"Failed to retrieve notes: {e}")
+    except re.error as e:
+        return failure(f"Invalid replacement: {e}")
+
+    chunks: List[dict] = []
+    errors: List[str] = []
+    if not dry_run:
+        for start in range(0, len(updates), settings.replace_batch_size):
+            chunk = updates[start:start + settings.replace_batch_size]
+            # multi reports the outcome of every note, so one failed note doesn't hide the others.
+            # Without a version, Anki Connect returns the bare result of each action, dropping errors.
+            result = await make_anki_request("multi", actions=[
+                {"action": "updateNoteFields", "version": settings.anki_connect_version, "params": {"note": note}}
+                for note in chunk
+            ])
+            if not result["success"]:
+                return failure(f"Failed to update notes after {start} of {len(updates)} notes: {result['error']}")
+            failed = 0
+            for note, outcome in zip(chunk, result["result"]):
+                if outcome.get("error"):
+                    failed += 1
+                    if len(errors) < MAX_LISTED:
+                        errors.append(f"Note {note['id']}: {outcome['error']}")
+            chunks.append({"notes": len(chunk), "updated": len(chunk) - failed, "failed": failed})
+            done = start + len(chunk)
+            await report_progress(done, len(updates), f"Updated {done} of {len(updates)} notes")
+
+    updated = sum(chunk["updated"] for chunk in chunks)
+    failed = sum(chunk["failed"] for chunk in chunks)
+
+    if json_output():
+        return structured({
+            "dry_run": dry_run,
+            "matched_notes": matched,
+            "changed_notes": len(updates),
+            "replacements": replacements,
+            "updated": updated,
+            "failed": failed,
+            "chunks": chunks,
+            "changes": changes,
+            "errors": errors,
+        })
+
+    if not updates:
+        return [types.TextContent(type="text", text=f"No matches for '{find}' in {matched} note(s).")]
+
+    summary = f"{replacements} replacement(s) in {len(updates)} of {matched} note(s)"
+    if dry_run:
+        lines = [f"Dry run: would make {summary}."]
+        lines.extend(f"- Note {change['note_id']}, {change['field']}: '{change['before']}' -> '{change['after']}'"
+                     for change in changes)
+        more = len(updates) - len({change["note_id"] for change in changes})
+        if more:
+            lines.append(f"... and changes in {more} more note(s)")
+        return [types.TextContent(type="text", text="\n".join(lines))]
+
+    lines = [f"Made {summary}: {updated} updated, {failed} failed."]
+    if len(chunks) > 1:
+        lines.append("Chunks: " + ", ".join(f"{chunk['updated']}/{chunk['notes']}" for chunk in chunks))
+    lines.extend(f"- {error}" for error in errors)
+    return [types.TextContent(type="text", text="\n".join(lines))]
+
+
+def _change(note_id: int, field: str, before: str, after: str, pattern: re.Pattern, replace: str) -> dict:
+    """Preview a field change around its first match, which starts at the same place in both values."""
+    match = pattern.search(before)
+    start = max(0, match.start() - PREVIEW_CONTEXT)
+    return {
+        "note_id": note_id,
+        "field": field,
+        "before": _excerpt(before, start, match.end()),
+        "after": _excerpt(after, start, match.start() + len(match.expand(replace))),
+    }
+
+
+def _excerpt(value: str, start: int, end: int) -> str:
+    end = min(len(value), end + PREVIEW_CONTEXT)
+    text = value[start:end].replace("\n", "\\n")
+    return ("..." if start else "") + text + ("..." if end < len(value) else "")
@@ -1,28 +1,73 @@
 import mcp.types as types
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from .budget import TokenBudget, decode_cursor, encode_cursor, estimate_tokens
+from .output import failure, json_output, structured
 from .utils import make_anki_request
 
 
-async def find_cards(query: str, limit: int = 100) -> list[types.TextContent]:
+class FindCardsOutput(BaseModel):
+    query: str
+    total: int
+    truncated: bool
+    card_ids: List[int]
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to continue after the returned card IDs")
+
+
+async def find_cards(
+    query: str,
+    limit: int = 100,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> list[types.TextContent]:
     """Find cards matching a query in Anki.
 
     Args:
         query: Anki search query (e.g., "deck:Default", "is:suspended").
         limit: Maximum number of card IDs to return (default 100).
+        max_tokens: Stop adding card IDs once the result would exceed about this many tokens.
+        cursor: Continue after the card IDs returned by an earlier call with the same query.
 
     Returns:
-        TextContent with matching card IDs.
+        TextContent with matching card IDs, and a cursor if more cards match.
     """
+    if max_tokens is not None and max_tokens < 1:
+        return failure("max_tokens must be at least 1.")
+    try:
+        offset = decode_cursor(cursor, _scope(query)) if cursor else 0
+    except ValueError as e:
+        return failure(f"Invalid cursor: {e}")
+
     result = await make_anki_request("findCards", query=query)
 
     if not result["success"]:
-        return [
-            types.TextContent(
-                type="text",
-                text=f"Failed to find cards: {result['error']}",
-            )
-        ]
+        return failure(f"Failed to find cards: {result['error']}")
 
     card_ids = result["result"]
+    total_count = len(card_ids)
+    limited_ids = card_ids[offset:offset + limit]
+
+    budget = TokenBudget(max_tokens)
+    if budget.limited:
+        shown = 0
+        for card_id in limited_ids:
+            # An ID and the separator around it, in both output formats
+            if not budget.take(estimate_tokens(str(card_id)) + 1):
+                break
+            shown += 1
+        limited_ids = limited_ids[:shown]
+
+    end = offset + len(limited_ids)
+    next_cursor = encode_cursor(_scope(query), end) if end < total_count else None
+
+    if json_output():
+        return structured({
+            "query": query,
+            "total": total_count,
+            "truncated": next_cursor is not None,
+            "card_ids": limited_ids,
+            "next_cursor": next_cursor,
+        })
 
     if not card_ids:
         return [
@@ -32,19 +77,29 @@ async def find_cards(query: str, limit: int = 100) -> list[types.TextContent]:
             )
         ]
 
-    total_count = len(card_ids)
-    limited_ids = card_ids[:limit]
-
-    if total_count > limit:
-        header = f"Showing {len(limited_ids)} of {total_count} card IDs matching query: '{query}' (use a more specific query or increase limit to see more)"
-    else:
+    if next_cursor is None and not offset:
         header = f"Found {total_count} card(s) matching query: '{query}'"
+    else:
+        header = f"Showing {len(limited_ids)} of {total_count} card IDs matching query: '{query}'"
+        if offset:
+            header += f", starting at card {offset + 1}"
+        if len(limited_ids) < min(limit, total_count - offset):
+            header += f" (limited to about {max_tokens} tokens)"
+        elif next_cursor is not None:
+            header += " (use a more specific query or increase limit to see more)"
 
     card_ids_text = "\n".join(str(cid) for cid in limited_ids)
+    text = f"{header}\n\nCard IDs:\n{card_ids_text}"
+    if next_cursor is not None:
+        text += f"\n\nTo see more, call again with cursor '{next_cursor}'."
 
     return [
         types.TextContent(
             type="text",
-            text=f"{header}\n\nCard IDs:\n{card_ids_text}",
+            text=text,
         )
     ]
+
+
+def _scope(query: str) -> str:
+    return f"find-cards:{query}"
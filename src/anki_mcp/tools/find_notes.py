@@ -1,60 +1,199 @@
 import mcp.types as types
-from .utils import make_anki_request
+from contextlib import aclosing
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+from . import codec
+from .budget import TokenBudget, decode_cursor, encode_cursor, estimate_tokens
+from .fields import normalize_field
+from .metrics import metrics
+from .output import failure, json_output, structured
+from .records import NoteInfo
+from .utils import AnkiConnectError, make_anki_request, stream_anki_request
 from datetime import datetime
 
 
-def _format_note(note: dict) -> str:
+def _format_note(note: NoteInfo, raw: bool = False) -> str:
     """Format a single note for display."""
-    tags = ", ".join(note["tags"]) if note["tags"] else "(no tags)"
-    mod_time = datetime.fromtimestamp(note["mod"]).strftime("%Y-%m-%d %H:%M:%S")
+    tags = ", ".join(note.tags) if note.tags else "(no tags)"
+    mod_time = datetime.fromtimestamp(note.mod).strftime("%Y-%m-%d %H:%M:%S")
 
+    values, media = _field_values(note, raw)
     fields_text = [
-        f"  - {name}: {data['value']}"
-        for name, data in note["fields"].items()
+        f"  - {name}: " + value.replace("\n", "\n    ")
+        for name, value in zip(note.field_names, values)
     ]
+    media_text = f"Media: {', '.join(media)}\n" if media else ""
 
     return (
-        f"Note ID: {note['noteId']}\n"
-        f"Model: {note['modelName']}\n"
+        f"Note ID: {note.note_id}\n"
+        f"Model: {note.model_name}\n"
         f"Tags: {tags}\n"
         f"Modified: {mod_time}\n"
-        f"Fields:\n" + "\n".join(fields_text) + "\n"
+        f"Fields:\n" + "\n".join(fields_text) + "\n" + media_text
     )
 
 
-async def find_notes(query: str, limit: int = 20) -> list[types.TextContent]:
-    result = await make_anki_request("notesInfo", query=query)
+def _field_values(note: NoteInfo, raw: bool) -> tuple[List[str], List[str]]:
+    """Return the note's field values, as plain text unless `raw`, and the media files they reference."""
+    values = []
+    media: Dict[str, None] = {}
+    for value in note.field_values:
+        normalized = normalize_field(value)
+        values.append(value if raw else normalized.text)
+        media.update(dict.fromkeys(normalized.media))
+    return values, list(media)
 
-    if not result["success"]:
-        return [
-            types.TextContent(
-                type="text",
-                text=f"Failed to retrieve notes: {result['error']}",
-            )
-        ]
 
-    notes = result["result"]
+class FoundNote(BaseModel):
+    note_id: int
+    model: str
+    tags: List[str]
+    modified: int
+    fields: Dict[str, str]
+    media: List[str] = Field(description="Media files referenced by the fields")
+
+
+class FindNotesOutput(BaseModel):
+    query: str
+    total: Optional[int] = Field(description="Number of matching notes, None if it couldn't be determined")
+    truncated: bool = Field(description="Whether more notes match than were returned")
+    notes: List[FoundNote]
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to continue after the returned notes")
+
+
+async def find_notes(
+    query: str,
+    limit: int = 20,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+    raw: bool = False,
+) -> list[types.TextContent]:
+    """Find notes matching a query in Anki.
+
+    Field values are returned as plain text: HTML tags are stripped, entities
+    decoded and cloze deletions shown as their answer. Referenced images and
+    sounds are listed as media.
+
+    Args:
+        query: Anki search query (e.g., "deck:Default", "tag:verb").
+        limit: Maximum number of notes to return (default 20).
+        max_tokens: Stop adding notes once the result would exceed about this many tokens.
+        cursor: Continue after the notes returned by an earlier call with the same query.
+        raw: Return the field values as stored, with their HTML.
+
+    Returns:
+        TextContent with the matching notes, and a cursor if more notes match.
+    """
+    if max_tokens is not None and max_tokens < 1:
+        return failure("max_tokens must be at least 1.")
+    try:
+        offset = decode_cursor(cursor, _scope(query)) if cursor else 0
+    except ValueError as e:
+        return failure(f"Invalid cursor: {e}")
+
+    total = None
+    if offset:
+        # Continuing: look up the IDs and only fetch the notes of this page
+        ids = await make_anki_request("findNotes", query=query)
+        if not ids["success"]:
+            return failure(f"Failed to retrieve notes: {ids['error']}")
+        total = len(ids["result"])
+        page_ids = ids["result"][offset:offset + limit + 1]
+        source = stream_anki_request("notesInfo", notes=page_ids) if page_ids else None
+    else:
+        source = stream_anki_request("notesInfo", query=query)
+
+    # Stream the notes and stop reading once one more than the limit arrived, so
+    # large matches are never held in memory as a whole
+    notes = []
+    if source is not None:
+        try:
+            async with aclosing(source) as stream:
+                async for note in stream:
+                    if note is None:
+                        continue
+                    notes.append(note)
+                    if len(notes) > limit:
+                        break
+        except AnkiConnectError as e:
+            return failure(f"Failed to retrieve notes: {e}")
+
+    truncated = len(notes) > limit
+    limited_notes = notes[:limit]
+    if total is None:
+        total = len(notes)
+        if truncated:
+            # Only the IDs are needed for the total
+            ids = await make_anki_request("findNotes", query=query)
+            total = len(ids["result"]) if ids["success"] else None
+
+    budget = TokenBudget(max_tokens)
+    if json_output():
+        items = []
+        for note in limited_notes:
+            values, media = _field_values(note, raw)
+            item = {"note_id": note.note_id, "model": note.model_name, "tags": list(note.tags),
+                    "modified": note.mod, "fields": dict(zip(note.field_names, values)), "media": media}
+            if budget.limited and not budget.take(estimate_tokens(codec.dumps(item).decode())):
+                break
+            items.append(item)
+        next_cursor = _next_cursor(query, offset, len(items), total, truncated)
+        return structured({
+            "query": query,
+            "total": total,
+            "truncated": next_cursor is not None,
+            "notes": items,
+            "next_cursor": next_cursor,
+        })
 
     if not notes:
         return [
             types.TextContent(
                 type="text",
-                text=f"No notes found matching query: '{query}'",
+                text=f"No notes found matching query: '{query}'" if not offset
+                else f"No more notes matching query: '{query}'",
             )
         ]
 
-    total_count = len(notes)
-    limited_notes = notes[:limit]
-    notes_info = [_format_note(note) for note in limited_notes]
+    notes_info = []
+    with metrics.timed("find_notes.format"):
+        for note in limited_notes:
+            text = _format_note(note, raw)
+            if budget.limited and not budget.take(estimate_tokens(text)):
+                break
+            notes_info.append(text)
 
-    if total_count > limit:
-        header = f"Showing {len(limited_notes)} of {total_count} notes matching query: '{query}' (use a more specific query or increase limit to see more)"
+    next_cursor = _next_cursor(query, offset, len(notes_info), total, truncated)
+    if next_cursor is None and not offset:
+        header = f"Found {len(notes)} notes matching query: '{query}'"
     else:
-        header = f"Found {total_count} notes matching query: '{query}'"
+        shown_total = total if total is not None else f"more than {limit}"
+        header = f"Showing {len(notes_info)} of {shown_total} notes matching query: '{query}'"
+        if offset:
+            header += f", starting at note {offset + 1}"
+        if len(notes_info) < len(limited_notes):
+            header += f" (limited to about {max_tokens} tokens)"
+        elif next_cursor is not None:
+            header += " (use a more specific query or increase limit to see more)"
 
+    text = header + "\n\n" + "\n\n".join(notes_info)
+    if next_cursor is not None:
+        text += f"\n\nTo see more, call again with cursor '{next_cursor}'."
     return [
         types.TextContent(
             type="text",
-            text=header + "\n\n" + "\n\n".join(notes_info),
+            text=text,
         )
     ]
+
+
+def _scope(query: str) -> str:
+    return f"find-notes:{query}"
+
+
+def _next_cursor(query: str, offset: int, shown: int, total: Optional[int], truncated: bool) -> Optional[str]:
+    """Return the cursor continuing after the shown notes, or None if none are left."""
+    end = offset + shown
+    if (total is not None and end < total) or (total is None and truncated):
+        return encode_cursor(_scope(query), end)
+    return None
@@ -1,105 +1,241 @@
+import asyncio
+
 import mcp.types as types
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
 
+from . import codec
+from .budget import TokenBudget, decode_cursor, encode_cursor, estimate_tokens
+from .output import failure, json_output, structured
 from .utils import make_anki_request
 
-async def get_collection_overview() -> list[types.TextContent]:
+SECTIONS = ("decks", "models", "tags", "fields")
+
+# Tags listed by default. The others are summarized by their top-level tag.
+DEFAULT_TAG_LIMIT = 100
+
+# Top-level tags listed in the summary of the tags left out
+MAX_TAG_GROUPS = 10
+
+
+class ModelFields(BaseModel):
+    fields: List[str] = []
+    descriptions: List[str] = []
+    error: Optional[str] = None
+
+
+class CollectionOverviewOutput(BaseModel):
+    decks: Optional[List[str]] = None
+    models: Optional[Dict[str, ModelFields]] = None
+    tags: Optional[List[str]] = None
+    tags_total: Optional[int] = None
+    more_tags: Optional[Dict[str, int]] = Field(
+        None, description="Number of tags left out by tag_limit, by top-level tag",
+    )
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to continue after the returned items")
+
+
+async def get_collection_overview(
+    sections: Optional[List[str]] = None,
+    models: Optional[List[str]] = None,
+    tag_limit: Optional[int] = DEFAULT_TAG_LIMIT,
+    max_tokens: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> list[types.TextContent]:
     """
     Get comprehensive information about the Anki collection:
     - Available decks
     - Available note models
-    - Fields for each model
     - Tags used
-    
+    - Fields for each model
+
+    Only the requested sections are fetched, and the requests for them are sent
+    concurrently. With max_tokens, items are listed until the result would
+    exceed about that many tokens, followed by a cursor to continue.
+
+    Args:
+        sections: Sections to include, out of "decks", "models", "tags" and "fields" (default all).
+        models: Only list these models and their fields.
+        tag_limit: Maximum number of tags listed (default 100, None for all). The
+            others are summarized by their top-level tag.
+        max_tokens: Stop adding items once the result would exceed about this many tokens.
+        cursor: Continue after the items returned by an earlier call with the same arguments.
+
     Returns a list of TextContent objects with formatted information.
     """
-    results = []
-    
-    # Get decks
-    decks_result = await make_anki_request("deckNames")
-    if not decks_result["success"]:
-        return [types.TextContent(
-            type="text", 
-            text=f"\nFailed to retrieve decks: {decks_result['error']}"
-        )]
-        
-    decks = decks_result["result"]
-    results.append(
-        types.TextContent(
-            type="text",
-            text=f"\nAvailable decks in Anki ({len(decks)}):\n" + 
-                 "\n".join(f"- {deck}" for deck in decks)
-        )
+    selected = SECTIONS if sections is None else tuple(sections)
+    unknown = [section for section in selected if section not in SECTIONS]
+    if unknown:
+        return failure(f"Unknown sections: {', '.join(unknown)}. Valid sections: {', '.join(SECTIONS)}")
+    if tag_limit is not None and tag_limit < 0:
+        return failure("tag_limit must be at least 0.")
+    if max_tokens is not None and max_tokens < 1:
+        return failure("max_tokens must be at least 1.")
+    scope = _scope(selected, models, tag_limit)
+    try:
+        position = decode_cursor(cursor, scope) if cursor else [0, 0]
+        section, item = position
+    except (ValueError, TypeError) as e:
+        return failure(f"Invalid cursor: {e}")
+
+    # The model names are only needed if they are listed, or to find the models
+    # whose fields to show
+    need_models = "models" in selected or ("fields" in selected and models is None)
+    decks_result, models_result, tags_result = await asyncio.gather(
+        _request_if("decks" in selected, "deckNames"),
+        _request_if(need_models, "modelNames"),
+        _request_if("tags" in selected, "getTags"),
     )
-    
-    # Get models
-    models_result = await make_anki_request("modelNames")
-    if not models_result["success"]:
-        return [types.TextContent(
-            type="text",
-            text=f"\nFailed to retrieve models: {models_result['error']}"
-        )]
-        
-    models = models_result["result"]
-    results.append(
-        types.TextContent(
-            type="text",
-            text=f"\nAvailable note models in Anki ({len(models)}):\n" + 
-                 "\n".join(f"- {model}" for model in models)
+    for name, result in (("decks", decks_result), ("models", models_result), ("tags", tags_result)):
+        if result is not None and not result["success"]:
+            return failure(f"\nFailed to retrieve {name}: {result['error']}")
+
+    decks = decks_result["result"] if decks_result else []
+    model_names = [name for name in models_result["result"] if models is None or name in models] \
+        if models_result else list(models or [])
+    tags = tags_result["result"] if tags_result else []
+    listed_tags = tags if tag_limit is None else tags[:tag_limit]
+    more_tags = _group_tags(tags[len(listed_tags):])
+
+    # Get field names and descriptions for each model
+    fields = {}
+    if "fields" in selected:
+        results = await asyncio.gather(*(
+            make_anki_request(action, modelName=model_name)
+            for model_name in model_names
+            for action in ("modelFieldNames", "modelFieldDescriptions")
+        ))
+        fields = {model_name: (results[2 * index], results[2 * index + 1])
+                  for index, model_name in enumerate(model_names)}
+
+    budget = TokenBudget(max_tokens)
+    if json_output():
+        json_sections = [
+            decks,
+            [(name, _model_data(*fields[name]) if name in fields else {}) for name in model_names]
+            if "models" in selected or "fields" in selected else [],
+            listed_tags,
+        ]
+        pages, next_position = _pack(json_sections, section, item, budget,
+                                     lambda index, value, first: _json_tokens(value))
+        data = {}
+        if "decks" in selected:
+            data["decks"] = pages[0]
+        if "models" in selected or "fields" in selected:
+            data["models"] = dict(pages[1])
+        if "tags" in selected:
+            data["tags"] = pages[2]
+            data["tags_total"] = len(tags)
+            data["more_tags"] = more_tags
+        data["next_cursor"] = encode_cursor(scope, next_position) if next_position else None
+        return structured(data)
+
+    sections_text = []
+    if "decks" in selected:
+        sections_text.append((f"\nAvailable decks in Anki ({len(decks)}):\n", [f"- {deck}" for deck in decks], "\n"))
+    if "models" in selected:
+        sections_text.append(
+            (f"\nAvailable note models in Anki ({len(model_names)}):\n", [f"- {model}" for model in model_names], "\n")
         )
+    if tags:
+        tag_items = list(listed_tags)
+        if more_tags:
+            groups = sorted(more_tags.items(), key=lambda group: (-group[1], group[0]))
+            summary = ", ".join(f"{root} ({count})" for root, count in groups[:MAX_TAG_GROUPS])
+            if len(groups) > MAX_TAG_GROUPS:
+                summary += f", {len(groups) - MAX_TAG_GROUPS} more groups"
+            tag_items.append(f"and {len(tags) - len(listed_tags)} more by top-level tag: {summary}")
+        sections_text.append((f"\nTags used in Anki ({len(tags)}): ", tag_items, ", "))
+    sections_text.extend(_model_section(name, *fields[name]) for name in model_names if name in fields)
+
+    # A header counts towards the first item listed of its section, and sections
+    # that are only a header towards a single empty item
+    pages, next_position = _pack(
+        [items or [""] for _, items, _ in sections_text], section, item, budget,
+        lambda index, text, first: estimate_tokens(text) + 1 + (estimate_tokens(sections_text[index][0]) if first else 0),
     )
+    results = []
+    for index, page in enumerate(pages):
+        if not page:
+            continue
+        header, items, separator = sections_text[index]
+        if index == section and item:
+            head, colon, tail = header.rpartition(":")
+            header = f"{head} (continued){colon}{tail}"
+        results.append(types.TextContent(type="text", text=header + separator.join(page if items else [])))
 
-    tags_result = await make_anki_request("getTags")
-    if not tags_result["success"]:
-        return [types.TextContent(
-            type="text",
-            text=f"\nFailed to retrieve tags: {tags_result['error']}"
-        )]
-    if tags := tags_result["result"]:
+    if next_position:
         results.append(
             types.TextContent(
                 type="text",
-                text=f"\nTags used in Anki ({len(tags)}): {', '.join(tags)}"
+                text=f"\nLimited to about {max_tokens} tokens. To see more, call again with cursor "
+                     f"'{encode_cursor(scope, next_position)}'.",
             )
         )
-    
-    # Get fields for each model
-    for model_name in models:
-        # Get field names
-        names_result = await make_anki_request("modelFieldNames", modelName=model_name)
-        
-        # Get field descriptions
-        descriptions_result = await make_anki_request("modelFieldDescriptions", modelName=model_name)
-        
-        if names_result["success"] and descriptions_result["success"]:
-            field_names = names_result["result"]
-            field_descriptions = descriptions_result["result"]
-            
-            # Combine fields and descriptions
-            field_info = []
-            for name, description in zip(field_names, field_descriptions):
-                desc_text = f": {description}" if description else ""
-                field_info.append(f"  - {name}{desc_text}")
-            
-            results.append(
-                types.TextContent(
-                    type="text",
-                    text=f"\nFields for model '{model_name}' ({len(field_names)}):\n" + 
-                         "\n".join(field_info)
-                )
-            )
-        elif not names_result["success"]:
-            results.append(
-                types.TextContent(
-                    type="text",
-                    text=f"\nFailed to retrieve field names for '{model_name}': {names_result['error']}"
-                )
-            )
-        else:
-            results.append(
-                types.TextContent(
-                    type="text",
-                    text=f"\nFailed to retrieve field descriptions for '{model_name}': {descriptions_result['error']}"
-                )
-            )
-    
-    return results 
\ No newline at end of file
+    return results
+
+
+async def _request_if(needed: bool, action: str) -> Optional[dict]:
+    return await make_anki_request(action) if needed else None
+
+
+def _group_tags(tags: List[str]) -> Dict[str, int]:
+    """Count tags by their top-level tag."""
+    groups: Dict[str, int] = {}
+    for tag in tags:
+        root = tag.partition("::")[0]
+        groups[root] = groups.get(root, 0) + 1
+    return groups
+
+
+def _scope(sections: tuple, models: Optional[List[str]], tag_limit: Optional[int]) -> str:
+    output_format = "json" if json_output() else "text"
+    return f"get-collection-overview:{output_format}:{','.join(sections)}:{models}:{tag_limit}"
+
+
+def _pack(sections: list, section: int, item: int, budget: TokenBudget, cost) -> tuple[list, Optional[List[int]]]:
+    """Take the items of the sections, starting at `item` of `section`, while they fit in the budget.
+
+    `cost(index, item, first)` estimates the tokens of an item of section
+    `index`, `first` telling whether it's the first taken from the section.
+    Returns the items taken from each section, and the position of the first
+    item left out, or None if all were taken.
+    """
+    pages = [[] for _ in sections]
+    for index in range(section, len(sections)):
+        items = sections[index]
+        start = item if index == section else 0
+        for offset in range(start, len(items)):
+            if budget.limited and not budget.take(cost(index, items[offset], offset == start)):
+                return pages, [index, offset]
+            pages[index].append(items[offset])
+    return pages, None
+
+
+def _json_tokens(item) -> int:
+    return estimate_tokens(codec.dumps(item).decode())
+
+
+def _model_data(names_result: dict, descriptions_result: dict) -> dict:
+    if not names_result["success"]:
+        return {"error": f"Failed to retrieve field names: {names_result['error']}"}
+    if not descriptions_result["success"]:
+        return {"fields": names_result["result"],
+                "error": f"Failed to retrieve field descriptions: {descriptions_result['error']}"}
+    return {"fields": names_result["result"], "descriptions": descriptions_result["result"]}
+
+
+def _model_section(model_name: str, names_result: dict, descriptions_result: dict) -> tuple[str, list, str]:
+    if not names_result["success"]:
+        return f"\nFailed to retrieve field names for '{model_name}': {names_result['error']}", [], ""
+    if not descriptions_result["success"]:
+        return (f"\nFailed to retrieve field descriptions for '{model_name}': {descriptions_result['error']}",
+                [], "")
+
+    # Combine fields and descriptions
+    field_names = names_result["result"]
+    field_info = []
+    for name, description in zip(field_names, descriptions_result["result"]):
+        desc_text = f": {description}" if description else ""
+        field_info.append(f"  - {name}{desc_text}")
+    return f"\nFields for model '{model_name}' ({len(field_names)}):\n", field_info, "\n"
@@ -0,0 +1,187 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import mcp.types as types
+from pydantic import BaseModel
+
+from .cache import collection_cache
+from .output import failure, json_output, structured
+from .utils import make_anki_request
+
+DECK_SEPARATOR = "::"
+
+CACHE_KEY = "deck-tree"
+
+
+class DeckTreeNode(BaseModel):
+    name: str
+    full_name: str
+    deck_id: Optional[int]
+    new: int
+    learn: int
+    review: int
+    cards: int
+    own_cards: int
+    children: List["DeckTreeNode"] = []
+
+
+class DeckTreeOutput(BaseModel):
+    decks: int
+    new: int
+    learn: int
+    review: int
+    cards: int
+    tree: List[DeckTreeNode]
+
+
+@dataclass(slots=True)
+class _Deck:
+    """A deck with its due counts, which Anki Connect reports including subdecks,
+    and its number of cards, in the deck itself and including subdecks."""
+    name: str
+    deck_id: Optional[int] = None
+    new: int = 0
+    learn: int = 0
+    review: int = 0
+    own_cards: int = 0
+    cards: int = 0
+    size: int = 1
+    children: List["_Deck"] = field(default_factory=list)
+
+    @property
+    def short_name(self) -> str:
+        return self.name.rpartition(DECK_SEPARATOR)[2]
+
+
+async def get_deck_tree(deck: Optional[str] = None, max_depth: Optional[int] = None) -> list[types.TextContent]:
+    """Get the deck hierarchy with new, learning, review and total card counts per deck.
+
+    The counts of all decks are fetched in one request, and the tree is cached
+    until the next write or for 30 seconds.
+
+    Args:
+        deck: Only show this deck and its subdecks.
+        max_depth: Only show decks up to this many levels below the top (0 shows
+            only the top decks). Counts still include the hidden subdecks.
+
+    Returns:
+        TextContent with the deck tree.
+    """
+    if max_depth is not None and max_depth < 0:
+        return failure("max_depth must be at least 0.")
+
+    tree = collection_cache.get(CACHE_KEY)
+    if tree is None:
+        generation = collection_cache.generation
+        names_result = await make_anki_request("deckNames")
+        if not names_result["success"]:
+            return failure(f"Failed to retrieve decks: {names_result['error']}")
+        stats_result = await make_anki_request("getDeckStats", decks=names_result["result"])
+        if not stats_result["success"]:
+            return failure(f"Failed to retrieve deck statistics: {stats_result['error']}")
+        tree = _build_tree(names_result["result"], stats_result["result"])
+        collection_cache.set(CACHE_KEY, tree, generation)
+
+    if deck is not None:
+        root = tree.get(deck)
+        if root is None:
+            return failure(f"Deck not found: '{deck}'")
+        roots = [root]
+    else:
+        roots = [node for name, node in tree.items() if DECK_SEPARATOR not in name]
+
+    totals = {
+        "decks": sum(root.size for root in roots),
+        "new": sum(root.new for root in roots),
+        "learn": sum(root.learn for root in roots),
+        "review": sum(root.review for root in roots),
+        "cards": sum(root.cards for root in roots),
+    }
+
+    if json_output():
+        return structured({**totals, "tree": [_node_data(root, max_depth) for root in roots]})
+
+    if not roots:
+        return [types.TextContent(type="text", text="No decks found.")]
+
+    title = f"Deck tree of '{deck}'" if deck is not None else "Deck tree"
+    lines = [f"{title} ({totals['decks']} decks): {_counts(totals['new'], totals['learn'], totals['review'], totals['cards'])}"]
+    for root in roots:
+        _format_node(root, 0, max_depth, lines)
+
+    return [
+        types.TextContent(
+            type="text",
+            text="\n".join(lines),
+        )
+    ]
+
+
+def _build_tree(names: List[str], stats: Dict[str, Dict[str, Any]]) -> Dict[str, _Deck]:
+    """Build the deck tree from getDeckStats, keyed by full deck name in sorted order.
+
+    Card totals are added up from the leaves in one pass: descendants sort after
+    their ancestors, so in reverse order every deck is complete before it is
+    added to its parent.
+    """
+    decks: Dict[str, _Deck] = {}
+    for entry in stats.values():
+        decks[entry["name"]] = _Deck(
+            name=entry["name"],
+            deck_id=entry.get("deck_id"),
+            new=entry.get("new_count", 0),
+            learn=entry.get("learn_count", 0),
+            review=entry.get("review_count", 0),
+            own_cards=entry.get("total_in_deck", 0),
+        )
+    # Anki creates the parents of every deck, but don't rely on all of them being listed
+    for name in [*names, *decks]:
+        while name:
+            if name not in decks:
+                decks[name] = _Deck(name=name)
+            name = name.rpartition(DECK_SEPARATOR)[0]
+
+    ordered = sorted(decks)
+    for name in reversed(ordered):
+        node = decks[name]
+        node.cards += node.own_cards
+        node.children.reverse()
+        parent_name = name.rpartition(DECK_SEPARATOR)[0]
+        if not parent_name:
+            continue
+        parent = decks[parent_name]
+        parent.children.append(node)
+        parent.cards += node.cards
+        parent.size += node.size
+        if parent.deck_id is None:
+            # A deck without statistics has no due counts of its own
+            parent.new += node.new
+            parent.learn += node.learn
+            parent.review += node.review
+    return {name: decks[name] for name in ordered}
+
+
+def _format_node(node: _Deck, depth: int, max_depth: Optional[int], lines: List[str]) -> None:
+    lines.append(f"{'  ' * depth}- {node.short_name}: {_counts(node.new, node.learn, node.review, node.cards)}")
+    if max_depth is None or depth < max_depth:
+        for child in node.children:
+            _format_node(child, depth + 1, max_depth, lines)
+
+
+def _node_data(node: _Deck, max_depth: Optional[int], depth: int = 0) -> dict:
+    return {
+        "name": node.short_name,
+        "full_name": node.name,
+        "deck_id": node.deck_id,
+        "new": node.new,
+        "learn": node.learn,
+        "review": node.review,
+        "cards": node.cards,
+        "own_cards": node.own_cards,
+        "children": [_node_data(child, max_depth, depth + 1) for child in node.children]
+        if max_depth is None or depth < max_depth else [],
+    }
+
+
+def _counts(new: int, learn: int, review: int, cards: int) -> str:
+    return f"{new} new, {learn} learning, {review} review, {cards} cards"
@@ -0,0 +1,114 @@
+import time
+from typing import Any, List, Optional
+
+import mcp.types as types
+from pydantic import BaseModel
+
+from .jobs import Job, jobs
+from .output import failure, json_output, structured
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    tool: str
+    status: str
+    progress: Optional[float] = None
+    total: Optional[float] = None
+    message: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    result: Any = None
+
+
+class JobStatusOutput(BaseModel):
+    jobs: List[JobStatus]
+
+
+class CancelJobOutput(BaseModel):
+    job_id: str
+    cancelled: bool
+    status: str
+
+
+async def get_job_status(job_id: str | None = None) -> list[types.TextContent]:
+    """Report the status, progress and result of background jobs.
+
+    Args:
+        job_id: Job to report on. Lists all jobs if omitted.
+
+    Returns:
+        TextContent with the job status, and the result of a finished job.
+    """
+    if job_id is None:
+        listed = jobs.list()
+        if json_output():
+            return structured({"jobs": [_status(job, with_result=False) for job in listed]})
+        if not listed:
+            return [types.TextContent(type="text", text="No background jobs.")]
+        return [
+            types.TextContent(
+                type="text",
+                text="Background jobs (most recent first):\n" + "\n".join(f"  - {_summary(job)}" for job in listed),
+            )
+        ]
+
+    job = jobs.get(job_id)
+    if job is None:
+        return failure(f"Unknown job: {job_id}")
+    if json_output():
+        return structured({"jobs": [_status(job, with_result=True)]})
+
+    text = _summary(job)
+    if job.error:
+        text += f"\nError: {job.error}"
+    if job.result:
+        text += "\n\n" + "\n".join(content.text for content in job.result if isinstance(content, types.TextContent))
+    return [types.TextContent(type="text", text=text)]
+
+
+async def cancel_job(job_id: str) -> list[types.TextContent]:
+    """Cancel a queued or running background job.
+
+    Work the job already completed is kept. Imports and keyed note writes can be
+    resumed by submitting them again.
+
+    Args:
+        job_id: Job to cancel.
+
+    Returns:
+        TextContent indicating whether the job was cancelled.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return failure(f"Unknown job: {job_id}")
+    cancelled = jobs.cancel(job_id)
+    if json_output():
+        return structured({"job_id": job_id, "cancelled": cancelled, "status": job.status})
+    if not cancelled:
+        return [types.TextContent(type="text", text=f"Job {job_id} already {job.status}.")]
+    return [types.TextContent(type="text", text=f"Cancelling job {job_id} ({job.tool}).")]
+
+
+def _status(job: Job, with_result: bool) -> dict:
+    """Return the status of a job for structured output, with its structured result if asked for."""
+    status = {
+        "job_id": job.id, "tool": job.tool, "status": job.status, "progress": job.progress,
+        "total": job.total, "message": job.message, "started_at": job.started_at,
+        "finished_at": job.finished_at, "error": job.error,
+    }
+    if with_result and isinstance(job.result, types.CallToolResult):
+        status["result"] = job.result.structuredContent
+    return status
+
+
+def _summary(job: Job) -> str:
+    parts = [f"Job {job.id} ({job.tool}): {job.status}"]
+    if job.progress is not None:
+        parts.append(f"progress {job.progress:g}" + (f"/{job.total:g}" if job.total else ""))
+    if job.message and not job.finished:
+        parts.append(job.message)
+    if job.started_at is not None:
+        end = job.finished_at or time.time()
+        parts.append(f"{'took' if job.finished else 'running for'} {end - job.started_at:.1f}s")
+    return ", ".join(parts)
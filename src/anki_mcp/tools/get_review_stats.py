@@ -1,9 +1,23 @@
 import mcp.types as types
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
+from pydantic import BaseModel
+from .metrics import metrics
+from .output import failure, json_output, structured
 from .utils import make_anki_request
 
 
+class ReviewDayCount(BaseModel):
+    date: str
+    count: int
+
+
+class ReviewStatsOutput(BaseModel):
+    time_range: str
+    total: int
+    days: List[ReviewDayCount]
+
+
 # Time range to days mapping
 TIME_RANGES = {
     "day": 0,
@@ -35,7 +49,14 @@ async def get_review_stats(time_range: str = "month") -> list[types.TextContent]
     # Filter and format the results
     review_data = review_result["result"]
     filtered_data = _filter_by_date(review_data, cutoff_date)
-    formatted_text = _format_review_data(filtered_data)
+    if json_output():
+        return structured({
+            "time_range": time_range,
+            "total": sum(count for _, count in filtered_data),
+            "days": [{"date": date_str, "count": count} for date_str, count in filtered_data],
+        })
+    with metrics.timed("get_review_stats.format"):
+        formatted_text = _format_review_data(filtered_data)
 
     return [types.TextContent(type="text", text=formatted_text)]
 
@@ -90,7 +111,7 @@ def _format_review_data(filtered_data: list) -> str:
 
 def _error_response(message: str) -> list[types.TextContent]:
     """Create an error response."""
-    return [types.TextContent(type="text", text=message)]
+    return failure(message)
 
 
 def _parse_date(date_str: str) -> datetime.date:
@@ -0,0 +1,129 @@
+import mcp.types as types
+from typing import Any, Dict
+from pydantic import BaseModel
+
+from .metrics import metrics
+from .output import json_output, structured
+from . import backends
+from .backends import default_backend
+from .utils import connection
+
+
+class ServerMetricsOutput(BaseModel):
+    uptime_seconds: float
+    profile: str
+    scheduler: Dict[str, Any]
+    circuit: str
+    actions: Dict[str, Dict[str, float]]
+    tools: Dict[str, Dict[str, float]]
+    stages: Dict[str, Dict[str, float]]
+    reset: bool
+
+
+async def get_server_metrics(reset: bool = False) -> list[types.TextContent]:
+    """Report latency, payload size and error metrics of this server process.
+
+    Args:
+        reset: Clear all recorded metrics after reporting them.
+
+    The scheduler and circuit state are those of the selected profile, while
+    action, tool and stage metrics cover all profiles.
+
+    Returns:
+        TextContent with per-action, per-tool and per-stage metrics.
+    """
+    snapshot = metrics.snapshot()
+    conn = connection()
+    stats = conn.scheduler.stats()
+
+    if json_output():
+        if reset:
+            metrics.reset()
+        return structured({
+            "uptime_seconds": snapshot["uptime_seconds"],
+            "profile": conn.name,
+            "scheduler": stats,
+            "circuit": conn.breaker.state,
+            "actions": snapshot["actions"],
+            "tools": snapshot["tools"],
+            "stages": snapshot["stages"],
+            "reset": reset,
+        })
+
+    lines = [
+        f"Server metrics (uptime {snapshot['uptime_seconds']:.0f}s)",
+        "",
+        *([f"Profile: {conn.name}"] if len(backends.backend_urls) > 1 else []),
+        f"Scheduler: {stats['in_flight']} in flight (max {stats['max_in_flight']}), "
+        f"{stats['queue_depth']} queued (peak {stats['max_queue_depth']}), "
+        f"average wait {_ms(stats['average_wait_seconds'])}, max wait {_ms(stats['max_wait_seconds'])}",
+        f"Anki Connect circuit: {conn.breaker.state}",
+    ]
+
+    lines.append("")
+    lines.append("Anki Connect actions:")
+    if snapshot["actions"]:
+        for action, data in snapshot["actions"].items():
+            lines.append(
+                f"  - {action}: {data['count']} requests, {data['errors']} errors, "
+                f"{data['coalesced']} coalesced, {_latencies(data)}, "
+                f"{_bytes(data['bytes_sent'])} sent, {_bytes(data['bytes_received'])} received"
+            )
+    else:
+        lines.append("  (none)")
+
+    lines.append("")
+    lines.append("Tools:")
+    if snapshot["tools"]:
+        for tool, data in snapshot["tools"].items():
+            lines.append(f"  - {tool}: {data['count']} calls, {data['errors']} errors, {_latencies(data)}")
+    else:
+        lines.append("  (none)")
+
+    if snapshot["stages"]:
+        lines.append("")
+        lines.append("Stages:")
+        for stage, data in snapshot["stages"].items():
+            lines.append(f"  - {stage}: {data['count']} runs, {_latencies(data)}")
+
+    if reset:
+        metrics.reset()
+        lines.append("")
+        lines.append("Metrics have been reset.")
+
+    return [
+        types.TextContent(
+            type="text",
+            text="\n".join(lines),
+        )
+    ]
+
+
+def server_gauges() -> dict[str, float]:
+    """Return the scheduler and circuit breaker state of the default backend as Prometheus gauges."""
+    conn = connection(default_backend())
+    stats = conn.scheduler.stats()
+    return {
+        "anki_mcp_scheduler_in_flight": stats["in_flight"],
+        "anki_mcp_scheduler_queue_depth": stats["queue_depth"],
+        "anki_mcp_scheduler_max_queue_depth": stats["max_queue_depth"],
+        "anki_mcp_scheduler_average_wait_seconds": stats["average_wait_seconds"],
+        "anki_mcp_scheduler_max_wait_seconds": stats["max_wait_seconds"],
+        "anki_mcp_circuit_open": int(conn.breaker.state != conn.breaker.CLOSED),
+    }
+
+
+def _latencies(data: dict) -> str:
+    return f"p50 {_ms(data['p50_seconds'])}, p95 {_ms(data['p95_seconds'])}, p99 {_ms(data['p99_seconds'])}"
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f} ms"
+
+
+def _bytes(count: int) -> str:
+    if count < 1024:
+        return f"{count} B"
+    if count < 1024 * 1024:
+        return f"{count / 1024:.1f} KB"
+    return f"{count / (1024 * 1024):.1f} MB"
@@ -0,0 +1,129 @@
+from typing import List, Optional
+
+import mcp.types as types
+from pydantic import BaseModel
+
+from .output import failure, json_output, structured
+from .tag_index import TagNode, get_tag_index
+from .utils import AnkiConnectError
+
+
+class TagStat(BaseModel):
+    name: str
+    full_name: str
+    notes: int
+    own_notes: int
+    children: List["TagStat"] = []
+
+
+class TagStatsOutput(BaseModel):
+    notes: int
+    tagged_notes: int
+    tags: int
+    shown: int
+    tree: List[TagStat]
+
+
+async def get_tag_stats(
+    tag: Optional[str] = None,
+    max_depth: Optional[int] = None,
+    limit: int = 50,
+) -> list[types.TextContent]:
+    """Get the tag hierarchy with the number of notes per tag, most used tags first.
+
+    The counts include the notes of subtags. They are computed from all notes in
+    one pass and cached until the next write or for 30 seconds.
+
+    Args:
+        tag: Only show this tag and its subtags.
+        max_depth: Only show tags up to this many levels below the top (0 shows
+            only the top-level tags).
+        limit: Maximum number of tags shown (default 50).
+
+    Returns:
+        TextContent with the tag tree and note counts.
+    """
+    if limit < 1:
+        return failure("limit must be at least 1.")
+    if max_depth is not None and max_depth < 0:
+        return failure("max_depth must be at least 0.")
+
+    try:
+        index = await get_tag_index()
+    except AnkiConnectError as e:
+        return failure(f"Failed to retrieve tags: {e}")
+
+    if tag is not None:
+        root = index.tags.get(tag)
+        if root is None:
+            return failure(f"Tag not found: '{tag}'")
+        roots = [root]
+    else:
+        roots = index.roots
+
+    # Most used tags first, then depth first, until the limit
+    shown: List[tuple[int, TagNode]] = []
+    stack = [(0, node) for node in _by_count(roots)][::-1]
+    while stack and len(shown) < limit:
+        depth, node = stack.pop()
+        shown.append((depth, node))
+        if max_depth is None or depth < max_depth:
+            stack.extend((depth + 1, child) for child in reversed(_by_count(node.children)))
+    total = _count_tags(roots)
+
+    if json_output():
+        return structured({
+            "notes": index.notes,
+            "tagged_notes": index.tagged_notes,
+            "tags": total,
+            "shown": len(shown),
+            "tree": _tree_data(shown),
+        })
+
+    if not roots:
+        return [types.TextContent(type="text", text="No tags found.")]
+
+    if tag is not None:
+        header = f"Tag '{tag}' ({total} tags, {roots[0].notes} notes), most used first:"
+    else:
+        header = f"Tags ({total} tags, {index.tagged_notes} of {index.notes} notes tagged), most used first:"
+    lines = [header]
+    for depth, node in shown:
+        lines.append(f"{'  ' * depth}- {node.short_name}: {node.notes} notes"
+                     + (f" ({node.own_notes} tagged directly)" if node.children and node.own_notes else ""))
+    if stack:
+        lines.append("... more tags not shown (increase limit or select a tag to see them)")
+
+    return [
+        types.TextContent(
+            type="text",
+            text="\n".join(lines),
+        )
+    ]
+
+
+def _by_count(nodes: List[TagNode]) -> List[TagNode]:
+    return sorted(nodes, key=lambda node: (-node.notes, node.name))
+
+
+def _count_tags(nodes: List[TagNode]) -> int:
+    count = 0
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+def _tree_data(shown: List[tuple[int, TagNode]]) -> List[dict]:
+    """Nest the shown tags, listed depth first, as in the tag tree."""
+    roots: List[dict] = []
+    path: List[dict] = []
+    for depth, node in shown:
+        data = {"name": node.short_name, "full_name": node.name, "notes": node.notes,
+                "own_notes": node.own_notes, "children": []}
+        del path[depth:]
+        (path[-1]["children"] if path else roots).append(data)
+        path.append(data)
+    return roots
@@ -0,0 +1,299 @@
+import csv
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import mcp.types as types
+
+from .backends import DEFAULT_BACKEND, selected_backend
+from .config import settings
+from .output import BackgroundOutput, failure, json_output, structured
+from .progress import report_progress
+from .utils import make_anki_request
+
+
+# Failed rows listed in the summary
+MAX_REPORTED_ERRORS = 10
+
+FORMATS = {
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".tab": "tsv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+# Directory of import checkpoints, next to the journal
+CHECKPOINT_DIR = "import-checkpoints"
+
+
+class ImportNotesOutput(BackgroundOutput):
+    file: str = ""
+    deck: str = ""
+    completed: bool = False
+    interrupted: Optional[str] = None
+    resumed_from: int = 0
+    rows: int = 0
+    added: int = 0
+    failed: int = 0
+    errors: List[str] = []
+
+
+async def import_notes(
+    path: str,
+    deck: Optional[str] = None,
+    model: Optional[str] = None,
+    field_map: Dict[str, str] | None = None,
+    tags: List[str] | None = None,
+    allow_duplicates: bool = False,
+    restart: bool = False,
+) -> list[types.TextContent]:
+    """Import notes from a local CSV, TSV or JSONL file.
+
+    Rows are read and added in chunks of the `import_batch_size` setting, and
+    progress is saved to a checkpoint file in the directory of the journal after
+    every chunk, so an interrupted import resumes where it stopped when run again. The next
+    chunk is only read once the previous one was added, so memory stays bounded
+    by the chunk size.
+
+    Args:
+        path: Path of the file to import. The format is taken from the extension
+            (.csv, .tsv, .jsonl).
+        deck: Deck to add the notes to, by default the configured default deck.
+        model: Model of the notes, by default the configured default model.
+        field_map: Maps columns to model fields. By default, columns named like a
+            field of the model (ignoring case) are used.
+        tags: Tags added to every note, in addition to a "tags" column.
+        allow_duplicates: Add notes even if their first field duplicates an existing note.
+        restart: Ignore an existing checkpoint and import from the first row.
+
+    Returns:
+        TextContent summarizing the import.
+    """
+    deck = deck or settings.default_deck
+    model = model or settings.default_model
+    file = Path(path).expanduser()
+    file_format = FORMATS.get(file.suffix.lower())
+    if file_format is None:
+        return failure(f"Unsupported file type '{file.suffix}', expected one of: {', '.join(FORMATS)}")
+    if not file.is_file():
+        return failure(f"File not found: {file}")
+
+    fields_result = await make_anki_request("modelFieldNames", modelName=model)
+    if not fields_result["success"]:
+        return failure(f"Failed to get fields of model '{model}': {fields_result['error']}")
+    model_fields = fields_result["result"]
+
+    options = {"deck": deck, "model": model, "field_map": field_map, "tags": tags,
+               "allow_duplicates": allow_duplicates}
+    checkpoint = _Checkpoint(file, options)
+    if restart:
+        checkpoint.clear()
+    else:
+        checkpoint.load()
+
+    rows = _read_rows(file, file_format)
+    try:
+        columns = None
+        chunk: List[Dict[str, Any]] = []
+        row_number = 0
+        for row_number, row in enumerate(rows, start=1):
+            if columns is None:
+                columns = _map_columns(list(row), model_fields, field_map)
+                if not columns:
+                    return failure(
+                        f"No columns of {file.name} match the fields of model '{model}' "
+                        f"({', '.join(model_fields)}). Use field_map to map columns to fields."
+                    )
+            if row_number <= checkpoint.rows:
+                continue
+            chunk.append(_note(row, columns, deck, model, tags, allow_duplicates))
+            if len(chunk) == settings.import_batch_size:
+                if not await _add_chunk(chunk, checkpoint):
+                    break
+                chunk = []
+        else:
+            if chunk:
+                await _add_chunk(chunk, checkpoint)
+    except CheckpointError as e:
+        return failure(
+            f"Stopped importing {file.name}: {e}\n{checkpoint.added} notes were already added and may be "
+            f"added again when the import is run again.\n\n{checkpoint.summary()}"
+        )
+    except (OSError, ValueError, csv.Error) as e:
+        return failure(f"Failed to read {file.name} at row {row_number}: {e}\n\n{checkpoint.summary()}")
+    finally:
+        rows.close()
+
+    if json_output():
+        if not checkpoint.interrupted:
+            checkpoint.clear()
+        return structured({"file": str(file), "deck": deck, "completed": not checkpoint.interrupted,
+                           **checkpoint.data()})
+
+    if checkpoint.interrupted:
+        return _text(
+            f"Import of {file.name} stopped after {checkpoint.rows} rows: {checkpoint.interrupted}\n"
+            f"Run the import again to resume from row {checkpoint.rows + 1}.\n\n{checkpoint.summary()}"
+        )
+
+    checkpoint.clear()
+    return _text(f"Imported {file.name} into deck '{deck}'.\n\n{checkpoint.summary()}")
+
+
+async def _add_chunk(chunk: List[Dict[str, Any]], checkpoint: "_Checkpoint") -> bool:
+    """Add a chunk of notes and save the checkpoint. Returns False if the import has to stop."""
+    # multi reports the result of every note, whereas addNotes fails as a whole
+    # on some Anki Connect versions when any note can't be added. Without a
+    # version, Anki Connect returns the bare result of each action, dropping errors.
+    result = await make_anki_request("multi", actions=[
+        {"action": "addNote", "version": settings.anki_connect_version, "params": {"note": note}}
+        for note in chunk
+    ])
+    if not result["success"]:
+        checkpoint.interrupted = result["error"]
+        checkpoint.save()
+        return False
+
+    for offset, outcome in enumerate(result["result"]):
+        # Each action's outcome is an object with either a result or error field
+        if outcome.get("error") or outcome.get("result") is None:
+            checkpoint.record_failure(checkpoint.rows + offset + 1, outcome.get("error") or "note was not added")
+        else:
+            checkpoint.added += 1
+    checkpoint.rows += len(chunk)
+    checkpoint.save()
+    await report_progress(checkpoint.rows, None, f"Imported {checkpoint.rows} rows")
+    return True
+
+
+def _read_rows(file: Path, file_format: str) -> Iterator[Dict[str, Any]]:
+    """Yield the rows of the file one at a time."""
+    if file_format == "jsonl":
+        with open(file, encoding="utf-8-sig") as f:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    row = json.loads(line)
+                    if not isinstance(row, dict):
+                        raise ValueError(f"line {line_number} is not a JSON object")
+                    yield row
+    else:
+        with open(file, encoding="utf-8-sig", newline="") as f:
+            yield from csv.DictReader(f, delimiter="\t" if file_format == "tsv" else ",")
+
+
+def _map_columns(header: List[str], model_fields: List[str], field_map: Dict[str, str] | None) -> Dict[str, str]:
+    """Return the model field for each imported column."""
+    # csv.DictReader keeps the extra values of rows longer than the header under None
+    header = [column for column in header if column is not None]
+    if field_map:
+        return {column: field for column, field in field_map.items() if column in header}
+    by_name = {name.lower(): name for name in model_fields}
+    return {column: by_name[column.lower()] for column in header if column.lower() in by_name}
+
+
+def _note(row: Dict[str, Any], columns: Dict[str, str], deck: str, model: str,
+          tags: List[str] | None, allow_duplicates: bool) -> Dict[str, Any]:
+    fields = {field: _text_value(row.get(column)) for column, field in columns.items()}
+    note_tags = list(tags or [])
+    if "tags" in row and "tags" not in columns:
+        row_tags = row["tags"]
+        note_tags.extend(row_tags if isinstance(row_tags, list) else str(row_tags or "").split())
+    return {
+        "deckName": deck,
+        "modelName": model,
+        "fields": fields,
+        "tags": note_tags,
+        "options": {"allowDuplicate": allow_duplicates},
+    }
+
+
+def _text_value(value: Any) -> str:
+    """Convert a JSONL value to field text."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+class CheckpointError(Exception):
+    """The progress of an import could not be saved."""
+
+
+class _Checkpoint:
+    """Progress of an import, saved in the directory of the journal.
+
+    A checkpoint only applies to the same file, unchanged since it was saved,
+    imported with the same options.
+    """
+
+    def __init__(self, file: Path, options: Dict[str, Any]):
+        # Imports of the same file into different backends progress separately
+        backend = selected_backend()
+        scope = "" if backend == DEFAULT_BACKEND else f".{backend}"
+        digest = hashlib.sha256(f"{file.resolve()}{scope}".encode()).hexdigest()[:16]
+        self.path = settings.journal.parent / CHECKPOINT_DIR / f"{file.name}.{digest}.json"
+        stat = file.stat()
+        self.key = {"size": stat.st_size, "mtime": stat.st_mtime, **options}
+        self.rows = 0
+        self.added = 0
+        self.failed = 0
+        self.errors: List[str] = []
+        self.resumed_from = 0
+        self.interrupted: str | None = None
+
+    def load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("key") != self.key:
+            return
+        self.rows = self.resumed_from = data["rows"]
+        self.added = data["added"]
+        self.failed = data["failed"]
+        self.errors = data["errors"]
+
+    def save(self) -> None:
+        data = {"key": self.key, "rows": self.rows, "added": self.added, "failed": self.failed,
+                "errors": self.errors}
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary.write_text(json.dumps(data))
+            os.replace(temporary, self.path)
+        except OSError as e:
+            raise CheckpointError(f"could not write checkpoint {self.path}: {e}") from e
+
+    def data(self) -> Dict[str, Any]:
+        return {"interrupted": self.interrupted, "resumed_from": self.resumed_from, "rows": self.rows,
+                "added": self.added, "failed": self.failed, "errors": self.errors}
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+    def record_failure(self, row_number: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"Row {row_number}: {error}")
+
+    def summary(self) -> str:
+        lines = []
+        if self.resumed_from:
+            lines.append(f"Resumed from row {self.resumed_from + 1}.")
+        lines.append(f"Rows processed: {self.rows}, notes added: {self.added}, failed: {self.failed}")
+        if self.errors:
+            lines.append("Failed rows:")
+            lines.extend(f"  - {error}" for error in self.errors)
+            if self.failed > len(self.errors):
+                lines.append(f"  ... and {self.failed - len(self.errors)} more")
+        return "\n".join(lines)
+
+
+def _text(text: str) -> list[types.TextContent]:
+    return [types.TextContent(type="text", text=text)]
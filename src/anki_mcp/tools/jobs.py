@@ -0,0 +1,119 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List
+
+from .config import settings
+from .progress import progress_reporter
+from .scheduler import Priority, minimum_priority
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class Job:
+    """A tool call running in the background."""
+
+    __slots__ = ("id", "tool", "status", "created_at", "started_at", "finished_at",
+                 "progress", "total", "message", "result", "error", "task")
+
+    def __init__(self, tool: str):
+        self.id = uuid.uuid4().hex[:8]
+        self.tool = tool
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.progress: float | None = None
+        self.total: float | None = None
+        self.message: str | None = None
+        self.result: Any = None
+        self.error: str | None = None
+        self.task: asyncio.Task | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED, CANCELLED)
+
+    async def _update_progress(self, progress: float, total: float | None, message: str | None) -> None:
+        self.progress = progress
+        self.total = total
+        self.message = message
+
+
+class JobManager:
+    """Run tool calls as background jobs so they don't block the MCP request.
+
+    Requests made by a job are scheduled as bulk work, behind interactive reads,
+    and share the scheduler's in-flight budget with them. Jobs beyond
+    `max_running` wait in the queue, and the latest `max_finished` finished jobs
+    are kept for get-job-status. Unless given, both limits are taken from the
+    settings when used.
+    """
+
+    def __init__(self, max_running: int | None = None, max_finished: int | None = None):
+        self.max_running = max_running
+        self.max_finished = max_finished
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._slots: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def submit(self, tool: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Job:
+        """Start `fn(*args, **kwargs)` as a job and return it without waiting."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_running or settings.max_running_jobs)
+            self._loop = loop
+
+        job = Job(tool)
+        self._jobs[job.id] = job
+        self._evict_finished()
+        # The task inherits the caller's context, so its requests are attributed
+        # to the client that submitted it
+        job.task = loop.create_task(self._run(job, self._slots, fn, args, kwargs))
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        """Return all known jobs, most recent first."""
+        return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job. Returns False if it already finished."""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.task.cancel()
+        return True
+
+    async def _run(self, job: Job, slots: asyncio.Semaphore, fn: Callable[..., Awaitable[Any]],
+                   args: tuple, kwargs: Dict[str, Any]) -> None:
+        try:
+            async with slots:
+                job.status = RUNNING
+                job.started_at = time.time()
+                minimum_priority.set(Priority.BULK)
+                with progress_reporter(job._update_progress):
+                    job.result = await fn(*args, **kwargs)
+            job.status = SUCCEEDED
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e) or type(e).__name__
+        finally:
+            job.finished_at = time.time()
+
+    def _evict_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - (self.max_finished or settings.max_finished_jobs))]:
+            del self._jobs[job_id]
+
+
+jobs = JobManager()
@@ -0,0 +1,108 @@
+"""
+Write-ahead journal of bulk writes, keyed by client-supplied idempotency keys.
+
+Before a batch of notes is written, an intent entry is appended for each key,
+and once a note was written, its ID. Re-submitting the batch skips the keys
+that are done without asking Anki Connect. Keys with an intent but no result
+were interrupted while Anki may have been writing them.
+
+The journal is a JSON lines file at the `journal` setting, by default
+`~/.anki-mcp/journal.jsonl`.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = Path.home() / ".anki-mcp" / "journal.jsonl"
+
+# Compact the file when it has this many times more lines than live entries
+COMPACT_RATIO = 2
+COMPACT_MIN_LINES = 1000
+
+PENDING = "pending"
+DONE = "done"
+
+
+class WriteJournal:
+    """Append-only journal mapping idempotency keys to the notes written for them."""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        self._entries: Dict[str, dict] | None = None
+        self._lines = 0
+        # Whether the file ends in a line cut off by a crash
+        self._truncated = False
+
+    @property
+    def entries(self) -> Dict[str, dict]:
+        if self._entries is None:
+            self._load()
+        return self._entries
+
+    def completed(self, key: str) -> Optional[dict]:
+        """Return the entry of a key whose write is done, or None."""
+        entry = self.entries.get(key)
+        return entry if entry is not None and entry["state"] == DONE else None
+
+    def in_doubt(self, key: str) -> bool:
+        """Whether a write for the key was started but never recorded as done."""
+        entry = self.entries.get(key)
+        return entry is not None and entry["state"] == PENDING
+
+    def record_intent(self, keys: Iterable[str]) -> None:
+        """Record that writes for the keys are about to be sent, in one append."""
+        self._append([{"key": key, "state": PENDING} for key in keys if self.completed(key) is None])
+
+    def record_done(self, key: str, note_id: int, action: str) -> None:
+        self._append([{"key": key, "state": DONE, "note_id": note_id, "action": action}])
+
+    def _load(self) -> None:
+        self._entries = {}
+        self._lines = 0
+        try:
+            file = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with file:
+            for line in file:
+                self._lines += 1
+                self._truncated = not line.endswith("\n")
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line may be cut off if the server died while writing it
+                    logger.warning("Ignoring corrupt line %d in %s", self._lines, self.path)
+                    continue
+                self._entries[entry["key"]] = entry
+        if self._lines >= max(COMPACT_MIN_LINES, COMPACT_RATIO * len(self._entries)):
+            self._compact()
+
+    def _append(self, entries: list) -> None:
+        if not entries:
+            return
+        current = self.entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            if self._truncated:
+                file.write("\n")
+                self._truncated = False
+            file.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        for entry in entries:
+            current[entry["key"]] = entry
+        self._lines += len(entries)
+
+    def _compact(self) -> None:
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        with open(temporary, "w", encoding="utf-8") as file:
+            file.write("".join(json.dumps(entry) + "\n" for entry in self._entries.values()))
+        os.replace(temporary, self.path)
+        self._lines = len(self._entries)
+        self._truncated = False
+
+
+journal = WriteJournal(DEFAULT_JOURNAL_PATH)
@@ -0,0 +1,182 @@
+"""
+Media files stored in Anki's media folder under names derived from their content.
+
+A file is named after a hash of its content, so storing the same image or sound
+again, from any note, reuses the file already in the collection. The names
+stored by this server are kept in a manifest, fetched with one
+getMediaFilesNames request, and only files missing from it are uploaded, a
+few at a time.
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Annotated, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from .backends import selected_backend
+from .config import settings
+from .utils import make_anki_request
+
+# Prefix of the names of stored files, so the manifest only lists those
+NAME_PREFIX = "mcp-"
+
+# Bytes read at a time while hashing a file
+READ_SIZE = 1 << 20
+
+IMAGE_EXTENSIONS = frozenset({".avif", ".bmp", ".gif", ".jpeg", ".jpg", ".png", ".svg", ".tif", ".tiff", ".webp"})
+SOUND_EXTENSIONS = frozenset({".aac", ".flac", ".m4a", ".mov", ".mp3", ".mp4", ".oga", ".ogg", ".opus", ".spx",
+                              ".wav", ".webm"})
+
+
+class MediaError(Exception):
+    """The media files in Anki couldn't be listed."""
+
+
+class MediaFile(BaseModel):
+    path: Annotated[Optional[str], Field(description="Path of a local file to store", default=None)]
+    data: Annotated[Optional[str], Field(description="Base64-encoded content to store, instead of a path", default=None)]
+    filename: Annotated[Optional[str], Field(description="Original file name, whose extension is kept for data (optional)", default=None)]
+    field: Annotated[Optional[str], Field(description="Note field to add a reference to the file to (for notes)", default=None)]
+
+
+@dataclass(slots=True)
+class StoredMedia:
+    """The outcome of storing a media file."""
+    source: str
+    filename: Optional[str] = None
+    uploaded: bool = False
+    error: Optional[str] = None
+
+    @property
+    def reference(self) -> Optional[str]:
+        """How a field refers to the file, or None if it is neither an image nor a sound."""
+        suffix = Path(self.filename or "").suffix.lower()
+        if suffix in IMAGE_EXTENSIONS:
+            return f'<img src="{self.filename}">'
+        if suffix in SOUND_EXTENSIONS:
+            return f"[sound:{self.filename}]"
+        return None
+
+
+class MediaManifest:
+    """Names of the files this server stored in the media folder of every backend.
+
+    Kept apart from the collection cache, which every write clears, as only
+    storing media changes it. It expires like the cache, to notice files
+    deleted in Anki, after the `media_manifest_ttl` setting unless `ttl` is given.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        # Names and expiry time by backend
+        self._names: Dict[str, Tuple[float, Set[str]]] = {}
+
+    async def names(self) -> Set[str]:
+        backend = selected_backend()
+        entry = self._names.get(backend)
+        if entry is None or time.monotonic() >= entry[0]:
+            result = await make_anki_request("getMediaFilesNames", pattern=f"{NAME_PREFIX}*")
+            if not result["success"]:
+                raise MediaError(f"could not list the media files: {result['error']}")
+            ttl = settings.media_manifest_ttl if self.ttl is None else self.ttl
+            entry = self._names[backend] = (time.monotonic() + ttl, set(result["result"]))
+        return entry[1]
+
+    def add(self, name: str) -> None:
+        entry = self._names.get(selected_backend())
+        if entry is not None:
+            entry[1].add(name)
+
+    def clear(self) -> None:
+        self._names.clear()
+
+
+media_manifest = MediaManifest()
+
+
+async def store_media_files(files: List[MediaFile]) -> List[StoredMedia]:
+    """Store files in Anki's media folder, skipping those already there.
+
+    Returns the outcome of every file, in order. A file that couldn't be read or
+    stored has an error, a lowercase reason, instead of failing the others.
+    """
+    results: List[StoredMedia] = []
+    # Content of data files, and the path of local files, by stored name
+    sources: Dict[str, bytes | Path] = {}
+    for result, source in await asyncio.gather(*(_resolve(file) for file in files)):
+        results.append(result)
+        if source is not None:
+            sources.setdefault(result.filename, source)
+    if not sources:
+        return results
+
+    try:
+        existing = await media_manifest.names()
+    except MediaError as e:
+        for result in results:
+            if result.error is None:
+                result.error = str(e)
+        return results
+
+    limit = asyncio.Semaphore(settings.max_parallel_uploads)
+    missing = [name for name in sources if name not in existing]
+    errors = await asyncio.gather(*(_upload(name, sources[name], limit) for name in missing))
+    upload_errors = {name: error for name, error in zip(missing, errors)}
+    for result in results:
+        if result.filename in upload_errors:
+            result.error = upload_errors[result.filename]
+            result.uploaded = result.error is None
+    return results
+
+
+async def _resolve(file: MediaFile) -> tuple[StoredMedia, bytes | Path | None]:
+    """Name a file after its content. Local files are hashed without holding them in memory."""
+    if (file.path is None) == (file.data is None):
+        return StoredMedia(file.filename or "", error="provide either path or data"), None
+
+    if file.path is not None:
+        path = Path(file.path).expanduser()
+        try:
+            digest = await asyncio.to_thread(_hash_file, path)
+        except OSError as e:
+            return StoredMedia(file.path, error=f"could not read the file: {e.strerror or e}"), None
+        return StoredMedia(file.path, filename=_name(digest, file.filename or path.name)), path
+
+    try:
+        content = base64.b64decode(file.data, validate=True)
+    except (binascii.Error, ValueError):
+        return StoredMedia(file.filename or "data", error="data is not valid base64"), None
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    return StoredMedia(file.filename or "data", filename=_name(digest, file.filename or "")), content
+
+
+async def _upload(name: str, source: bytes | Path, limit: asyncio.Semaphore) -> Optional[str]:
+    """Upload a file, returning an error or None. Files are read once a slot is free."""
+    async with limit:
+        try:
+            content = source if isinstance(source, bytes) else await asyncio.to_thread(source.read_bytes)
+        except OSError as e:
+            return f"could not read the file: {e.strerror or e}"
+        result = await make_anki_request("storeMediaFile", filename=name, data=base64.b64encode(content).decode())
+    if not result["success"]:
+        return result["error"]
+    media_manifest.add(name)
+    return None
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _name(digest: str, original: str) -> str:
+    return f"{NAME_PREFIX}{digest}{Path(original).suffix.lower()}"
@@ -0,0 +1,220 @@
+import bisect
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Timings of the tool call currently being profiled, by request or stage
+_breakdown: ContextVar[Dict[str, float] | None] = ContextVar("anki_mcp_breakdown", default=None)
+
+
+class Histogram:
+    """Fixed-bucket histogram, cheap enough to update on every request."""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        # One extra bucket for values above the largest bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls into."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return (le, count) pairs as used by the Prometheus text format."""
+        pairs = []
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            pairs.append((_format_number(bound), seen))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+
+class ActionMetrics:
+    __slots__ = ("latency", "errors", "coalesced", "bytes_sent", "bytes_received")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.errors = 0
+        self.coalesced = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+
+class ToolMetrics:
+    __slots__ = ("latency", "errors")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.errors = 0
+
+
+class MetricsRegistry:
+    """In-process metrics for Anki Connect requests, tool calls and formatting stages."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.actions: Dict[str, ActionMetrics] = defaultdict(ActionMetrics)
+        self.tools: Dict[str, ToolMetrics] = defaultdict(ToolMetrics)
+        self.stages: Dict[str, Histogram] = defaultdict(Histogram)
+        self.started_at = time.time()
+
+    def record_request(self, action: str, seconds: float, bytes_sent: int, bytes_received: int) -> None:
+        metrics = self.actions[action]
+        metrics.latency.observe(seconds)
+        metrics.bytes_sent += bytes_sent
+        metrics.bytes_received += bytes_received
+        _add_to_breakdown("anki_connect.request", seconds)
+
+    def record_request_error(self, action: str) -> None:
+        self.actions[action].errors += 1
+
+    def record_coalesced(self, action: str) -> None:
+        self.actions[action].coalesced += 1
+
+    def record_tool(self, tool: str, seconds: float, error: bool = False) -> None:
+        metrics = self.tools[tool]
+        metrics.latency.observe(seconds)
+        if error:
+            metrics.errors += 1
+
+    def record_stage(self, stage: str, seconds: float) -> None:
+        self.stages[stage].observe(seconds)
+        _add_to_breakdown(stage, seconds)
+
+    @contextmanager
+    def breakdown(self) -> Iterator[Dict[str, float]]:
+        """Collect the request and stage timings recorded within the block into a dict."""
+        timings: Dict[str, float] = {}
+        token = _breakdown.set(timings)
+        try:
+            yield timings
+        finally:
+            _breakdown.reset(token)
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """Record the duration of the block under `stage`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a plain-dict summary of all metrics."""
+        return {
+            "uptime_seconds": time.time() - self.started_at,
+            "actions": {
+                action: {
+                    **_summarize(metrics.latency),
+                    "errors": metrics.errors,
+                    "coalesced": metrics.coalesced,
+                    "bytes_sent": metrics.bytes_sent,
+                    "bytes_received": metrics.bytes_received,
+                }
+                for action, metrics in sorted(self.actions.items())
+            },
+            "tools": {
+                tool: {**_summarize(metrics.latency), "errors": metrics.errors}
+                for tool, metrics in sorted(self.tools.items())
+            },
+            "stages": {stage: _summarize(histogram) for stage, histogram in sorted(self.stages.items())},
+        }
+
+    def render_prometheus(self, gauges: Dict[str, float] | None = None) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        _histogram_lines(lines, "anki_mcp_anki_connect_request_duration_seconds",
+                         "Duration of Anki Connect requests", "action",
+                         {action: metrics.latency for action, metrics in self.actions.items()})
+        for name, help_text, attribute in (
+            ("anki_mcp_anki_connect_request_bytes_total", "Bytes sent to Anki Connect", "bytes_sent"),
+            ("anki_mcp_anki_connect_response_bytes_total", "Bytes received from Anki Connect", "bytes_received"),
+            ("anki_mcp_anki_connect_errors_total", "Failed Anki Connect requests", "errors"),
+            ("anki_mcp_anki_connect_coalesced_total", "Requests served by an identical in-flight request", "coalesced"),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for action, metrics in sorted(self.actions.items()):
+                lines.append(f'{name}{{action="{_escape(action)}"}} {getattr(metrics, attribute)}')
+
+        _histogram_lines(lines, "anki_mcp_tool_duration_seconds", "Duration of tool calls", "tool",
+                         {tool: metrics.latency for tool, metrics in self.tools.items()})
+        lines.append("# HELP anki_mcp_tool_errors_total Tool calls that raised an exception")
+        lines.append("# TYPE anki_mcp_tool_errors_total counter")
+        for tool, metrics in sorted(self.tools.items()):
+            lines.append(f'anki_mcp_tool_errors_total{{tool="{_escape(tool)}"}} {metrics.errors}')
+
+        _histogram_lines(lines, "anki_mcp_stage_duration_seconds", "Duration of processing stages", "stage",
+                         self.stages)
+
+        for name, value in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_number(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _add_to_breakdown(key: str, seconds: float) -> None:
+    timings = _breakdown.get()
+    if timings is not None:
+        timings[key] = timings.get(key, 0.0) + seconds
+
+
+def _summarize(histogram: Histogram) -> Dict[str, Any]:
+    return {
+        "count": histogram.count,
+        "total_seconds": histogram.sum,
+        "p50_seconds": histogram.quantile(0.5),
+        "p95_seconds": histogram.quantile(0.95),
+        "p99_seconds": histogram.quantile(0.99),
+    }
+
+
+def _histogram_lines(lines: List[str], name: str, help_text: str, label: str,
+                     histograms: Dict[str, Histogram]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, histogram in sorted(histograms.items()):
+        value = _escape(key)
+        for le, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{label}="{value}",le="{le}"}} {count}')
+        lines.append(f'{name}_sum{{{label}="{value}"}} {_format_number(histogram.sum)}')
+        lines.append(f'{name}_count{{{label}="{value}"}} {histogram.count}')
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+metrics = MetricsRegistry()
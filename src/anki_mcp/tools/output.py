@@ -0,0 +1,61 @@
+"""
+Output format of tool results.
+
+In the default text format, tools return human-readable text. In the json
+format, selected with `--output-format json` or the `ANKI_MCP_OUTPUT_FORMAT`
+environment variable, every tool declares an output schema and returns
+structured content built directly from the decoded records, skipping the text
+formatting. The same data is included as compact JSON text for clients that
+don't read structured content.
+"""
+
+from typing import Any, Dict, Optional
+
+import mcp.types as types
+from mcp.server.fastmcp.exceptions import ToolError
+from pydantic import BaseModel, Field
+
+from . import codec
+
+OUTPUT_FORMATS = ("text", "json")
+
+_output_format = "text"
+
+
+class BackgroundOutput(BaseModel):
+    """Output of a tool that can run as a background job."""
+    job_id: Optional[str] = Field(
+        None, description="Set, instead of the other fields, when the tool was started with background=true",
+    )
+
+
+def set_output_format(name: str) -> None:
+    global _output_format
+    if name not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {name!r}, expected one of: {', '.join(OUTPUT_FORMATS)}")
+    _output_format = name
+
+
+def json_output() -> bool:
+    """Whether tools return structured content instead of text."""
+    return _output_format == "json"
+
+
+def structured(data: Dict[str, Any]) -> types.CallToolResult:
+    """Return `data` as structured content, and as compact JSON text."""
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=codec.dumps(data).decode())],
+        structuredContent=data,
+    )
+
+
+def failure(message: str) -> list[types.TextContent]:
+    """Report a failed tool call.
+
+    Text output returns the message. With json output there is no structured
+    content to return, so the call fails with the message as its error.
+    """
+    if json_output():
+        raise ToolError(message)
+    return [types.TextContent(type="text", text=message)]
+
@@ -0,0 +1,25 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator
+
+ProgressReporter = Callable[[float, float | None, str | None], Awaitable[None]]
+
+# Where long-running tools report their progress, set per tool call
+_reporter: ContextVar[ProgressReporter | None] = ContextVar("anki_mcp_progress", default=None)
+
+
+async def report_progress(progress: float, total: float | None = None, message: str | None = None) -> None:
+    """Report the progress of the current tool call, if anyone is listening."""
+    reporter = _reporter.get()
+    if reporter is not None:
+        await reporter(progress, total, message)
+
+
+@contextmanager
+def progress_reporter(reporter: ProgressReporter | None) -> Iterator[None]:
+    """Send progress reported within the block to `reporter`."""
+    token = _reporter.set(reporter)
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
@@ -0,0 +1,119 @@
+"""
+Compact records for the notes, cards and review days returned by Anki Connect.
+
+The results of notesInfo, cardsInfo and getNumCardsReviewedByDay are decoded
+into these records once, in the request layer, so tools and caches don't keep
+Anki Connect's nested dicts around. Strings that repeat across records, like
+model, deck and field names and tags, are shared between them.
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+# Field name tuples, shared by all notes of a model
+_field_names: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _shared_field_names(names: Tuple[str, ...]) -> Tuple[str, ...]:
+    shared = _field_names.get(names)
+    if shared is None:
+        shared = _field_names[names] = tuple(sys.intern(name) for name in names)
+    return shared
+
+
+def _ordered_fields(fields: Dict[str, Dict[str, Any]]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Split Anki Connect's `{name: {"value", "order"}}` into names and values in field order."""
+    ordered = sorted(fields.items(), key=lambda item: item[1].get("order", 0))
+    names = _shared_field_names(tuple(name for name, _ in ordered))
+    return names, tuple(data["value"] for _, data in ordered)
+
+
+@dataclass(slots=True)
+class NoteInfo:
+    note_id: int
+    model_name: str
+    field_names: Tuple[str, ...]
+    field_values: Tuple[str, ...]
+    tags: Tuple[str, ...]
+    mod: int
+    cards: Tuple[int, ...] = ()
+
+    @classmethod
+    def from_anki(cls, data: Dict[str, Any]) -> Optional["NoteInfo"]:
+        """Decode an item of a notesInfo result, or None for a note that doesn't exist."""
+        if not data:
+            return None
+        names, values = _ordered_fields(data.get("fields", {}))
+        return cls(
+            note_id=data["noteId"],
+            model_name=sys.intern(data.get("modelName", "")),
+            field_names=names,
+            field_values=values,
+            tags=tuple(sys.intern(tag) for tag in data.get("tags", ())),
+            mod=data.get("mod", 0),
+            cards=tuple(data.get("cards", ())),
+        )
+
+    @property
+    def fields(self) -> Dict[str, str]:
+        """Field values by name, in field order."""
+        return dict(zip(self.field_names, self.field_values))
+
+
+@dataclass(slots=True)
+class CardInfo:
+    """A card's scheduling state. The rendered question and answer are not kept."""
+    card_id: int
+    note_id: int
+    deck_name: str
+    model_name: str
+    ord: int = 0
+    type: int = 0
+    queue: int = 0
+    due: int = 0
+    interval: int = 0
+    factor: int = 0
+    reps: int = 0
+    lapses: int = 0
+    mod: int = 0
+
+    @classmethod
+    def from_anki(cls, data: Dict[str, Any]) -> Optional["CardInfo"]:
+        """Decode an item of a cardsInfo result, or None for a card that doesn't exist."""
+        if not data:
+            return None
+        return cls(
+            card_id=data["cardId"],
+            note_id=data.get("note", 0),
+            deck_name=sys.intern(data.get("deckName", "")),
+            model_name=sys.intern(data.get("modelName", "")),
+            ord=data.get("ord", 0),
+            type=data.get("type", 0),
+            queue=data.get("queue", 0),
+            due=data.get("due", 0),
+            interval=data.get("interval", 0),
+            factor=data.get("factor", 0),
+            reps=data.get("reps", 0),
+            lapses=data.get("lapses", 0),
+            mod=data.get("mod", 0),
+        )
+
+    @property
+    def suspended(self) -> bool:
+        # Suspended cards have queue -1
+        return self.queue == -1
+
+
+class ReviewDay(NamedTuple):
+    """Number of cards reviewed on a day, as a `YYYY-MM-DD` date."""
+    date: str
+    count: int
+
+
+# Decoders for the items of list results, by action
+RECORD_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "notesInfo": NoteInfo.from_anki,
+    "cardsInfo": CardInfo.from_anki,
+    "getNumCardsReviewedByDay": ReviewDay._make,
+}
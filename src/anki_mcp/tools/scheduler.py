@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Dict
+
+
+class Priority(IntEnum):
+    """Scheduling classes for Anki Connect requests, served in ascending order."""
+    INTERACTIVE = 0
+    BULK = 1
+
+
+# Identifies the client on whose behalf requests are made, used for fair scheduling
+current_client: ContextVar[str] = ContextVar("anki_mcp_client", default="default")
+
+# Lowest priority class requests are scheduled in, e.g. BULK for background jobs
+minimum_priority: ContextVar[Priority] = ContextVar("anki_mcp_minimum_priority", default=Priority.INTERACTIVE)
+
+
+class RequestScheduler:
+    """Limit the number of Anki Connect requests in flight.
+
+    Anki Connect executes every request on Anki's GUI thread, so sending more
+    requests at once only queues them inside Anki. Waiting requests are granted
+    by priority class first, then round-robin between clients so a single
+    client submitting a large batch cannot starve the others.
+    """
+
+    def __init__(self, max_in_flight: int = 2):
+        self.max_in_flight = max_in_flight
+        self._in_flight = 0
+        self._queued = 0
+        self._waiting: Dict[Priority, OrderedDict[str, deque]] = {priority: OrderedDict() for priority in Priority}
+
+        # Metrics
+        self._granted = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._max_queue_depth = 0
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.INTERACTIVE, client: str | None = None):
+        """Hold one in-flight slot for the duration of the block."""
+        await self._acquire(priority, client if client is not None else current_client.get())
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and wait-time metrics."""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queue_depth": self._queued,
+            "queue_depth_by_priority": {
+                priority.name.lower(): sum(len(queue) for queue in clients.values())
+                for priority, clients in self._waiting.items()
+            },
+            "max_queue_depth": self._max_queue_depth,
+            "granted": self._granted,
+            "average_wait_seconds": self._total_wait / self._granted if self._granted else 0.0,
+            "max_wait_seconds": self._max_wait,
+        }
+
+    async def _acquire(self, priority: Priority, client: str) -> None:
+        if self._in_flight < self.max_in_flight and not self._queued:
+            self._in_flight += 1
+            self._record_wait(0.0)
+            return
+
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiting[priority].setdefault(client, deque()).append(waiter)
+        self._queued += 1
+        self._max_queue_depth = max(self._max_queue_depth, self._queued)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just before the cancellation; hand it on
+                self._release()
+            else:
+                self._discard(priority, client, waiter)
+            raise
+
+        self._record_wait(time.monotonic() - start)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        while self._in_flight < self.max_in_flight:
+            waiter = self._next_waiter()
+            if waiter is None:
+                break
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def _next_waiter(self) -> asyncio.Future | None:
+        for clients in self._waiting.values():
+            while clients:
+                client, queue = next(iter(clients.items()))
+                waiter = queue.popleft()
+                self._queued -= 1
+                if queue:
+                    # Round-robin: the client goes to the back of its class
+                    clients.move_to_end(client)
+                else:
+                    del clients[client]
+                if not waiter.done():
+                    return waiter
+        return None
+
+    def _discard(self, priority: Priority, client: str, waiter: asyncio.Future) -> None:
+        queue = self._waiting[priority].get(client)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        self._queued -= 1
+        if not queue:
+            del self._waiting[priority][client]
+
+    def _record_wait(self, wait: float) -> None:
+        self._granted += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
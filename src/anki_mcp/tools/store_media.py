@@ -0,0 +1,68 @@
+from typing import Annotated, List, Optional
+
+import mcp.types as types
+from pydantic import BaseModel, Field
+
+from .media import MediaFile, store_media_files
+from .output import BackgroundOutput, failure, json_output, structured
+
+
+class StoredFile(BaseModel):
+    source: str
+    filename: Optional[str] = None
+    status: Annotated[str, Field(description="uploaded, existing or failed")]
+    reference: Optional[str] = None
+    error: Optional[str] = None
+
+
+class StoreMediaOutput(BackgroundOutput):
+    files: List[StoredFile] = []
+
+
+async def store_media(files: List[MediaFile]) -> list[types.TextContent]:
+    """Store images and sounds in Anki's media folder.
+
+    Files are named after a hash of their content, and files already in the
+    media folder aren't uploaded again.
+
+    Args:
+        files: Local paths or base64-encoded data of the files to store.
+
+    Returns:
+        TextContent with the stored name of every file and how to refer to it in a field.
+    """
+    if not files:
+        return failure("No files provided. Please specify at least one file to store.")
+
+    results = await store_media_files(files)
+    stored = [
+        {
+            "source": result.source,
+            "filename": result.filename if result.error is None else None,
+            "status": "failed" if result.error else "uploaded" if result.uploaded else "existing",
+            "reference": result.reference if result.error is None else None,
+            "error": result.error,
+        }
+        for result in results
+    ]
+
+    if json_output():
+        return structured({"files": stored})
+
+    lines = []
+    for file in stored:
+        if file["error"]:
+            lines.append(f"Failed to store {file['source']}: {file['error']}")
+        else:
+            verb = "Uploaded" if file["status"] == "uploaded" else "Already stored"
+            line = f"{verb} {file['source']} as {file['filename']}"
+            if file["reference"]:
+                line += f", referenced as {file['reference']}"
+            lines.append(line)
+
+    return [
+        types.TextContent(
+            type="text",
+            text="\n".join(lines),
+        )
+    ]
@@ -0,0 +1,127 @@
+import codecs
+import json
+import re
+from typing import Any, List
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+# Parser states
+_START = "start"          # before the opening brace of the response object
+_KEY = "key"              # before a key, a comma or the closing brace
+_COLON = "colon"          # after a key
+_VALUE = "value"          # before the value of a key other than "result"
+_RESULT = "result"        # before the value of "result"
+_ITEMS = "items"          # inside the "result" array
+_DONE = "done"            # after the closing brace
+
+
+class ResultStreamDecoder:
+    """Incrementally decode an Anki Connect response of the form
+    `{"result": [...], "error": ...}`, returning the items of the result array
+    as soon as each one is complete.
+
+    Only the item being parsed is buffered, so memory stays bounded by the size
+    of the largest item rather than the size of the response.
+    """
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = _START
+        self._key: str | None = None
+        self.error: Any = None
+        # The result when it is not an array, e.g. null alongside an error
+        self.result: Any = None
+
+    def feed(self, data: bytes) -> List[Any]:
+        """Add the next chunk of the response and return the items it completed."""
+        self._buffer += self._text.decode(data)
+        return self._parse(final=False)
+
+    def close(self) -> List[Any]:
+        """Finish decoding, raising ValueError if the response was incomplete."""
+        self._buffer += self._text.decode(b"", final=True)
+        items = self._parse(final=True)
+        if self._state != _DONE:
+            raise ValueError("Incomplete response from Anki Connect")
+        return items
+
+    def _parse(self, final: bool) -> List[Any]:
+        items = []
+        buffer = self._buffer
+        pos = 0
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer) or self._state == _DONE:
+                break
+            char = buffer[pos]
+
+            if self._state == _START:
+                if char != "{":
+                    raise ValueError(f"Expected a JSON object from Anki Connect, got {char!r}")
+                self._state = _KEY
+                pos += 1
+            elif self._state == _KEY:
+                if char == ",":
+                    pos += 1
+                elif char == "}":
+                    self._state = _DONE
+                    pos += 1
+                else:
+                    decoded = self._decode(buffer, pos, final)
+                    if decoded is None:
+                        break
+                    self._key, pos = decoded
+                    self._state = _COLON
+            elif self._state == _COLON:
+                if char != ":":
+                    raise ValueError(f"Expected ':' in response from Anki Connect, got {char!r}")
+                self._state = _RESULT if self._key == "result" else _VALUE
+                pos += 1
+            elif self._state == _RESULT and char == "[":
+                self._state = _ITEMS
+                pos += 1
+            elif self._state in (_RESULT, _VALUE):
+                decoded = self._decode(buffer, pos, final)
+                if decoded is None:
+                    break
+                value, pos = decoded
+                if self._key == "result":
+                    self.result = value
+                elif self._key == "error":
+                    self.error = value
+                self._state = _KEY
+            else:  # _ITEMS
+                if char == ",":
+                    pos += 1
+                elif char == "]":
+                    self._state = _KEY
+                    pos += 1
+                else:
+                    decoded = self._decode(buffer, pos, final)
+                    if decoded is None:
+                        break
+                    item, pos = decoded
+                    items.append(item)
+
+        # Drop everything that has been parsed
+        self._buffer = buffer[pos:]
+        return items
+
+    @staticmethod
+    def _decode(buffer: str, pos: int, final: bool) -> tuple[Any, int] | None:
+        """Decode the JSON value at `pos`, or return None if it isn't complete yet."""
+        try:
+            value, end = _DECODER.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+        # A number cut off by the end of the chunk may have been decoded from a
+        # prefix of it, like 1.5 from "1.5e", so wait for a character after it
+        if (not final and isinstance(value, (int, float)) and not isinstance(value, bool)
+                and (end == len(buffer) or buffer[end] in _NUMBER_CHARS)):
+            return None
+        return value, end
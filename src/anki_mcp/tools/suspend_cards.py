@@ -1,7 +1,13 @@
 import mcp.types as types
+from .output import BackgroundOutput, failure, json_output, structured
 from .utils import make_anki_request
 
 
+class SuspendCardsOutput(BackgroundOutput):
+    cards: int = 0
+    changed: bool = False
+
+
 async def suspend_cards(card_ids: list[int]) -> list[types.TextContent]:
     """Suspend cards by their card IDs.
 
@@ -12,22 +18,15 @@ async def suspend_cards(card_ids: list[int]) -> list[types.TextContent]:
         TextContent indicating success or failure.
     """
     if not card_ids:
-        return [
-            types.TextContent(
-                type="text",
-                text="No card IDs provided. Please specify at least one card ID to suspend.",
-            )
-        ]
+        return failure("No card IDs provided. Please specify at least one card ID to suspend.")
 
     result = await make_anki_request("suspend", cards=card_ids)
 
     if not result["success"]:
-        return [
-            types.TextContent(
-                type="text",
-                text=f"Failed to suspend cards: {result['error']}",
-            )
-        ]
+        return failure(f"Failed to suspend cards: {result['error']}")
+
+    if json_output():
+        return structured({"cards": len(card_ids), "changed": bool(result["result"])})
 
     if result["result"]:
         return [
@@ -55,22 +54,15 @@ async def unsuspend_cards(card_ids: list[int]) -> list[types.TextContent]:
         TextContent indicating success or failure.
     """
     if not card_ids:
-        return [
-            types.TextContent(
-                type="text",
-                text="No card IDs provided. Please specify at least one card ID to unsuspend.",
-            )
-        ]
+        return failure("No card IDs provided. Please specify at least one card ID to unsuspend.")
 
     result = await make_anki_request("unsuspend", cards=card_ids)
 
     if not result["success"]:
-        return [
-            types.TextContent(
-                type="text",
-                text=f"Failed to unsuspend cards: {result['error']}",
-            )
-        ]
+        return failure(f"Failed to unsuspend cards: {result['error']}")
+
+    if json_output():
+        return structured({"cards": len(card_ids), "changed": bool(result["result"])})
 
     if result["result"]:
         return [
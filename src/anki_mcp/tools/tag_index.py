@@ -0,0 +1,101 @@
+"""
+Index of the tag hierarchy with the number of notes per tag.
+
+Anki Connect has no action for tag statistics, so the index is built from the
+tags of every note, streamed from notesInfo in one pass without holding the
+notes in memory. It is kept in the collection cache until the next write.
+"""
+
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from .cache import collection_cache
+from .utils import AnkiConnectError, make_anki_request, stream_anki_request
+
+TAG_SEPARATOR = "::"
+
+CACHE_KEY = "tag-index"
+
+
+@dataclass(slots=True)
+class TagNode:
+    """A tag with the number of notes tagged with it, or with it or any of its subtags."""
+    name: str
+    own_notes: int = 0
+    notes: int = 0
+    children: List["TagNode"] = field(default_factory=list)
+
+    @property
+    def short_name(self) -> str:
+        return self.name.rpartition(TAG_SEPARATOR)[2]
+
+
+@dataclass(slots=True)
+class TagIndex:
+    tags: Dict[str, TagNode]
+    notes: int
+    tagged_notes: int
+
+    @property
+    def roots(self) -> List[TagNode]:
+        return [node for name, node in self.tags.items() if TAG_SEPARATOR not in name]
+
+
+async def get_tag_index() -> TagIndex:
+    """Return the tag index, building it if it isn't cached.
+
+    Raises:
+        AnkiConnectError: If the tags or notes couldn't be retrieved
+    """
+    index = collection_cache.get(CACHE_KEY)
+    if index is not None:
+        return index
+
+    generation = collection_cache.generation
+    tags_result = await make_anki_request("getTags")
+    if not tags_result["success"]:
+        raise AnkiConnectError(tags_result["error"])
+
+    own_counts: Dict[str, int] = dict.fromkeys(tags_result["result"], 0)
+    counts: Dict[str, int] = {}
+    notes = tagged_notes = 0
+    async with aclosing(stream_anki_request("notesInfo", query="deck:*")) as stream:
+        async for note in stream:
+            if note is None:
+                continue
+            notes += 1
+            if not note.tags:
+                continue
+            tagged_notes += 1
+            # Count a note once for every tag it has or is below one of its tags
+            counted = set()
+            for tag in note.tags:
+                own_counts[tag] = own_counts.get(tag, 0) + 1
+                parts = tag.split(TAG_SEPARATOR)
+                for depth in range(1, len(parts) + 1):
+                    counted.add(TAG_SEPARATOR.join(parts[:depth]))
+            for name in counted:
+                counts[name] = counts.get(name, 0) + 1
+
+    index = TagIndex(_build_tree(own_counts, counts), notes, tagged_notes)
+    collection_cache.set(CACHE_KEY, index, generation)
+    return index
+
+
+def _build_tree(own_counts: Dict[str, int], counts: Dict[str, int]) -> Dict[str, TagNode]:
+    """Link the tags into a tree, keyed by full name in sorted order, adding missing parents."""
+    names = set(own_counts)
+    for name in own_counts:
+        while TAG_SEPARATOR in name:
+            name = name.rpartition(TAG_SEPARATOR)[0]
+            names.add(name)
+
+    tags: Dict[str, TagNode] = {}
+    # Parents sort before their children, so they exist when a child is linked
+    for name in sorted(names):
+        node = tags[name] = TagNode(name, own_counts.get(name, 0), counts.get(name, 0))
+        parent = name.rpartition(TAG_SEPARATOR)[0]
+        if parent:
+            tags[parent].children.append(node)
+    return tags
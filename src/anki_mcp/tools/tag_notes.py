@@ -0,0 +1,169 @@
+from typing import Dict, List, Optional, Tuple
+
+import mcp.types as types
+
+from .config import settings
+from .output import BackgroundOutput, failure, json_output, structured
+from .progress import report_progress
+from .tag_index import TAG_SEPARATOR
+from .utils import make_anki_request
+
+
+class TagNotesOutput(BackgroundOutput):
+    tags: List[str] = []
+    notes: int = 0
+
+
+class RenameTagOutput(BackgroundOutput):
+    notes: int = 0
+    renamed: Dict[str, str] = {}
+
+
+async def add_tags(
+    tags: List[str],
+    note_ids: Optional[List[int]] = None,
+    query: Optional[str] = None,
+) -> list[types.TextContent]:
+    """Add tags to notes selected by ID or by a query.
+
+    Args:
+        tags: Tags to add.
+        note_ids: Notes to tag.
+        query: Anki search query selecting the notes to tag, instead of note_ids.
+
+    Returns:
+        TextContent indicating success or failure.
+    """
+    return await _change_tags("addTags", "add", "Added", tags, note_ids, query)
+
+
+async def remove_tags(
+    tags: List[str],
+    note_ids: Optional[List[int]] = None,
+    query: Optional[str] = None,
+) -> list[types.TextContent]:
+    """Remove tags from notes selected by ID or by a query.
+
+    Args:
+        tags: Tags to remove.
+        note_ids: Notes to untag.
+        query: Anki search query selecting the notes to untag, instead of note_ids.
+
+    Returns:
+        TextContent indicating success or failure.
+    """
+    return await _change_tags("removeTags", "remove", "Removed", tags, note_ids, query)
+
+
+async def rename_tag(tag: str, new_name: str, query: Optional[str] = None) -> list[types.TextContent]:
+    """Rename a tag and its subtags, on all notes or on the notes matching a query.
+
+    Args:
+        tag: Tag to rename. Subtags are renamed with it, e.g. "lang::es" to "language::es".
+        new_name: New name of the tag.
+        query: Only rename the tag on notes matching this Anki search query.
+
+    Returns:
+        TextContent indicating success or failure.
+    """
+    error = _invalid_tags([tag, new_name])
+    if error:
+        return failure(error)
+
+    tags_result = await make_anki_request("getTags")
+    if not tags_result["success"]:
+        return failure(f"Failed to retrieve tags: {tags_result['error']}")
+    # Anki compares tags ignoring case
+    prefix = tag.lower() + TAG_SEPARATOR
+    renamed = {
+        existing: new_name + existing[len(tag):]
+        for existing in tags_result["result"]
+        if existing.lower() == tag.lower() or existing.lower().startswith(prefix)
+    }
+    if not renamed:
+        return failure(f"Tag not found: '{tag}'")
+
+    # The search also matches subtags. Notes it matches through wildcards in the
+    # tag are left alone, since replaceTags only replaces exact tags.
+    search = f'"tag:{tag}"' + (f" ({query})" if query else "")
+    notes_result = await make_anki_request("findNotes", query=search)
+    if not notes_result["success"]:
+        return failure(f"Failed to find notes: {notes_result['error']}")
+    note_ids = notes_result["result"]
+
+    steps = len(renamed) * _chunks(len(note_ids))
+    done = 0
+    for old, new in renamed.items():
+        for start in range(0, len(note_ids), settings.tag_batch_size):
+            result = await make_anki_request(
+                "replaceTags", notes=note_ids[start:start + settings.tag_batch_size], tag_to_replace=old, replace_with_tag=new,
+            )
+            if not result["success"]:
+                return failure(f"Failed to rename tag '{old}' after {done} of {steps} requests: {result['error']}")
+            done += 1
+            await report_progress(done, steps, f"Renamed {done} of {steps} tag and note chunks")
+
+    if json_output():
+        return structured({"notes": len(note_ids), "renamed": renamed})
+
+    subtags = sum(1 for old in renamed if old.lower() != tag.lower())
+    text = f"Renamed tag '{tag}' to '{new_name}' on {len(note_ids)} note(s)"
+    if subtags:
+        text += f", with {subtags} subtag(s)"
+    return [types.TextContent(type="text", text=text + ".")]
+
+
+async def _change_tags(action: str, verb: str, past: str, tags: List[str],
+                       note_ids: Optional[List[int]], query: Optional[str]) -> list[types.TextContent]:
+    if not tags:
+        return failure(f"No tags provided. Please specify at least one tag to {verb}.")
+    error = _invalid_tags(tags)
+    if error:
+        return failure(error)
+
+    note_ids, error = await _select_notes(note_ids, query)
+    if error:
+        return failure(error)
+
+    # Anki Connect takes the tags as one space-separated string
+    tag_string = " ".join(tags)
+    for start in range(0, len(note_ids), settings.tag_batch_size):
+        result = await make_anki_request(action, notes=note_ids[start:start + settings.tag_batch_size], tags=tag_string)
+        if not result["success"]:
+            return failure(f"Failed to {verb} tags after {start} of {len(note_ids)} notes: {result['error']}")
+        done = min(start + settings.tag_batch_size, len(note_ids))
+        await report_progress(done, len(note_ids), f"{past} tags on {done} of {len(note_ids)} notes")
+
+    if json_output():
+        return structured({"tags": tags, "notes": len(note_ids)})
+
+    preposition = "to" if action == "addTags" else "from"
+    return [
+        types.TextContent(
+            type="text",
+            text=f"{past} {', '.join(tags)} {preposition} {len(note_ids)} note(s).",
+        )
+    ]
+
+
+async def _select_notes(note_ids: Optional[List[int]], query: Optional[str]) -> Tuple[List[int], Optional[str]]:
+    """Return the IDs of the selected notes, or an error."""
+    if (note_ids is None) == (query is None):
+        return [], "Provide either note_ids or query."
+    if note_ids is not None:
+        return note_ids, None
+    result = await make_anki_request("findNotes", query=query)
+    if not result["success"]:
+        return [], f"Failed to find notes: {result['error']}"
+    return result["result"], None
+
+
+def _invalid_tags(tags: List[str]) -> Optional[str]:
+    invalid = [tag for tag in tags if not tag or any(char.isspace() for char in tag)]
+    if invalid:
+        return f"Invalid tags: {', '.join(repr(tag) for tag in invalid)}. Tags can't be empty or contain spaces."
+    return None
+
+
+def _chunks(count: int) -> int:
+    return max(1, -(-count // settings.tag_batch_size))
@@ -1,32 +1,312 @@
+import asyncio
+import functools
+import json
+import random
+import time
+from contextlib import aclosing
+
 import httpx
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any
+
+from . import backends, codec
+from .backends import selected_backend
+from .cache import collection_cache
+from .circuit_breaker import CircuitBreaker
+from .config import settings
+from .metrics import metrics
+from .records import RECORD_DECODERS
+from .scheduler import Priority, RequestScheduler, minimum_priority
+from .streaming import ResultStreamDecoder
+
+# Actions that only read from the collection. Being idempotent, they are scheduled
+# ahead of writes and identical concurrent requests for them are coalesced.
+READ_ACTIONS = frozenset({
+    "version",
+    "deckNames",
+    "deckNamesAndIds",
+    "getDeckStats",
+    "modelNames",
+    "modelFieldNames",
+    "modelFieldDescriptions",
+    "getTags",
+    "findNotes",
+    "findCards",
+    "notesInfo",
+    "cardsInfo",
+    "cardsToNotes",
+    "areSuspended",
+    "getReviewsOfCards",
+    "getNumCardsReviewedByDay",
+    "getMediaFilesNames",
+})
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Errors after which a request is retried. Reads can always be sent again, while
+# writes are only retried when the connection failed and Anki never saw them.
+RETRYABLE_READ_ERRORS = (httpx.TransportError,)
+RETRYABLE_WRITE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class Connection:
+    """Requests to one Anki Connect backend: its connection pool, scheduler and circuit breaker."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.scheduler = RequestScheduler(max_in_flight=settings.max_in_flight)
+        self.breaker = CircuitBreaker(settings.failure_threshold, settings.recovery_timeout)
+        # Read requests currently in flight, keyed by action and params
+        self.pending_reads: Dict[tuple, asyncio.Task] = {}
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def url(self) -> str:
+        return backends.backend_urls[self.name]
+
+    def client(self) -> httpx.AsyncClient:
+        """Return the HTTP client shared by all requests to the backend on the running event loop.
+
+        Sharing the client keeps connections to Anki Connect pooled across tool calls
+        and across clients connected to the same server process.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.read_timeout, connect=settings.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=settings.max_connections,
+                    max_keepalive_connections=settings.max_keepalive_connections,
+                    keepalive_expiry=settings.keepalive_expiry,
+                ),
+            )
+            self._client_loop = loop
+        return self._client
+
+
+_connections: Dict[str, Connection] = {}
+
+
+def connection(name: str | None = None) -> Connection:
+    """Return the connection to a backend, by default the one the running tool uses."""
+    name = name or selected_backend()
+    conn = _connections.get(name)
+    if conn is None:
+        conn = _connections[name] = Connection(name)
+    return conn
 
-# Constants for Anki Connect
-ANKI_CONNECT_URL = "http://localhost:8765"
-ANKI_CONNECT_VERSION = 6
-DEFAULT_DECK_NAME = "Default"    # Pre-specified deck name
-DEFAULT_MODEL_NAME = "Basic"     # Pre-specified model name
 
 async def make_anki_request(action: str, **params) -> Dict[str, Any]:
-    """Make a request to the Anki Connect API with proper error handling."""
+    """Make a request to the Anki Connect API with proper error handling.
+    
+    Requests go to the backend the running tool uses. Concurrent calls of the
+    same read action with the same params share a single request to Anki Connect.
+    """
+    conn = connection()
+    if action not in READ_ACTIONS:
+        collection_cache.invalidate()
+        try:
+            return await _send_request(conn, action, params)
+        finally:
+            # Reads sent while the write was in flight may have seen either state
+            collection_cache.invalidate()
+
+    key = (action, json.dumps(params, sort_keys=True, default=str))
+    loop = asyncio.get_running_loop()
+    task = conn.pending_reads.get(key)
+    if task is None or task.get_loop() is not loop:
+        task = loop.create_task(_send_request(conn, action, params))
+        conn.pending_reads[key] = task
+        task.add_done_callback(functools.partial(_forget_read, conn, key))
+    else:
+        metrics.record_coalesced(action)
+
+    # Shield the shared request so one caller's cancellation doesn't fail the others
+    result = await asyncio.shield(task)
+    return dict(result)
+
+
+def _forget_read(conn: Connection, key: tuple, task: asyncio.Task) -> None:
+    if conn.pending_reads.get(key) is task:
+        del conn.pending_reads[key]
+
+
+async def _send_request(conn: Connection, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    result = await _post_with_retries(conn, action, params)
+    if not result["success"]:
+        metrics.record_request_error(action)
+    return result
+
+
+def _encode_request(action: str, params: Dict[str, Any]) -> bytes:
     request_data = {
         "action": action,
-        "version": ANKI_CONNECT_VERSION
+        "version": settings.anki_connect_version
     }
     
     if params:
         request_data["params"] = params
     
-    async with httpx.AsyncClient() as client:
+    return codec.dumps(request_data)
+
+
+async def _post_with_retries(conn: Connection, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        content = _encode_request(action, params)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    
+    priority = _priority(action)
+    retryable = RETRYABLE_READ_ERRORS if action in READ_ACTIONS else RETRYABLE_WRITE_ERRORS
+    
+    breaker = conn.breaker
+    error = None
+    for attempt in range(settings.retry_attempts):
+        if not breaker.allow_request():
+            return {
+                "success": False,
+                "error": error or f"Anki Connect is unavailable, next attempt in {breaker.retry_after:.0f}s",
+            }
+        
         try:
-            response = await client.post(ANKI_CONNECT_URL, json=request_data, timeout=30.0)
-            response.raise_for_status()
-            result = response.json()
+            queued = time.perf_counter()
+            async with conn.scheduler.slot(priority):
+                start = time.perf_counter()
+                metrics.record_stage("anki_connect.queue_wait", start - queued)
+                response = await conn.client().post(conn.url, content=content, headers=JSON_HEADERS)
+                elapsed = time.perf_counter() - start
+        except httpx.TransportError as e:
+            metrics.record_request(action, time.perf_counter() - start, len(content), 0)
+            breaker.record_failure()
+            error = str(e) or type(e).__name__
+            if isinstance(e, retryable) and attempt + 1 < settings.retry_attempts:
+                await asyncio.sleep(_backoff(attempt))
+                continue
+            return {"success": False, "error": error}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        
+        metrics.record_request(action, elapsed, len(content), len(response.content))
+        breaker.record_success()
+        break
+    
+    try:
+        response.raise_for_status()
+        with metrics.timed("anki_connect.decode"):
+            result = codec.loads(response.content)
             
             # Anki Connect returns an object with either a result or error field
             if "error" in result and result["error"]:
                 return {"success": False, "error": result["error"]}
             
-            return {"success": True, "result": result.get("result")}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+            return {"success": True, "result": _decode_records(action, result.get("result"))}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+class AnkiConnectError(Exception):
+    """A streamed Anki Connect request failed."""
+
+
+async def stream_anki_request(action: str, **params) -> AsyncIterator[Any]:
+    """Make a request whose result is a list and yield the items as they arrive.
+
+    Unlike make_anki_request, the response is decoded incrementally and never held
+    in memory as a whole, and closing the iterator early stops reading it. Streamed
+    requests are not coalesced and are only retried before the first item was
+    yielded. The scheduler slot is held until the iterator is exhausted or closed.
+
+    Raises:
+        AnkiConnectError: If the request failed or Anki Connect returned an error
+    """
+    try:
+        content = _encode_request(action, params)
+    except Exception as e:
+        raise AnkiConnectError(str(e)) from e
+
+    try:
+        async with aclosing(_stream_with_retries(connection(), action, content)) as items:
+            async for item in items:
+                yield item
+    except AnkiConnectError:
+        metrics.record_request_error(action)
+        raise
+
+
+async def _stream_with_retries(conn: Connection, action: str, content: bytes) -> AsyncIterator[Any]:
+    priority = _priority(action)
+    retryable = RETRYABLE_READ_ERRORS if action in READ_ACTIONS else RETRYABLE_WRITE_ERRORS
+
+    breaker = conn.breaker
+    error = None
+    for attempt in range(settings.retry_attempts):
+        if not breaker.allow_request():
+            raise AnkiConnectError(
+                error or f"Anki Connect is unavailable, next attempt in {breaker.retry_after:.0f}s"
+            )
+
+        yielded = False
+        try:
+            queued = time.perf_counter()
+            async with conn.scheduler.slot(priority):
+                start = time.perf_counter()
+                metrics.record_stage("anki_connect.queue_wait", start - queued)
+                received = 0
+                decoding = 0.0
+                try:
+                    async with conn.client().stream(
+                        "POST", conn.url, content=content, headers=JSON_HEADERS
+                    ) as response:
+                        response.raise_for_status()
+                        decoder = ResultStreamDecoder()
+                        async for chunk in response.aiter_bytes():
+                            received += len(chunk)
+                            decode_start = time.perf_counter()
+                            items = _decode_records(action, decoder.feed(chunk))
+                            decoding += time.perf_counter() - decode_start
+                            for item in items:
+                                yielded = True
+                                yield item
+                        items = _decode_records(action, decoder.close())
+                        # Like _post_with_retries, only a response read in full counts as a success
+                        breaker.record_success()
+                        for item in items:
+                            yield item
+                finally:
+                    metrics.record_request(action, time.perf_counter() - start, len(content), received)
+                    metrics.record_stage("anki_connect.decode", decoding)
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            error = str(e) or type(e).__name__
+            if isinstance(e, retryable) and not yielded and attempt + 1 < settings.retry_attempts:
+                await asyncio.sleep(_backoff(attempt))
+                continue
+            raise AnkiConnectError(error) from e
+        except (httpx.HTTPStatusError, ValueError, LookupError, TypeError, AttributeError) as e:
+            raise AnkiConnectError(str(e)) from e
+
+        # Anki Connect returns an object with either a result or error field
+        if decoder.error:
+            raise AnkiConnectError(decoder.error)
+        if decoder.result is not None:
+            raise AnkiConnectError(f"Expected a list from {action}, got {type(decoder.result).__name__}")
+        return
+
+
+def _decode_records(action: str, result: Any) -> Any:
+    """Decode the items of notesInfo, cardsInfo and review results into records."""
+    decode = RECORD_DECODERS.get(action)
+    if decode is None or not isinstance(result, list):
+        return result
+    return [decode(item) for item in result]
+
+
+def _priority(action: str) -> Priority:
+    """Schedule reads ahead of writes, except in background jobs, which run as bulk work."""
+    priority = Priority.INTERACTIVE if action in READ_ACTIONS else Priority.BULK
+    return max(priority, minimum_priority.get())
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number `attempt + 1`."""
+    return random.uniform(0, min(settings.backoff_max, settings.backoff_base * 2 ** attempt))
@@ -1,6 +1,12 @@
+import base64
+
 import pytest
 
 from anki_mcp.tools.add_or_update_notes import Note, add_or_update_notes, update_note, add_note
+from anki_mcp.tools import media
+from anki_mcp.tools.journal import WriteJournal
+from anki_mcp.tools.media import MediaFile, MediaManifest
+from anki_mcp.tools.records import NoteInfo
 
 
 @pytest.mark.asyncio
@@ -356,4 +362,130 @@ async def test_add_or_update_notes_all_failure(monkeypatch):
     text_content = result[0].text
     
     assert "Failed to add note 'Failed Note 1': Model not found" in text_content
-    assert "Failed to update note 'Failed Note 2' with ID 9999: Note not found" in text_content
\ No newline at end of file
+    assert "Failed to update note 'Failed Note 2' with ID 9999: Note not found" in text_content
+
+@pytest.fixture
+def journal(monkeypatch, tmp_path):
+    """Write the journal to a temporary file."""
+    journal = WriteJournal(tmp_path / "journal.jsonl")
+    monkeypatch.setattr("anki_mcp.tools.journal.journal", journal)
+    return journal
+
+
+def _keyed_note(key, front):
+    return Note(name=front, id=None, fields={"Front": front, "Back": "answer"}, key=key)
+
+
+@pytest.mark.asyncio
+async def test_resubmitted_notes_with_keys_are_skipped(monkeypatch, journal):
+    """Test that notes whose idempotency key was written are not sent again."""
+    added = []
+
+    async def mock_anki_request(action, **kwargs):
+        added.append(kwargs["note"]["fields"]["Front"])
+        return {"success": True, "result": 1000 + len(added)}
+
+    monkeypatch.setattr("anki_mcp.tools.add_or_update_notes.make_anki_request", mock_anki_request)
+
+    await add_or_update_notes([_keyed_note("k1", "one"), _keyed_note("k2", "two")])
+    result = await add_or_update_notes([_keyed_note("k1", "one"), _keyed_note("k2", "two"), _keyed_note("k3", "three")])
+
+    assert added == ["one", "two", "three"]
+    text = result[0].text
+    assert "Skipped note 'one': already added with ID 1001 (key 'k1')" in text
+    assert "Skipped note 'two': already added with ID 1002 (key 'k2')" in text
+    assert "Added note 'three' with ID 1003" in text
+
+
+@pytest.mark.asyncio
+async def test_interrupted_write_reported_as_probably_added(monkeypatch, journal):
+    """Test that a duplicate error for a key interrupted mid-write is not reported as a failure."""
+    journal.record_intent(["k1"])
+
+    async def mock_anki_request(action, **kwargs):
+        return {"success": False, "error": "cannot create note because it is a duplicate"}
+
+    monkeypatch.setattr("anki_mcp.tools.add_or_update_notes.make_anki_request", mock_anki_request)
+
+    result = await add_or_update_notes([_keyed_note("k1", "one")])
+
+    assert "Skipped note 'one': it was probably added by an interrupted earlier request" in result[0].text
+
+
+@pytest.mark.asyncio
+async def test_failed_keyed_note_is_retried(monkeypatch, journal):
+    """Test that a note Anki rejected is sent again when resubmitted."""
+    responses = [{"success": False, "error": "collection is not available"}, {"success": True, "result": 42}]
+
+    async def mock_anki_request(action, **kwargs):
+        return responses.pop(0)
+
+    monkeypatch.setattr("anki_mcp.tools.add_or_update_notes.make_anki_request", mock_anki_request)
+
+    first = await add_or_update_notes([_keyed_note("k1", "one")])
+    second = await add_or_update_notes([_keyed_note("k1", "one")])
+
+    assert "Failed to add note 'one'" in first[0].text
+    assert "Added note 'one' with ID 42" in second[0].text
+    assert journal.completed("k1")["note_id"] == 42
+
+
+@pytest.fixture
+def media_folder(monkeypatch):
+    """Store media in a fake, empty media folder."""
+    stored = {}
+
+    async def mock_media_request(action, **kwargs):
+        if action == "getMediaFilesNames":
+            return {"success": True, "result": list(stored)}
+        stored[kwargs["filename"]] = kwargs["data"]
+        return {"success": True, "result": kwargs["filename"]}
+
+    monkeypatch.setattr("anki_mcp.tools.media.make_anki_request", mock_media_request)
+    monkeypatch.setattr(media, "media_manifest", MediaManifest())
+    return stored
+
+
+@pytest.mark.asyncio
+async def test_note_media_referenced_in_fields(monkeypatch, media_folder):
+    """Test that note media are stored once and referenced at the end of their fields."""
+    sent = []
+
+    async def mock_anki_request(action, **kwargs):
+        sent.append((action, kwargs))
+        if action == "notesInfo":
+            return {"success": True, "result": [NoteInfo.from_anki({
+                "noteId": 7, "fields": {"Front": {"value": "bark", "order": 0}, "Back": {"value": "dog", "order": 1}},
+            })]}
+        return {"success": True, "result": 1234 if action == "addNote" else None}
+
+    monkeypatch.setattr("anki_mcp.tools.add_or_update_notes.make_anki_request", mock_anki_request)
+    sound = MediaFile(data=base64.b64encode(b"woof").decode(), filename="bark.mp3", field="Back")
+
+    result = await add_or_update_notes([
+        Note(name="new", id=None, fields={"Front": "bark", "Back": "dog"}, media=[sound]),
+        Note(name="existing", id=7, fields={"Front": "bark"}, media=[sound]),
+    ])
+
+    (name,) = media_folder
+    assert "Added note 'new' with ID 1234" in result[0].text
+    assert sent[0] == ("notesInfo", {"notes": [7]})
+    assert sent[1][1]["note"]["fields"] == {"Front": "bark", "Back": f"dog[sound:{name}]"}
+    assert sent[2][1]["note"]["fields"] == {"Front": "bark", "Back": f"dog[sound:{name}]"}
+
+
+@pytest.mark.asyncio
+async def test_note_media_failure_fails_the_note(monkeypatch, media_folder):
+    """Test that a note whose media couldn't be stored isn't written."""
+    async def mock_anki_request(action, **kwargs):
+        pytest.fail("make_anki_request should not be called")
+
+    monkeypatch.setattr("anki_mcp.tools.add_or_update_notes.make_anki_request", mock_anki_request)
+
+    result = await add_or_update_notes([
+        Note(name="broken", id=None, fields={"Front": "x"}, media=[MediaFile(path="/nonexistent.png", field="Back")]),
+    ])
+
+    assert result[0].text.startswith(
+        "Failed to add note 'broken': media file /nonexistent.png could not be stored: could not read the file"
+    )
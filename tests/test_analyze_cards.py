@@ -0,0 +1,151 @@
+import pytest
+from anki_mcp.tools.config import settings
+from anki_mcp.tools.analyze_cards import analyze_cards
+from anki_mcp.tools.records import CardInfo
+
+
+def _card(card_id, deck="Default", lapses=0, factor=2500, reps=10, queue=2):
+    return CardInfo(
+        card_id=card_id,
+        note_id=card_id,
+        deck_name=deck,
+        model_name="Basic",
+        lapses=lapses,
+        factor=factor,
+        reps=reps,
+        queue=queue,
+    )
+
+
+@pytest.mark.asyncio
+async def test_analyze_cards_ranks_leeches_per_deck(monkeypatch):
+    """Test that leeches are counted and ranked by lapses within each deck."""
+    cards = {
+        1: _card(1, "Spanish", lapses=9),
+        2: _card(2, "Spanish", lapses=14),
+        3: _card(3, "Spanish", lapses=1),
+        4: _card(4, "French", lapses=8),
+    }
+
+    async def mock_anki_request(action, **kwargs):
+        if action == "findCards":
+            assert kwargs["query"] == "deck:*"
+            return {"success": True, "result": list(cards)}
+        if action == "cardsInfo":
+            return {"success": True, "result": [cards[cid] for cid in kwargs["cards"]]}
+        return {"success": False, "error": "Unexpected action"}
+
+    monkeypatch.setattr("anki_mcp.tools.analyze_cards.make_anki_request", mock_anki_request)
+
+    result = await analyze_cards()
+
+    text = result[0].text
+    assert "Analyzed 4 card(s) in 2 deck(s)" in text
+    assert "Leeches (>= 8 lapses): 3" in text
+    assert "Deck 'Spanish' (3 cards, 2 leeches" in text
+    assert text.index("Card 2: 14 lapses") < text.index("Card 1: 9 lapses")
+    assert "Card 3:" not in text
+    # Deck with more leeches is listed first
+    assert text.index("Deck 'Spanish'") < text.index("Deck 'French'")
+
+
+@pytest.mark.asyncio
+async def test_analyze_cards_fetches_in_chunks(monkeypatch):
+    """Test that card info is requested in bounded chunks."""
+    card_ids = list(range(1, 8))
+    chunk_sizes = []
+
+    async def mock_anki_request(action, **kwargs):
+        if action == "findCards":
+            return {"success": True, "result": card_ids}
+        if action == "cardsInfo":
+            chunk_sizes.append(len(kwargs["cards"]))
+            return {"success": True, "result": [_card(cid) for cid in kwargs["cards"]]}
+        return {"success": False, "error": "Unexpected action"}
+
+    monkeypatch.setattr("anki_mcp.tools.analyze_cards.make_anki_request", mock_anki_request)
+    monkeypatch.setattr(settings, "analyze_batch_size", 3)
+
+    result = await analyze_cards()
+
+    assert chunk_sizes == [3, 3, 1]
+    assert "Analyzed 7 card(s)" in result[0].text
+
+
+@pytest.mark.asyncio
+async def test_analyze_cards_ease_outliers(monkeypatch):
+    """Test that cards far below the deck's average ease are reported."""
+    cards = [_card(i, factor=2500) for i in range(1, 20)] + [_card(99, factor=1300)]
+
+    async def mock_anki_request(action, **kwargs):
+        if action == "findCards":
+            return {"success": True, "result": [c.card_id for c in cards]}
+        if action == "cardsInfo":
+            return {"success": True, "result": cards}
+        return {"success": False, "error": "Unexpected action"}
+
+    monkeypatch.setattr("anki_mcp.tools.analyze_cards.make_anki_request", mock_anki_request)
+
+    result = await analyze_cards()
+
+    text = result[0].text
+    assert "Ease outliers:" in text
+    assert "Card 99: ease 130%" in text
+    assert "Card 1: ease" not in text
+
+
+@pytest.mark.asyncio
+async def test_analyze_cards_suspends_leeches_in_one_request(monkeypatch):
+    """Test that unsuspended leeches are suspended with a single request."""
+    cards = [
+        _card(1, lapses=10),
+        _card(2, lapses=12, queue=-1),  # already suspended
+        _card(3, lapses=11),
+        _card(4, lapses=0),
+    ]
+    suspend_calls = []
+
+    async def mock_anki_request(action, **kwargs):
+        if action == "findCards":
+            return {"success": True, "result": [c.card_id for c in cards]}
+        if action == "cardsInfo":
+            return {"success": True, "result": cards}
+        if action == "suspend":
+            suspend_calls.append(kwargs["cards"])
+            return {"success": True, "result": True}
+        return {"success": False, "error": "Unexpected action"}
+
+    monkeypatch.setattr("anki_mcp.tools.analyze_cards.make_anki_request", mock_anki_request)
+
+    result = await analyze_cards(suspend_leeches=True)
+
+    assert suspend_calls == [[1, 3]]
+    assert "Suspended 2 leech(es)." in result[0].text
+
+
+@pytest.mark.asyncio
+async def test_analyze_cards_no_results(monkeypatch):
+    """Test analysis of a query without matching cards."""
+    async def mock_anki_request(action, **kwargs):
+        return {"success": True, "result": []}
+
+    monkeypatch.setattr("anki_mcp.tools.analyze_cards.make_anki_request", mock_anki_request)
+
+    result = await analyze_cards("deck:Empty")
+
+    assert "No cards found matching query: 'deck:Empty'" in result[0].text
+
+
+@pytest.mark.asyncio
+async def test_analyze_cards_api_failure(monkeypatch):
+    """Test handling of API errors while fetching card info."""
+    async def mock_anki_request(action, **kwargs):
+        if action == "findCards":
+            return {"success": True, "result": [1]}
+        return {"success": False, "error": "Anki is busy"}
+
+    monkeypatch.setattr("anki_mcp.tools.analyze_cards.make_anki_request", mock_anki_request)
+
+    result = await analyze_cards()
+
+    assert "Failed to retrieve card info: Anki is busy" in result[0].text
@@ -0,0 +1,66 @@
+import pytest
+from anki_mcp.tools import backends
+from anki_mcp.tools.backends import (
+    UnknownBackendError, configure_backends, current_backend, parse_backends, select_backends, selected_backend,
+)
+from anki_mcp.tools.cache import collection_cache
+
+
+@pytest.fixture(autouse=True)
+def restore_backends(monkeypatch):
+    monkeypatch.setattr(backends, "backend_urls", dict(backends.backend_urls))
+
+
+def test_parse_backends():
+    """Test parsing repeated and comma-separated NAME=URL pairs."""
+    urls = parse_backends(["es=http://localhost:8765, fr=http://localhost:8766", "de=https://anki.example:443"])
+
+    assert urls == {
+        "es": "http://localhost:8765",
+        "fr": "http://localhost:8766",
+        "de": "https://anki.example:443",
+    }
+    with pytest.raises(ValueError, match="expected NAME=URL"):
+        parse_backends(["http://localhost:8765"])
+    with pytest.raises(ValueError, match="Invalid backend name"):
+        parse_backends(["a b=http://localhost:8765"])
+    with pytest.raises(ValueError, match="Invalid URL"):
+        parse_backends(["es=localhost:8765"])
+
+
+def test_default_backend_is_named_default_or_first():
+    """Test which configured backend is the default."""
+    configure_backends({"es": "http://localhost:1", "fr": "http://localhost:2"})
+    assert selected_backend() == "es"
+
+    configure_backends({"es": "http://localhost:1", "default": "http://localhost:2"})
+    assert selected_backend() == "default"
+    assert list(backends.backend_urls) == ["default", "es"]
+
+
+def test_select_backends():
+    """Test resolving a profile argument to backend names."""
+    configure_backends({"es": "http://localhost:1", "fr": "http://localhost:2", "de": "http://localhost:3"})
+
+    assert select_backends(None) == ["es"]
+    assert select_backends("fr") == ["fr"]
+    assert select_backends("de, fr,de") == ["de", "fr"]
+    assert select_backends("*") == ["es", "fr", "de"]
+    with pytest.raises(UnknownBackendError, match="Unknown profile 'it'. Available profiles: es, fr, de"):
+        select_backends("fr,it")
+
+
+def test_collection_cache_per_backend():
+    """Test that every backend has its own cache, and a write only invalidates its own."""
+    configure_backends({"es": "http://localhost:1", "fr": "http://localhost:2"})
+    for name in ("es", "fr"):
+        token = current_backend.set(name)
+        collection_cache.set("decks", name, collection_cache.generation)
+        current_backend.reset(token)
+
+    token = current_backend.set("fr")
+    collection_cache.invalidate()
+    assert collection_cache.get("decks") is None
+    current_backend.reset(token)
+
+    assert collection_cache.get("decks") == "es"
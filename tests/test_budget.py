@@ -0,0 +1,57 @@
+import pytest
+
+from anki_mcp.tools.budget import TokenBudget, decode_cursor, encode_cursor, estimate_tokens
+
+
+def test_estimate_tokens():
+    """Test that tokens are estimated as four characters each, rounded up."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_budget_takes_items_while_they_fit():
+    """Test that items are taken until the budget is spent."""
+    budget = TokenBudget(10)
+
+    assert budget.take(6)
+    assert budget.take(4)
+    assert not budget.take(1)
+    assert budget.used == 10
+
+
+def test_budget_always_takes_first_item():
+    """Test that the first item is taken even if it exceeds the budget, so paging makes progress."""
+    budget = TokenBudget(5)
+
+    assert budget.take(50)
+    assert not budget.take(1)
+
+
+def test_unlimited_budget():
+    """Test that a budget without max_tokens takes everything."""
+    budget = TokenBudget()
+
+    assert not budget.limited
+    assert all(budget.take(1000) for _ in range(10))
+
+
+def test_cursor_round_trip():
+    """Test that a cursor decodes to the position it was created for."""
+    assert decode_cursor(encode_cursor("find-notes:deck:A", 40), "find-notes:deck:A") == 40
+    assert decode_cursor(encode_cursor("overview", [2, 15]), "overview") == [2, 15]
+
+
+def test_cursor_of_another_query():
+    """Test that a cursor can't continue a different query."""
+    cursor = encode_cursor("find-notes:deck:A", 40)
+
+    with pytest.raises(ValueError, match="different query"):
+        decode_cursor(cursor, "find-notes:deck:B")
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor!", "bm90IGpzb24", encode_cursor("scope", -1)])
+def test_malformed_cursor(cursor):
+    """Test that malformed cursors are rejected."""
+    with pytest.raises(ValueError, match="malformed cursor"):
+        decode_cursor(cursor, "scope")
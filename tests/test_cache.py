@@ -0,0 +1,35 @@
+from anki_mcp.tools.cache import CollectionCache
+
+
+def test_entries_expire(monkeypatch):
+    """Test that entries are dropped after their time to live."""
+    now = [100.0]
+    monkeypatch.setattr("anki_mcp.tools.cache.time.monotonic", lambda: now[0])
+    cache = CollectionCache(ttl=10)
+
+    cache.set("key", "value", cache.generation)
+    assert cache.get("key") == "value"
+
+    now[0] = 110.0
+    assert cache.get("key") is None
+
+
+def test_invalidate_drops_entries():
+    """Test that a write drops all entries."""
+    cache = CollectionCache()
+    cache.set("key", "value", cache.generation)
+
+    cache.invalidate()
+
+    assert cache.get("key") is None
+
+
+def test_values_read_before_a_write_are_not_stored():
+    """Test that a value computed while a write was sent is discarded."""
+    cache = CollectionCache()
+    generation = cache.generation
+
+    cache.invalidate()
+    cache.set("key", "stale", generation)
+
+    assert cache.get("key") is None
@@ -0,0 +1,67 @@
+import pytest
+from anki_mcp.tools.config import settings
+from anki_mcp.tools.change_deck import change_deck
+from anki_mcp.tools.records import CardInfo
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    requests = []
+
+    async def mock_anki_request(action, **kwargs):
+        requests.append((action, kwargs))
+        if action == "findCards":
+            return {"success": True, "result": [1, 2, 3]}
+        return {"success": True, "result": None}
+
+    async def mock_stream(action, **kwargs):
+        requests.append((action, kwargs))
+        assert action == "cardsInfo"
+        for card_id, deck in zip(kwargs["cards"], ["Inbox", "Inbox", "Japanese"]):
+            yield CardInfo.from_anki({"cardId": card_id, "deckName": deck})
+
+    monkeypatch.setattr("anki_mcp.tools.change_deck.make_anki_request", mock_anki_request)
+    monkeypatch.setattr("anki_mcp.tools.change_deck.stream_anki_request", mock_stream)
+    return requests
+
+
+@pytest.mark.asyncio
+async def test_change_deck_by_query_in_chunks(requests, monkeypatch):
+    """Test that the cards matching a query are moved in chunks, with the count of each."""
+    monkeypatch.setattr(settings, "change_deck_batch_size", 2)
+
+    result = await change_deck("Japanese", query="deck:Inbox")
+
+    assert result[0].text == "Moved 3 card(s) to deck 'Japanese' in 2 chunks of 2, 1 cards."
+    assert requests == [
+        ("findCards", {"query": "deck:Inbox"}),
+        ("changeDeck", {"cards": [1, 2], "deck": "Japanese"}),
+        ("changeDeck", {"cards": [3], "deck": "Japanese"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_change_deck_dry_run(requests):
+    """Test that a dry run counts the cards by their current deck without moving them."""
+    result = await change_deck("Japanese", card_ids=[1, 2, 3], dry_run=True)
+
+    assert result[0].text == (
+        "Dry run: would move 2 of 3 card(s) to deck 'Japanese' in 1 chunk(s).\n"
+        "- Inbox: 2 card(s)\n"
+        "- Japanese: 1 card(s) (already there)"
+    )
+    assert [action for action, _ in requests] == ["cardsInfo"]
+
+
+@pytest.mark.asyncio
+async def test_change_deck_validation_and_failure(requests, monkeypatch):
+    """Test the selection checks and a failed chunk."""
+    result = await change_deck("Japanese")
+    assert result[0].text == "Provide either card_ids or query."
+
+    async def failing_request(action, **kwargs):
+        return {"success": False, "error": "collection is locked"}
+
+    monkeypatch.setattr("anki_mcp.tools.change_deck.make_anki_request", failing_request)
+    result = await change_deck("Japanese", card_ids=[1])
+    assert result[0].text == "Failed to move cards after 0 of 1 cards: collection is locked"
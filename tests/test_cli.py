@@ -0,0 +1,208 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import anki_mcp
+from anki_mcp.profiling import ToolProfiler
+from anki_mcp.server import app
+
+
+@pytest.fixture
+def run_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(app, "run", lambda transport: calls.append(transport))
+    monkeypatch.setattr(anki_mcp, "configure", lambda settings: None)
+    monkeypatch.setattr(app.settings, "host", app.settings.host)
+    monkeypatch.setattr(app.settings, "port", app.settings.port)
+    return calls
+
+
+def test_main_defaults_to_stdio(run_calls):
+    """Test that the server runs over stdio without arguments."""
+    anki_mcp.main([])
+
+    assert run_calls == ["stdio"]
+
+
+def test_main_streamable_http(run_calls):
+    """Test serving over streamable HTTP on a custom host and port."""
+    anki_mcp.main(["--transport", "streamable-http", "--host", "0.0.0.0", "--port", "9000"])
+
+    assert run_calls == ["streamable-http"]
+    assert app.settings.host == "0.0.0.0"
+    assert app.settings.port == 9000
+
+
+def test_main_sse(run_calls):
+    """Test serving over SSE."""
+    anki_mcp.main(["--transport", "sse"])
+
+    assert run_calls == ["sse"]
+
+
+def test_main_rejects_unknown_transport(run_calls):
+    """Test that unknown transports are rejected."""
+    with pytest.raises(SystemExit):
+        anki_mcp.main(["--transport", "websocket"])
+
+    assert run_calls == []
+
+
+def test_main_metrics_endpoint(run_calls, monkeypatch):
+    """Test that the metrics endpoint is only enabled for HTTP transports."""
+    enabled = []
+    monkeypatch.setattr(anki_mcp, "enable_metrics_endpoint", lambda: enabled.append(True))
+
+    anki_mcp.main(["--metrics-endpoint"])
+    assert enabled == []
+
+    anki_mcp.main(["--transport", "streamable-http", "--metrics-endpoint"])
+    assert enabled == [True]
+
+
+def test_main_configures_profiler(run_calls, monkeypatch, tmp_path):
+    """Test that the profiling options configure the tool profiler."""
+    profiler = ToolProfiler()
+    monkeypatch.setattr(anki_mcp, "profiler", profiler)
+
+    anki_mcp.main(["--profile-dir", str(tmp_path), "--slow-call-ms", "250"])
+
+    assert profiler.directory == tmp_path
+    assert profiler.slow_call_ms == 250
+
+
+def test_main_profiler_environment(run_calls, monkeypatch, tmp_path):
+    """Test that the profiling options default to the environment, whose invalid values are rejected."""
+    profiler = ToolProfiler()
+    monkeypatch.setattr(anki_mcp, "profiler", profiler)
+    monkeypatch.setenv("ANKI_MCP_PROFILE_DIR", str(tmp_path / "profiles"))
+    monkeypatch.setenv("ANKI_MCP_SLOW_CALL_MS", "abc")
+
+    with pytest.raises(SystemExit):
+        anki_mcp.main([])
+    anki_mcp.main(["--slow-call-ms", "100"])
+
+    assert profiler.directory == tmp_path / "profiles" and profiler.directory.is_dir()
+    assert profiler.slow_call_ms == 100
+    assert run_calls == ["stdio"]
+
+
+def test_main_output_format(run_calls, monkeypatch):
+    """Test that the output format is set before the tools are registered again."""
+    formats = []
+    monkeypatch.setattr(anki_mcp, "set_output_format", formats.append)
+    monkeypatch.setattr(anki_mcp, "register_tools", lambda: formats.append("registered"))
+
+    anki_mcp.main(["--output-format", "json"])
+
+    assert formats == ["json", "registered"]
+
+
+def test_main_output_format_environment(run_calls, monkeypatch):
+    """Test that the output format defaults to the environment, whose invalid values are rejected."""
+    formats = []
+    monkeypatch.setattr(anki_mcp, "set_output_format", formats.append)
+    monkeypatch.setattr(anki_mcp, "register_tools", lambda: None)
+    monkeypatch.setenv("ANKI_MCP_OUTPUT_FORMAT", "xml")
+
+    with pytest.raises(SystemExit):
+        anki_mcp.main([])
+    anki_mcp.main(["--output-format", "text"])
+    monkeypatch.setenv("ANKI_MCP_OUTPUT_FORMAT", "json")
+    anki_mcp.main([])
+
+    assert formats == ["json"]
+
+
+def test_main_json_codec_and_journal_environment(run_calls, monkeypatch, tmp_path):
+    """Test that the codec and journal are read from the environment, and a codec that isn't installed is rejected."""
+    configured = []
+    monkeypatch.setattr(anki_mcp, "configure", configured.append)
+    monkeypatch.setenv("ANKI_MCP_JSON", "simdjson")
+    monkeypatch.setenv("ANKI_MCP_JOURNAL", str(tmp_path / "journal.jsonl"))
+
+    with pytest.raises(SystemExit):
+        anki_mcp.main([])
+    monkeypatch.setenv("ANKI_MCP_JSON", "json")
+    anki_mcp.main([])
+
+    assert [(settings.json_codec, settings.journal) for settings in configured] == [
+        ("json", tmp_path / "journal.jsonl")
+    ]
+
+
+def test_main_backends(run_calls, monkeypatch):
+    """Test that --backend options replace the configured backends."""
+    configured = []
+    monkeypatch.setattr(anki_mcp, "configure_backends", configured.append)
+
+    anki_mcp.main(["--backend", "es=http://localhost:8765", "--backend", "fr=http://localhost:8766"])
+
+    assert configured == [{"es": "http://localhost:8765", "fr": "http://localhost:8766"}]
+
+
+def test_main_rejects_invalid_backend(run_calls):
+    """Test that a malformed --backend option is rejected."""
+    with pytest.raises(SystemExit):
+        anki_mcp.main(["--backend", "localhost:8765"])
+    assert run_calls == []
+
+
+def test_main_settings(run_calls, monkeypatch, tmp_path):
+    """Test that setting flags override the config file, which is applied before the server runs."""
+    configured = []
+    monkeypatch.setattr(anki_mcp, "configure", configured.append)
+    config = tmp_path / "anki-mcp.json"
+    config.write_text(json.dumps({"read_timeout": 60, "tag_batch_size": 200}))
+
+    anki_mcp.main(["--config", str(config), "--tag-batch-size", "50", "--max-in-flight", "4"])
+
+    settings = configured[0]
+    assert (settings.read_timeout, settings.tag_batch_size, settings.max_in_flight) == (60, 50, 4)
+    assert run_calls == ["stdio"]
+
+
+def test_main_rejects_invalid_setting(run_calls):
+    """Test that an invalid setting value is rejected before the server runs."""
+    with pytest.raises(SystemExit):
+        anki_mcp.main(["--retry-attempts", "0"])
+    assert run_calls == []
+
+
+def test_main_flag_overrides_invalid_environment(run_calls, monkeypatch):
+    """Test that an invalid environment value is reported, unless a flag overrides it."""
+    configured = []
+    monkeypatch.setattr(anki_mcp, "configure", configured.append)
+    monkeypatch.setenv("ANKI_MCP_READ_TIMEOUT", "abc")
+
+    with pytest.raises(SystemExit):
+        anki_mcp.main([])
+    anki_mcp.main(["--read-timeout", "5"])
+
+    assert [settings.read_timeout for settings in configured] == [5]
+    assert run_calls == ["stdio"]
+
+
+def test_invalid_environment_does_not_break_import():
+    """Test that settings from the environment are only read by main, so --help still works."""
+    result = subprocess.run(
+        [sys.executable, "-c", "import anki_mcp; anki_mcp.main(['--help'])"],
+        env={
+            **os.environ,
+            "ANKI_MCP_READ_TIMEOUT": "abc",
+            "ANKI_MCP_CONFIG": "/nonexistent/config.json",
+            "ANKI_MCP_SLOW_CALL_MS": "abc",
+            "ANKI_MCP_PROFILE_DIR": "/proc/anki-mcp",
+            "ANKI_MCP_OUTPUT_FORMAT": "xml",
+            "ANKI_MCP_JSON": "ujson",
+            "ANKI_MCP_JOURNAL": "/proc/anki-mcp/journal.jsonl",
+        },
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "--read-timeout" in result.stdout
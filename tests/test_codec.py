@@ -0,0 +1,44 @@
+import json
+
+import pytest
+from anki_mcp.tools import codec
+
+
+@pytest.fixture(params=sorted(codec.CODECS))
+def json_codec(request):
+    previous = codec.current_codec()
+    yield codec.use_codec(request.param)
+    codec.use_codec(previous.name)
+
+
+def test_round_trip(json_codec):
+    """Test that every installed codec round-trips Anki Connect payloads."""
+    payload = {
+        "action": "addNotes",
+        "version": 6,
+        "params": {"notes": [{"fields": {"Front": "naïve ☃ <b>bold</b>", "Back": ""}, "tags": [], "id": 1234567890123}]},
+    }
+
+    encoded = codec.dumps(payload)
+
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == payload
+    assert codec.loads(encoded) == payload
+    assert codec.loads(encoded.decode()) == payload
+
+
+def test_unknown_codec():
+    """Test that selecting a codec that isn't installed fails."""
+    with pytest.raises(ValueError, match="not available"):
+        codec.use_codec("simdjson")
+
+
+def test_default_prefers_fast_codec():
+    """Test that the fastest installed codec is the default."""
+    previous = codec.current_codec()
+    try:
+        selected = codec.use_codec()
+    finally:
+        codec.use_codec(previous.name)
+
+    assert selected.name == next(name for name in codec.PREFERENCE if name in codec.CODECS)
@@ -0,0 +1,107 @@
+import json
+
+import httpx
+import pytest
+from anki_mcp.tools import backends, codec
+from anki_mcp.tools import journal as journal_module
+from anki_mcp.tools.config import ConfigError, Settings, configure, load_settings, settings
+from anki_mcp.tools.utils import Connection
+
+
+@pytest.fixture(autouse=True)
+def restore_settings(monkeypatch):
+    for name in Settings.model_fields:
+        monkeypatch.setattr(settings, name, getattr(settings, name))
+    monkeypatch.setattr(backends, "backend_urls", dict(backends.backend_urls))
+    monkeypatch.setattr(codec, "_codec", codec.current_codec())
+    monkeypatch.setattr(journal_module, "journal", journal_module.journal)
+
+
+def test_load_settings_defaults():
+    """Test that settings not given anywhere keep their defaults."""
+    loaded = load_settings(environ={})
+
+    assert loaded == Settings()
+    assert loaded.read_timeout == 30.0 and loaded.default_deck == "Default"
+
+
+def test_load_settings_precedence(tmp_path):
+    """Test that the environment overrides the config file, and overrides the environment."""
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"read_timeout": 60, "max_in_flight": 4, "cache_ttl": 5}))
+    environ = {"ANKI_MCP_CONFIG": str(config), "ANKI_MCP_MAX_IN_FLIGHT": "3", "ANKI_MCP_CACHE_TTL": "10"}
+
+    loaded = load_settings(overrides={"cache_ttl": "0"}, environ=environ)
+
+    assert (loaded.read_timeout, loaded.max_in_flight, loaded.cache_ttl) == (60, 3, 0)
+
+
+def test_load_settings_backends(tmp_path):
+    """Test that backends are read from ANKI_CONNECT_BACKENDS or as an object in the config file."""
+    environ = {"ANKI_CONNECT_BACKENDS": "es=http://localhost:8765,fr=http://localhost:8766"}
+    assert load_settings(environ=environ).backends == {"es": "http://localhost:8765", "fr": "http://localhost:8766"}
+
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"backends": {"work": "ftp://localhost"}}))
+    with pytest.raises(ConfigError, match="Invalid URL for backend 'work'"):
+        load_settings(str(config), environ={})
+
+
+@pytest.mark.parametrize("content, message", [
+    ("{not json", "Could not read config file"),
+    ("[1, 2]", "must hold a JSON object"),
+    ('{"read_timout": 5}', "read_timout: Extra inputs are not permitted"),
+    ('{"tag_batch_size": 0}', "tag_batch_size: Input should be greater than or equal to 1"),
+])
+def test_load_settings_invalid_file(tmp_path, content, message):
+    """Test that unreadable config files, unknown settings and invalid values are reported."""
+    config = tmp_path / "config.json"
+    config.write_text(content)
+
+    with pytest.raises(ConfigError, match=message):
+        load_settings(str(config), environ={})
+
+
+def test_load_settings_invalid_environment():
+    """Test that invalid values from the environment are reported with the setting's name."""
+    with pytest.raises(ConfigError, match="read_timeout"):
+        load_settings(environ={"ANKI_MCP_READ_TIMEOUT": "soon"})
+
+
+def test_configure_applies_settings_in_place():
+    """Test that configure updates the shared settings object and the backends."""
+    configure(Settings(backends={"work": "http://localhost:8766"}, replace_batch_size=20))
+
+    assert settings.replace_batch_size == 20
+    assert backends.backend_urls == {"work": "http://localhost:8766"}
+
+
+def test_configure_applies_codec_and_journal(tmp_path):
+    """Test that configure switches the JSON codec and opens the configured journal."""
+    configure(Settings(json_codec="json", journal=tmp_path / "journal.jsonl"))
+
+    assert codec.current_codec().name == "json"
+    assert journal_module.journal.path == tmp_path / "journal.jsonl"
+
+
+def test_load_settings_rejects_unknown_codec():
+    """Test that a JSON codec that isn't installed is rejected."""
+    with pytest.raises(ConfigError, match="json_codec: .*'ujson' is not available"):
+        load_settings(environ={"ANKI_MCP_JSON": "ujson"})
+
+
+@pytest.mark.asyncio
+async def test_connections_use_settings(monkeypatch):
+    """Test that connections take their limits and timeouts from the settings when created."""
+    monkeypatch.setattr(settings, "max_in_flight", 5)
+    monkeypatch.setattr(settings, "read_timeout", 90)
+    monkeypatch.setattr(settings, "failure_threshold", 2)
+
+    conn = Connection("default")
+    client = conn.client()
+
+    assert conn.scheduler.max_in_flight == 5
+    assert conn.breaker.failure_threshold == 2
+    assert client.timeout == httpx.Timeout(90, connect=settings.connect_timeout)
+    await client.aclose()
+
@@ -0,0 +1,303 @@
+import pytest
+from anki_mcp.server import app
+from anki_mcp.testing import FakeAnkiConnect, FakeCollection
+from anki_mcp.tools import backends, media, utils
+from anki_mcp.tools.add_or_update_notes import Note, add_or_update_notes
+from anki_mcp.tools.analyze_cards import analyze_cards
+from anki_mcp.tools.cache import collection_cache
+from anki_mcp.tools.change_deck import change_deck
+from anki_mcp.tools.config import settings
+from anki_mcp.tools.find_and_replace_fields import find_and_replace_fields
+from anki_mcp.tools.find_cards import find_cards
+from anki_mcp.tools.find_notes import find_notes
+from anki_mcp.tools.get_collection_overview import get_collection_overview
+from anki_mcp.tools.get_deck_tree import get_deck_tree
+from anki_mcp.tools.get_review_stats import get_review_stats
+from anki_mcp.tools.get_tag_stats import get_tag_stats
+from anki_mcp.tools.import_notes import import_notes
+from anki_mcp.tools.media import MediaFile, MediaManifest
+from anki_mcp.tools.suspend_cards import suspend_cards
+from anki_mcp.tools.tag_notes import add_tags, rename_tag
+
+
+@pytest.fixture
+def anki(monkeypatch):
+    """Point the tools at a fake Anki Connect serving a small synthetic collection."""
+    with FakeAnkiConnect(FakeCollection.generate(200, seed=1)) as anki:
+        monkeypatch.setitem(backends.backend_urls, "default", anki.url)
+        monkeypatch.setattr(utils, "_connections", {})
+        yield anki
+
+
+def test_generate_is_reproducible():
+    """Test that the same seed generates the same collection."""
+    first = FakeCollection.generate(50, seed=3)
+    second = FakeCollection.generate(50, seed=3)
+
+    assert [note.fields for note in first.notes.values()] == [note.fields for note in second.notes.values()]
+    assert len(first.notes) == 50
+    assert len(first.cards) >= 50
+
+
+def test_search_syntax():
+    """Test the supported subset of Anki's search syntax."""
+    collection = FakeCollection()
+    spanish = collection.add_note("Basic", "Languages::Spanish", {"Front": "hola", "Back": "hello"}, ["lang::es"])
+    french = collection.add_note("Basic", "Languages::French", {"Front": "bonjour", "Back": "hello"}, ["lang::fr"])
+    cloze = collection.add_note("Cloze", "Default", {"Text": "{{c1::atom}}"}, [])
+    collection.cards[spanish.cards[0]].lapses = 9
+
+    assert collection.find_notes("deck:Languages") == [spanish.note_id, french.note_id]
+    assert collection.find_notes("deck:Languages::Spanish") == [spanish.note_id]
+    assert collection.find_notes("tag:lang") == [spanish.note_id, french.note_id]
+    assert collection.find_notes("tag:lang::fr") == [french.note_id]
+    assert collection.find_notes("hello -tag:lang::es") == [french.note_id]
+    assert collection.find_notes("front:hol*") == [spanish.note_id]
+    assert collection.find_notes("note:Cloze OR hola") == [spanish.note_id, cloze.note_id]
+    assert collection.find_cards("prop:lapses>5") == spanish.cards
+    assert len(collection.find_cards("deck:*")) == 3
+
+
+def test_handle_reports_errors():
+    """Test that failing and unknown actions produce Anki Connect errors."""
+    anki = FakeAnkiConnect()
+
+    assert anki.handle({"action": "noSuchAction"}) == {"result": None, "error": "unsupported action"}
+    assert "model was not found" in anki.handle(
+        {"action": "modelFieldNames", "params": {"modelName": "Missing"}}
+    )["error"]
+
+
+def test_multi_runs_every_action():
+    """Test that multi returns one response per action, bare results for unversioned actions."""
+    anki = FakeAnkiConnect()
+
+    result = anki.handle({"action": "multi", "params": {"actions": [
+        {"action": "version", "version": 6},
+        {"action": "deckNames", "version": 6},
+        {"action": "noSuchAction", "version": 6},
+        {"action": "deckNames"},
+        {"action": "noSuchAction", "version": 4},
+    ]}})
+
+    assert result["result"] == [
+        {"result": 6, "error": None},
+        {"result": ["Default"], "error": None},
+        {"result": None, "error": "unsupported action"},
+        ["Default"],
+        None,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_find_notes_over_http(anki):
+    """Test find-notes against the fake server."""
+    result = await find_notes("deck:Science", limit=5)
+
+    assert "notes matching query: 'deck:Science'" in result[0].text
+    assert anki.request_counts["notesInfo"] == 1
+    assert anki.bytes_sent > 0
+
+
+@pytest.mark.asyncio
+async def test_find_and_suspend_cards_over_http(anki):
+    """Test find-cards followed by suspend-cards against the fake server."""
+    card_ids = anki.collection.find_cards("-is:suspended")[:3]
+
+    result = await find_cards("-is:suspended", limit=3)
+    assert all(str(card_id) in result[0].text for card_id in card_ids)
+
+    result = await suspend_cards(card_ids)
+    assert "Successfully suspended 3 card(s)" in result[0].text
+    assert set(card_ids) <= set(anki.collection.find_cards("is:suspended"))
+
+
+@pytest.mark.asyncio
+async def test_add_and_update_notes_over_http(anki):
+    """Test adding and updating notes against the fake server."""
+    result = await add_or_update_notes([
+        Note(name="New", id=None, fields={"Front": "unique question", "Back": "answer"}, tags=["new"]),
+        Note(name="Duplicate", id=None, fields={"Front": "unique question", "Back": "again"}),
+    ])
+
+    text = result[0].text
+    assert "Added note 'New' with ID" in text
+    assert "Failed to add note 'Duplicate': cannot create note because it is a duplicate" in text
+
+    note_id = anki.collection.find_notes("front:unique*")[0]
+    await add_or_update_notes([Note(name="New", id=note_id, fields={"Back": "changed"})])
+    assert anki.collection.notes[note_id].fields["Back"] == "changed"
+
+
+@pytest.mark.asyncio
+async def test_overview_stats_and_analysis_over_http(anki):
+    """Test the read-only overview, review stats and analysis tools against the fake server."""
+    overview = await get_collection_overview()
+    assert "Languages::Spanish" in overview[0].text
+
+    stats = await get_review_stats(time_range="all")
+    assert "total reviews" in stats[0].text
+
+    analysis = await analyze_cards(min_lapses=3)
+    assert "Analyzed" in analysis[0].text
+
+
+@pytest.mark.asyncio
+async def test_injected_latency(monkeypatch):
+    """Test that per-action latency slows down only that action."""
+    with FakeAnkiConnect(action_latency={"deckNames": 0.05}) as anki:
+        monkeypatch.setitem(backends.backend_urls, "default", anki.url)
+        monkeypatch.setattr(utils, "_connections", {})
+
+        await utils.make_anki_request("version")
+        await utils.make_anki_request("deckNames")
+
+    assert utils.metrics.actions["deckNames"].latency.sum >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_deck_tree_cache_invalidated_by_writes(anki):
+    """Test that the deck tree is served from the cache until a note is added."""
+    collection_cache.invalidate()
+
+    first = (await get_deck_tree())[0].text
+    await get_deck_tree()
+    assert anki.request_counts["getDeckStats"] == 1
+
+    await add_or_update_notes([Note(name="new", id=None, deck="Default", model="Basic",
+                                    fields={"Front": "cached?", "Back": "no"})])
+    second = (await get_deck_tree())[0].text
+
+    assert anki.request_counts["getDeckStats"] == 2
+    assert first != second
+
+
+@pytest.mark.asyncio
+async def test_tag_operations_over_http(anki):
+    """Test that bulk tag changes show up in the tag statistics."""
+    collection_cache.invalidate()
+    notes = anki.collection.find_notes("deck:*")
+
+    await add_tags(["review::later"], note_ids=notes[:5])
+    await rename_tag("review", "revisit")
+    result = await get_tag_stats(tag="revisit")
+
+    assert result[0].text.splitlines() == [
+        "Tag 'revisit' (2 tags, 5 notes), most used first:",
+        "- revisit: 5 notes",
+        "  - later: 5 notes",
+    ]
+    assert "review::later" not in anki.collection.tags()
+
+
+@pytest.mark.asyncio
+async def test_bulk_edits_over_http(anki):
+    """Test moving cards and replacing field text over HTTP."""
+    collection = anki.collection
+    card_ids = collection.find_cards("deck:*")[:50]
+
+    result = await change_deck("Archive", card_ids=card_ids)
+    assert result[0].text == "Moved 50 card(s) to deck 'Archive'."
+    assert sorted(collection.find_cards("deck:Archive")) == sorted(card_ids)
+
+    note = collection.add_note("Basic", "Default", {"Front": "colour", "Back": "colour"}, [])
+    result = await find_and_replace_fields("colour", "color", note_ids=[note.note_id], fields=["Back"])
+    assert result[0].text.startswith("Made 1 replacement(s) in 1 of 1 note(s)")
+    assert collection.notes[note.note_id].fields == {"Front": "colour", "Back": "color"}
+
+
+@pytest.mark.asyncio
+async def test_import_notes_over_http(anki, monkeypatch, tmp_path):
+    """Test importing a CSV file over HTTP, with a duplicate row reported as failed."""
+    monkeypatch.setattr(settings, "journal", tmp_path / "journal.jsonl")
+    path = tmp_path / "notes.csv"
+    path.write_text("Front,Back\nimported one,1\nimported two,2\nimported one,1\n")
+
+    result = await import_notes(str(path), deck="Default")
+
+    assert "Rows processed: 3, notes added: 2, failed: 1" in result[0].text
+    assert len(anki.collection.find_notes('"Front:imported *"')) == 2
+
+
+@pytest.mark.asyncio
+async def test_note_media_over_http(anki, monkeypatch, tmp_path):
+    """Test that a note's image is uploaded once and referenced in its field."""
+    monkeypatch.setattr(media, "media_manifest", MediaManifest())
+    image = tmp_path / "atom.png"
+    image.write_bytes(b"\x89PNG atom")
+    notes = [
+        Note(name=name, id=None, deck="Default", model="Basic", fields={"Front": name, "Back": ""},
+             media=[MediaFile(path=str(image), field="Back")])
+        for name in ("first", "second")
+    ]
+
+    await add_or_update_notes(notes)
+
+    (name,) = [name for name in anki.collection.media if name.startswith("mcp-")]
+    assert anki.collection.media[name] == b"\x89PNG atom"
+    assert anki.request_counts["storeMediaFile"] == 1
+    added = [note for note in anki.collection.notes.values() if note.fields.get("Front") in ("first", "second")]
+    assert [note.fields["Back"] for note in added] == [f'<img src="{name}">'] * 2
+
+
+@pytest.fixture
+def two_backends(monkeypatch):
+    """Two fake Anki instances, configured as the backends "es" and "fr"."""
+    with FakeAnkiConnect(FakeCollection.generate(30, seed=2)) as es, FakeAnkiConnect(FakeCollection.generate(50, seed=3)) as fr:
+        monkeypatch.setattr(backends, "backend_urls", {"es": es.url, "fr": fr.url})
+        monkeypatch.setattr(utils, "_connections", {})
+        yield es, fr
+
+
+def _text(result):
+    content = result[0] if isinstance(result, tuple) else result
+    return content[0].text
+
+
+@pytest.mark.asyncio
+async def test_profile_selects_backend(two_backends):
+    """Test that the profile argument routes a tool's requests to that backend only."""
+    es, fr = two_backends
+    deck = next(iter(fr.collection.decks))
+
+    await app.call_tool("find-cards", {"query": f'"deck:{deck}"', "profile": "fr"})
+    await app.call_tool("find-cards", {"query": "deck:*"})
+
+    assert fr.request_counts["findCards"] == 1
+    assert es.request_counts["findCards"] == 1
+    assert _text(await app.call_tool("find-cards", {"query": "deck:*", "profile": "it"})) == (
+        "Unknown profile 'it'. Available profiles: es, fr"
+    )
+
+
+@pytest.mark.asyncio
+async def test_fan_out_reads_all_backends(two_backends):
+    """Test that read-only tools run on every profile concurrently and return each result."""
+    es, fr = two_backends
+
+    text = _text(await app.call_tool("get-deck-tree", {"profile": "*", "max_depth": 0}))
+
+    es_part, fr_part = text.split("\n\n")
+    assert es_part.startswith("Profile 'es':\nDeck tree")
+    assert fr_part.startswith("Profile 'fr':\nDeck tree")
+    assert f"{len(es.collection.cards)} cards" in es_part.splitlines()[1]
+    assert f"{len(fr.collection.cards)} cards" in fr_part.splitlines()[1]
+    assert es.request_counts["getDeckStats"] == fr.request_counts["getDeckStats"] == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_run_on_one_profile(two_backends):
+    """Test that tools that change the collection can't fan out."""
+    result = await app.call_tool("suspend-cards", {"card_ids": [1], "profile": "*"})
+
+    assert _text(result) == "suspend-cards can only run on one profile at a time."
+
+
+@pytest.mark.asyncio
+async def test_process_tools_take_no_profile(two_backends):
+    """Test that tools about the server process itself have no profile argument."""
+    schemas = {tool.name: tool.inputSchema for tool in await app.list_tools()}
+
+    for name in ("get-job-status", "cancel-job", "get-server-metrics"):
+        assert "profile" not in schemas[name]["properties"]
+    assert "profile" in schemas["get-deck-tree"]["properties"]
@@ -0,0 +1,70 @@
+import pytest
+
+from anki_mcp.tools import fields
+from anki_mcp.tools.config import settings
+from anki_mcp.tools.fields import NormalizedField, normalize_field
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    fields.clear_cache()
+    yield
+    fields.clear_cache()
+
+
+def test_plain_value():
+    """Test that values without markup only have their whitespace collapsed."""
+    assert normalize_field("  plain   text ") == NormalizedField("plain text")
+
+
+def test_strips_tags_and_decodes_entities():
+    """Test that tags are stripped, block tags become line breaks and entities are decoded."""
+    value = "<div>Hello&nbsp;<b>world</b></div><div>a &lt; b &amp;&amp; c<br>next</div>"
+
+    assert normalize_field(value) == NormalizedField("Hello world\na < b && c\nnext")
+
+
+def test_drops_scripts_styles_and_comments():
+    """Test that script and style contents and comments are removed."""
+    value = "<style>.x { color: red }</style><!-- note -->text<script>alert(1)</script>"
+
+    assert normalize_field(value).text == "text"
+
+
+def test_extracts_media_in_order():
+    """Test that images and sounds are listed in the order they appear, and removed from the text."""
+    value = '[sound:intro.mp3] Word <img src="word&amp;1.jpg"> <IMG SRC=plain.png> <img src=\'q.gif\'/>'
+
+    assert normalize_field(value) == NormalizedField("Word", ("intro.mp3", "word&1.jpg", "plain.png", "q.gif"))
+
+
+def test_renders_cloze_answers():
+    """Test that cloze deletions are rendered as their answer, without hints."""
+    value = "{{c1::Canberra::city}} is the capital of {{c2::Australia}}"
+
+    assert normalize_field(value).text == "Canberra is the capital of Australia"
+
+
+def test_memoizes_by_content(monkeypatch):
+    """Test that a value is normalized once, keyed by its content or a digest of long values."""
+    calls = []
+    normalize = fields._normalize
+    monkeypatch.setattr(fields, "_normalize", lambda value: calls.append(value) or normalize(value))
+    long_value = "<b>" + "x" * 100 + "</b>"
+
+    for _ in range(3):
+        assert normalize_field("<i>short</i>").text == "short"
+        assert normalize_field(long_value).text == "x" * 100
+
+    assert calls == ["<i>short</i>", long_value]
+    assert long_value not in fields._cache
+
+
+def test_cache_is_bounded(monkeypatch):
+    """Test that the least recently used values are evicted."""
+    monkeypatch.setattr(settings, "max_cached_fields", 2)
+
+    for value in ("<i>a</i>", "<i>b</i>", "<i>a</i>", "<i>c</i>"):
+        normalize_field(value)
+
+    assert list(fields._cache) == ["<i>a</i>", "<i>c</i>"]
@@ -0,0 +1,117 @@
+import pytest
+from anki_mcp.tools.config import settings
+from anki_mcp.tools.find_and_replace_fields import find_and_replace_fields
+from anki_mcp.tools.records import NoteInfo
+
+
+NOTES = [
+    {"noteId": 1, "fields": {"Front": {"value": "colour", "order": 0}, "Back": {"value": "Colour, colours", "order": 1}}},
+    {"noteId": 2, "fields": {"Front": {"value": "flavour", "order": 0}, "Back": {"value": "taste", "order": 1}}},
+    {"noteId": 3, "fields": {"Front": {"value": "size", "order": 0}, "Back": {"value": "big", "order": 1}}},
+]
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    requests = []
+
+    async def mock_anki_request(action, **kwargs):
+        requests.append((action, kwargs))
+        assert action == "multi"
+        # Like Anki Connect, actions without a version of at least 5 only return their result
+        return {"success": True, "result": [
+            {"result": None, "error": None} if request.get("version", 4) >= 5 else None
+            for request in kwargs["actions"]
+        ]}
+
+    async def mock_stream(action, **kwargs):
+        requests.append((action, kwargs))
+        assert action == "notesInfo"
+        for note in NOTES:
+            if note["noteId"] in kwargs.get("notes", [note["noteId"]]):
+                yield NoteInfo.from_anki(note)
+
+    monkeypatch.setattr("anki_mcp.tools.find_and_replace_fields.make_anki_request", mock_anki_request)
+    monkeypatch.setattr("anki_mcp.tools.find_and_replace_fields.stream_anki_request", mock_stream)
+    return requests
+
+
+def _updates(requests):
+    return [[action["params"]["note"] for action in kwargs["actions"]] for name, kwargs in requests if name == "multi"]
+
+
+@pytest.mark.asyncio
+async def test_find_and_replace_updates_changed_fields_in_chunks(requests, monkeypatch):
+    """Test that only the changed fields of the changed notes are sent, in chunks."""
+    monkeypatch.setattr(settings, "replace_batch_size", 1)
+
+    result = await find_and_replace_fields("our", "or", query="deck:English")
+
+    assert result[0].text == "Made 4 replacement(s) in 2 of 3 note(s): 2 updated, 0 failed.\nChunks: 1/1, 1/1"
+    assert requests[0] == ("notesInfo", {"query": "deck:English"})
+    assert _updates(requests) == [
+        [{"id": 1, "fields": {"Front": "color", "Back": "Color, colors"}}],
+        [{"id": 2, "fields": {"Front": "flavor"}}],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_find_and_replace_options(requests):
+    """Test case-insensitive matching, regular expressions and selecting fields."""
+    await find_and_replace_fields("COLOUR", "color", note_ids=[1], fields=["Back"], match_case=False)
+    await find_and_replace_fields(r"(\w+)our\b", r"\1or", note_ids=[1], fields=["Front"], regex=True)
+
+    assert requests[0] == ("notesInfo", {"notes": [1]})
+    assert _updates(requests) == [
+        [{"id": 1, "fields": {"Back": "color, colors"}}],
+        [{"id": 1, "fields": {"Front": "color"}}],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_find_and_replace_literal_backslashes(requests):
+    """Test that without regex the replacement is inserted literally."""
+    await find_and_replace_fields("taste", r"\1 \n", note_ids=[2])
+
+    assert _updates(requests) == [[{"id": 2, "fields": {"Back": r"\1 \n"}}]]
+
+
+@pytest.mark.asyncio
+async def test_find_and_replace_dry_run(requests):
+    """Test that a dry run previews the changes without updating notes."""
+    result = await find_and_replace_fields("our", "or", query="deck:English", dry_run=True)
+
+    assert result[0].text == (
+        "Dry run: would make 4 replacement(s) in 2 of 3 note(s).\n"
+        "- Note 1, Front: 'colour' -> 'color'\n"
+        "- Note 1, Back: 'Colour, colours' -> 'Color, colors'\n"
+        "- Note 2, Front: 'flavour' -> 'flavor'"
+    )
+    assert _updates(requests) == []
+
+
+@pytest.mark.asyncio
+async def test_find_and_replace_reports_failed_notes(monkeypatch, requests):
+    """Test that notes that failed to update are counted and listed."""
+    async def mock_anki_request(action, **kwargs):
+        return {"success": True, "result": [{"result": None, "error": "note was not found"}, {"result": None, "error": None}]}
+
+    monkeypatch.setattr("anki_mcp.tools.find_and_replace_fields.make_anki_request", mock_anki_request)
+
+    result = await find_and_replace_fields("our", "or", query="deck:English")
+
+    assert result[0].text == (
+        "Made 4 replacement(s) in 2 of 3 note(s): 1 updated, 1 failed.\n"
+        "- Note 1: note was not found"
+    )
+
+
+@pytest.mark.asyncio
+async def test_find_and_replace_validation(requests):
+    """Test that invalid input is rejected before any request."""
+    result = await find_and_replace_fields("our", "or")
+    assert result[0].text == "Provide either note_ids or query."
+
+    result = await find_and_replace_fields("(", "", note_ids=[1], regex=True)
+    assert result[0].text.startswith("Invalid regular expression:")
+    assert requests == []
@@ -143,3 +143,29 @@ async def test_find_cards_special_characters_in_query(monkeypatch):
 
     assert len(result) == 1
     assert "No cards found" in result[0].text
+
+
+@pytest.mark.asyncio
+async def test_find_cards_max_tokens_and_cursor(monkeypatch):
+    """Test that max_tokens limits the card IDs returned, and the cursor continues after them."""
+    card_ids = list(range(1494703460000, 1494703460050))
+
+    async def mock_anki_request(action, **kwargs):
+        return {"success": True, "result": card_ids}
+
+    monkeypatch.setattr("anki_mcp.tools.find_cards.make_anki_request", mock_anki_request)
+
+    # Each ID takes about 5 tokens with its separator
+    text = (await find_cards("deck:Test", max_tokens=50))[0].text
+
+    assert "Showing 10 of 50 card IDs matching query: 'deck:Test' (limited to about 50 tokens)" in text
+    assert "1494703460009" in text
+    assert "1494703460010" not in text
+    cursor = text.rsplit("cursor '", 1)[1].split("'")[0]
+
+    text = (await find_cards("deck:Test", limit=45, cursor=cursor))[0].text
+
+    assert "Showing 40 of 50 card IDs matching query: 'deck:Test', starting at card 11" in text
+    assert "1494703460010" in text
+    assert "1494703460049" in text
+    assert "cursor '" not in text
@@ -1,5 +1,7 @@
 import pytest
 from anki_mcp.tools.find_notes import find_notes
+from anki_mcp.tools.records import NoteInfo
+from anki_mcp.tools.utils import AnkiConnectError
 
 
 @pytest.mark.asyncio
@@ -27,12 +29,13 @@ async def test_find_notes_success(monkeypatch):
         }
     ]
 
-    async def mock_anki_request(action, **kwargs):
+    async def mock_stream(action, **kwargs):
         assert action == "notesInfo"
         assert kwargs["query"] == "deck:Test"
-        return {"success": True, "result": mock_notes}
+        for note in mock_notes:
+            yield NoteInfo.from_anki(note)
 
-    monkeypatch.setattr("anki_mcp.tools.find_notes.make_anki_request", mock_anki_request)
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
 
     result = await find_notes("deck:Test")
 
@@ -52,11 +55,12 @@ async def test_find_notes_success(monkeypatch):
 @pytest.mark.asyncio
 async def test_find_notes_no_results(monkeypatch):
     """Test search that returns no matching notes."""
-    async def mock_anki_request(action, **kwargs):
+    async def mock_stream(action, **kwargs):
         assert action == "notesInfo"
-        return {"success": True, "result": []}
+        for note in []:
+            yield NoteInfo.from_anki(note)
 
-    monkeypatch.setattr("anki_mcp.tools.find_notes.make_anki_request", mock_anki_request)
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
 
     result = await find_notes("deck:NonExistent")
 
@@ -67,10 +71,11 @@ async def test_find_notes_no_results(monkeypatch):
 @pytest.mark.asyncio
 async def test_find_notes_api_failure(monkeypatch):
     """Test handling of API errors."""
-    async def mock_anki_request(action, **kwargs):
-        return {"success": False, "error": "Invalid search query"}
+    async def mock_stream(action, **kwargs):
+        raise AnkiConnectError("Invalid search query")
+        yield
 
-    monkeypatch.setattr("anki_mcp.tools.find_notes.make_anki_request", mock_anki_request)
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
 
     result = await find_notes("invalid:query")
 
@@ -95,10 +100,11 @@ async def test_find_notes_long_field_shown_in_full(monkeypatch):
         }
     ]
 
-    async def mock_anki_request(action, **kwargs):
-        return {"success": True, "result": mock_notes}
+    async def mock_stream(action, **kwargs):
+        for note in mock_notes:
+            yield NoteInfo.from_anki(note)
 
-    monkeypatch.setattr("anki_mcp.tools.find_notes.make_anki_request", mock_anki_request)
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
 
     result = await find_notes("*")
 
@@ -123,10 +129,11 @@ async def test_find_notes_single_result(monkeypatch):
         }
     ]
 
-    async def mock_anki_request(action, **kwargs):
-        return {"success": True, "result": mock_notes}
+    async def mock_stream(action, **kwargs):
+        for note in mock_notes:
+            yield NoteInfo.from_anki(note)
 
-    monkeypatch.setattr("anki_mcp.tools.find_notes.make_anki_request", mock_anki_request)
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
 
     result = await find_notes("tag:unique")
 
@@ -140,11 +147,12 @@ async def test_find_notes_single_result(monkeypatch):
 @pytest.mark.asyncio
 async def test_find_notes_special_characters_in_query(monkeypatch):
     """Test search with special characters in query."""
-    async def mock_anki_request(action, **kwargs):
+    async def mock_stream(action, **kwargs):
         assert kwargs["query"] == "front:*test* OR back:\"exact phrase\""
-        return {"success": True, "result": []}
+        for note in []:
+            yield NoteInfo.from_anki(note)
 
-    monkeypatch.setattr("anki_mcp.tools.find_notes.make_anki_request", mock_anki_request)
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
 
     result = await find_notes("front:*test* OR back:\"exact phrase\"")
 
@@ -170,9 +178,15 @@ async def test_find_notes_limit_results(monkeypatch):
         for i in range(30)
     ]
 
+    async def mock_stream(action, **kwargs):
+        for note in mock_notes:
+            yield NoteInfo.from_anki(note)
+
     async def mock_anki_request(action, **kwargs):
-        return {"success": True, "result": mock_notes}
+        assert action == "findNotes"
+        return {"success": True, "result": [note["noteId"] for note in mock_notes]}
 
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
     monkeypatch.setattr("anki_mcp.tools.find_notes.make_anki_request", mock_anki_request)
 
     # Test with default limit (20)
@@ -204,9 +218,15 @@ async def test_find_notes_custom_limit(monkeypatch):
         for i in range(10)
     ]
 
+    async def mock_stream(action, **kwargs):
+        for note in mock_notes:
+            yield NoteInfo.from_anki(note)
+
     async def mock_anki_request(action, **kwargs):
-        return {"success": True, "result": mock_notes}
+        assert action == "findNotes"
+        return {"success": True, "result": [note["noteId"] for note in mock_notes]}
 
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
     monkeypatch.setattr("anki_mcp.tools.find_notes.make_anki_request", mock_anki_request)
 
     # Test with custom limit of 5
@@ -236,10 +256,11 @@ async def test_find_notes_under_limit(monkeypatch):
         for i in range(5)
     ]
 
-    async def mock_anki_request(action, **kwargs):
-        return {"success": True, "result": mock_notes}
+    async def mock_stream(action, **kwargs):
+        for note in mock_notes:
+            yield NoteInfo.from_anki(note)
 
-    monkeypatch.setattr("anki_mcp.tools.find_notes.make_anki_request", mock_anki_request)
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
 
     result = await find_notes("deck:Test", limit=10)
 
@@ -247,3 +268,141 @@ async def test_find_notes_under_limit(monkeypatch):
     assert "Found 5 notes matching query: 'deck:Test'" in text
     assert "Showing" not in text
     assert "increase limit" not in text
+
+
+@pytest.mark.asyncio
+async def test_find_notes_stops_reading_at_limit(monkeypatch):
+    """Test that the note stream is closed once the limit is exceeded."""
+    yielded = []
+    closed = []
+
+    async def mock_stream(action, **kwargs):
+        try:
+            for i in range(1000):
+                yielded.append(i)
+                yield NoteInfo(i, "Basic", ("Front",), (f"Question {i}",), (), 1700000000)
+        finally:
+            closed.append(True)
+
+    async def mock_anki_request(action, **kwargs):
+        return {"success": False, "error": "Anki is busy"}
+
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
+    monkeypatch.setattr("anki_mcp.tools.find_notes.make_anki_request", mock_anki_request)
+
+    result = await find_notes("deck:Test", limit=5)
+
+    assert len(yielded) == 6
+    assert closed == [True]
+    assert "Showing 5 of more than 5 notes" in result[0].text
+
+
+@pytest.mark.asyncio
+async def test_find_notes_json_output(monkeypatch):
+    """Test that json output returns the notes' fields without formatting them."""
+    async def mock_stream(action, **kwargs):
+        yield NoteInfo.from_anki({
+            "noteId": 1234, "modelName": "Basic", "tags": ["test"], "mod": 1700000000,
+            "fields": {"Front": {"value": "Q", "order": 0}, "Back": {"value": "A", "order": 1}},
+        })
+
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
+    monkeypatch.setattr("anki_mcp.tools.output._output_format", "json")
+
+    result = await find_notes("deck:Test")
+
+    assert result.structuredContent == {
+        "query": "deck:Test",
+        "total": 1,
+        "truncated": False,
+        "notes": [{"note_id": 1234, "model": "Basic", "tags": ["test"], "modified": 1700000000,
+                   "fields": {"Front": "Q", "Back": "A"}, "media": []}],
+        "next_cursor": None,
+    }
+
+
+def _numbered_notes(count):
+    return [
+        NoteInfo.from_anki({
+            "noteId": i, "modelName": "Basic", "tags": [], "mod": 1700000000,
+            "fields": {"Front": {"value": f"Question {i} " + "x" * 200, "order": 0}},
+        })
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_find_notes_max_tokens_and_cursor(monkeypatch):
+    """Test that max_tokens limits the notes returned, and the cursor continues after them."""
+    notes = _numbered_notes(10)
+    requests = []
+
+    async def mock_stream(action, **kwargs):
+        requests.append(kwargs)
+        selected = kwargs["notes"] if "notes" in kwargs else range(len(notes))
+        for note_id in selected:
+            yield notes[note_id]
+
+    async def mock_anki_request(action, **kwargs):
+        assert action == "findNotes"
+        return {"success": True, "result": [note.note_id for note in notes]}
+
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
+    monkeypatch.setattr("anki_mcp.tools.find_notes.make_anki_request", mock_anki_request)
+
+    text = (await find_notes("deck:Test", max_tokens=180))[0].text
+
+    assert "Showing 2 of 10 notes matching query: 'deck:Test' (limited to about 180 tokens)" in text
+    assert "Note ID: 1\n" in text
+    assert "Note ID: 2\n" not in text
+    cursor = text.rsplit("cursor '", 1)[1].split("'")[0]
+
+    text = (await find_notes("deck:Test", limit=5, max_tokens=180, cursor=cursor))[0].text
+
+    # Only the notes of the page are fetched when continuing
+    assert requests[-1] == {"notes": [2, 3, 4, 5, 6, 7]}
+    assert "Showing 2 of 10 notes matching query: 'deck:Test', starting at note 3" in text
+    assert "Note ID: 2\n" in text
+    assert "Note ID: 3\n" in text
+
+
+@pytest.mark.asyncio
+async def test_find_notes_invalid_cursor(monkeypatch):
+    """Test that a cursor of another query is rejected."""
+    async def mock_stream(action, **kwargs):
+        raise AssertionError("notes should not be requested")
+        yield
+
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
+    from anki_mcp.tools.budget import encode_cursor
+
+    result = await find_notes("deck:Test", cursor=encode_cursor("find-notes:deck:Other", 20))
+
+    assert result[0].text == "Invalid cursor: the cursor belongs to a different query"
+
+
+@pytest.mark.asyncio
+async def test_find_notes_normalizes_fields(monkeypatch):
+    """Test that fields are shown as plain text with their media listed, unless raw is set."""
+    note = NoteInfo.from_anki({
+        "noteId": 1, "modelName": "Cloze", "tags": [], "mod": 1700000000,
+        "fields": {
+            "Text": {"value": "{{c1::Paris}} is the <b>capital</b> of France", "order": 0},
+            "Extra": {"value": '<div>Eiffel&nbsp;tower</div><img src="eiffel.jpg">[sound:paris.mp3]', "order": 1},
+        },
+    })
+
+    async def mock_stream(action, **kwargs):
+        yield note
+
+    monkeypatch.setattr("anki_mcp.tools.find_notes.stream_anki_request", mock_stream)
+
+    text = (await find_notes("deck:Test"))[0].text
+
+    assert "  - Text: Paris is the capital of France\n" in text
+    assert "  - Extra: Eiffel tower\n" in text
+    assert "Media: eiffel.jpg, paris.mp3" in text
+
+    text = (await find_notes("deck:Test", raw=True))[0].text
+
+    assert "  - Text: {{c1::Paris}} is the <b>capital</b> of France\n" in text
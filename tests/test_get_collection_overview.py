@@ -174,3 +174,80 @@ async def test_get_collection_overview_fields_without_descriptions(monkeypatch):
     field_text = result[3].text
     assert "  - Front\n" in field_text or "  - Front" in field_text
     assert ": " not in field_text.split("Fields for model")[1]  # No descriptions after field names 
+
+
+@pytest.mark.asyncio
+async def test_get_collection_overview_max_tokens(monkeypatch):
+    """Test that the overview is cut off at max_tokens and continued with the cursor."""
+    tags = [f"tag{i:03}" for i in range(300)]
+
+    async def mock_anki_request(action, **kwargs):
+        responses = {
+            "deckNames": ["Default"],
+            "modelNames": ["Basic"],
+            "getTags": tags,
+            "modelFieldNames": ["Front", "Back"],
+            "modelFieldDescriptions": ["", ""],
+        }
+        return {"success": True, "result": responses[action]}
+
+    monkeypatch.setattr("anki_mcp.tools.get_collection_overview.make_anki_request", mock_anki_request)
+
+    result = await get_collection_overview(tag_limit=None, max_tokens=100)
+
+    assert result[0].text == "\nAvailable decks in Anki (1):\n- Default"
+    assert result[2].text.startswith("\nTags used in Anki (300): tag000, tag001")
+    assert "tag299" not in result[2].text
+    assert result[-1].text.startswith("\nLimited to about 100 tokens. To see more, call again with cursor")
+    cursor = result[-1].text.rsplit("cursor '", 1)[1].split("'")[0]
+
+    result = await get_collection_overview(tag_limit=None, cursor=cursor)
+
+    assert result[0].text.startswith("\nTags used in Anki (300) (continued): ")
+    assert result[0].text.endswith("tag299")
+    assert result[1].text == "\nFields for model 'Basic' (2):\n  - Front\n  - Back"
+    assert len(result) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_collection_overview_fields_of_one_model(monkeypatch):
+    """Test that only the requests for the selected sections and models are sent."""
+    requests = []
+
+    async def mock_anki_request(action, **kwargs):
+        requests.append((action, kwargs.get("modelName")))
+        results = {"modelFieldNames": ["Text", "Extra"], "modelFieldDescriptions": ["", ""]}
+        return {"success": True, "result": results[action]}
+
+    monkeypatch.setattr("anki_mcp.tools.get_collection_overview.make_anki_request", mock_anki_request)
+
+    result = await get_collection_overview(sections=["fields"], models=["Cloze"])
+
+    assert [content.text for content in result] == ["\nFields for model 'Cloze' (2):\n  - Text\n  - Extra"]
+    assert sorted(requests) == [("modelFieldDescriptions", "Cloze"), ("modelFieldNames", "Cloze")]
+
+
+@pytest.mark.asyncio
+async def test_get_collection_overview_unknown_section():
+    """Test that unknown sections are rejected."""
+    result = await get_collection_overview(sections=["decks", "notes"])
+
+    assert result[0].text == "Unknown sections: notes. Valid sections: decks, models, tags, fields"
+
+
+@pytest.mark.asyncio
+async def test_get_collection_overview_summarizes_tags(monkeypatch):
+    """Test that tags beyond tag_limit are counted by top-level tag."""
+    tags = ["a", "b", "lang::es", "lang::fr", "lang::de", "topic::x", "topic::y", "z"]
+
+    async def mock_anki_request(action, **kwargs):
+        assert action == "getTags"
+        return {"success": True, "result": tags}
+
+    monkeypatch.setattr("anki_mcp.tools.get_collection_overview.make_anki_request", mock_anki_request)
+
+    result = await get_collection_overview(sections=["tags"], tag_limit=2)
+
+    assert result[0].text == (
+        "\nTags used in Anki (8): a, b, and 6 more by top-level tag: lang (3), topic (2), z (1)"
+    )
@@ -0,0 +1,103 @@
+import pytest
+from anki_mcp.tools.cache import collection_cache
+from anki_mcp.tools.get_deck_tree import get_deck_tree
+
+
+DECK_NAMES = ["Default", "Japanese", "Japanese::Grammar", "Japanese::Vocab", "Japanese::Vocab::N5"]
+
+# Like Anki, due counts include subdecks and total_in_deck doesn't
+DECK_STATS = {
+    "1": {"deck_id": 1, "name": "Default", "new_count": 0, "learn_count": 0, "review_count": 1, "total_in_deck": 3},
+    "2": {"deck_id": 2, "name": "Japanese", "new_count": 15, "learn_count": 2, "review_count": 40, "total_in_deck": 0},
+    "3": {"deck_id": 3, "name": "Japanese::Grammar", "new_count": 5, "learn_count": 0, "review_count": 10, "total_in_deck": 20},
+    "4": {"deck_id": 4, "name": "Japanese::Vocab", "new_count": 10, "learn_count": 2, "review_count": 30, "total_in_deck": 100},
+    "5": {"deck_id": 5, "name": "Japanese::Vocab::N5", "new_count": 8, "learn_count": 1, "review_count": 12, "total_in_deck": 50},
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    collection_cache.invalidate()
+    yield
+    collection_cache.invalidate()
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    requests = []
+
+    async def mock_anki_request(action, **kwargs):
+        requests.append(action)
+        if action == "deckNames":
+            return {"success": True, "result": DECK_NAMES}
+        assert action == "getDeckStats"
+        assert kwargs["decks"] == DECK_NAMES
+        return {"success": True, "result": DECK_STATS}
+
+    monkeypatch.setattr("anki_mcp.tools.get_deck_tree.make_anki_request", mock_anki_request)
+    return requests
+
+
+@pytest.mark.asyncio
+async def test_get_deck_tree(requests):
+    """Test that the tree nests subdecks and adds their cards to their parents."""
+    result = await get_deck_tree()
+
+    assert result[0].text == (
+        "Deck tree (5 decks): 15 new, 2 learning, 41 review, 173 cards\n"
+        "- Default: 0 new, 0 learning, 1 review, 3 cards\n"
+        "- Japanese: 15 new, 2 learning, 40 review, 170 cards\n"
+        "  - Grammar: 5 new, 0 learning, 10 review, 20 cards\n"
+        "  - Vocab: 10 new, 2 learning, 30 review, 150 cards\n"
+        "    - N5: 8 new, 1 learning, 12 review, 50 cards"
+    )
+    assert requests == ["deckNames", "getDeckStats"]
+
+
+@pytest.mark.asyncio
+async def test_get_deck_tree_subtree_and_depth(requests):
+    """Test filtering to a subtree and limiting the depth shown."""
+    result = await get_deck_tree(deck="Japanese::Vocab", max_depth=0)
+
+    assert result[0].text == (
+        "Deck tree of 'Japanese::Vocab' (2 decks): 10 new, 2 learning, 30 review, 150 cards\n"
+        "- Vocab: 10 new, 2 learning, 30 review, 150 cards"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_deck_tree_unknown_deck(requests):
+    """Test that an unknown deck is reported."""
+    result = await get_deck_tree(deck="Missing")
+
+    assert result[0].text == "Deck not found: 'Missing'"
+
+
+@pytest.mark.asyncio
+async def test_get_deck_tree_is_cached_until_write(requests):
+    """Test that the tree is fetched once, until a write invalidates the cache."""
+    await get_deck_tree()
+    await get_deck_tree(deck="Japanese")
+    assert requests == ["deckNames", "getDeckStats"]
+
+    collection_cache.invalidate()
+    await get_deck_tree()
+    assert requests == ["deckNames", "getDeckStats"] * 2
+
+
+@pytest.mark.asyncio
+async def test_get_deck_tree_missing_parent(monkeypatch):
+    """Test that parents without statistics add up the counts of their subdecks."""
+    async def mock_anki_request(action, **kwargs):
+        if action == "deckNames":
+            return {"success": True, "result": ["A::B", "A::C"]}
+        return {"success": True, "result": {
+            "1": {"deck_id": 1, "name": "A::B", "new_count": 1, "learn_count": 0, "review_count": 2, "total_in_deck": 5},
+            "2": {"deck_id": 2, "name": "A::C", "new_count": 3, "learn_count": 1, "review_count": 0, "total_in_deck": 7},
+        }}
+
+    monkeypatch.setattr("anki_mcp.tools.get_deck_tree.make_anki_request", mock_anki_request)
+
+    result = await get_deck_tree()
+
+    assert result[0].text.splitlines()[1] == "- A: 4 new, 1 learning, 2 review, 12 cards"
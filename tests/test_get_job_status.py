@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from anki_mcp.server import app
+from anki_mcp.tools import get_job_status as get_job_status_module
+from anki_mcp.tools.get_job_status import cancel_job, get_job_status
+from anki_mcp.tools.jobs import JobManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = JobManager()
+    monkeypatch.setattr(get_job_status_module, "jobs", manager)
+    monkeypatch.setattr("anki_mcp.server.jobs", manager)
+    return manager
+
+
+def _text(result):
+    # FastMCP returns (content, structured output) for tools with a return annotation
+    content = result[0] if isinstance(result, tuple) else result
+    return content[0].text
+
+
+@pytest.mark.asyncio
+async def test_background_tool_call(manager, monkeypatch):
+    """Test that tools called with background=True return a job ID and finish in the background."""
+    async def mock_anki_request(action, **kwargs):
+        await asyncio.sleep(0.01)
+        return {"success": True, "result": True}
+
+    monkeypatch.setattr("anki_mcp.tools.suspend_cards.make_anki_request", mock_anki_request)
+
+    started = _text(await app.call_tool("suspend-cards", {"card_ids": [1, 2], "background": True}))
+
+    assert started.startswith("Started job ")
+    job = manager.list()[0]
+    assert job.id in started
+    await job.task
+
+    status = (await get_job_status(job.id))[0].text
+    assert f"Job {job.id} (suspend-cards): succeeded" in status
+    assert "Successfully suspended 2 card(s)." in status
+
+
+@pytest.mark.asyncio
+async def test_background_parameter_only_on_bulk_tools():
+    """Test that only long-running tools accept the background parameter."""
+    tools = {tool.name: tool for tool in await app.list_tools()}
+
+    assert "background" in tools["import-notes"].inputSchema["properties"]
+    assert "background" in tools["analyze-cards"].inputSchema["properties"]
+    assert "background" not in tools["find-notes"].inputSchema["properties"]
+
+
+@pytest.mark.asyncio
+async def test_list_and_cancel_jobs(manager):
+    """Test that jobs are listed and running jobs can be cancelled."""
+    async def work():
+        await asyncio.sleep(60)
+
+    job = manager.submit("import-notes", work)
+    await asyncio.sleep(0)
+
+    listed = (await get_job_status())[0].text
+    assert f"Job {job.id} (import-notes): running" in listed
+
+    assert (await cancel_job(job.id))[0].text == f"Cancelling job {job.id} (import-notes)."
+    await job.task
+    assert (await cancel_job(job.id))[0].text == f"Job {job.id} already cancelled."
+
+
+@pytest.mark.asyncio
+async def test_unknown_job(manager):
+    """Test that unknown job IDs are reported."""
+    assert (await get_job_status("nope"))[0].text == "Unknown job: nope"
+    assert (await cancel_job("nope"))[0].text == "Unknown job: nope"
+    assert (await get_job_status())[0].text == "No background jobs."
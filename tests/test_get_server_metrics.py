@@ -0,0 +1,83 @@
+import pytest
+from anki_mcp.tools.get_server_metrics import get_server_metrics
+from anki_mcp.tools.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr("anki_mcp.tools.get_server_metrics.metrics", registry)
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_get_server_metrics_reports_actions_and_tools(registry):
+    """Test that recorded request and tool metrics are reported."""
+    registry.record_request("findCards", 0.004, 120, 2048)
+    registry.record_request("findCards", 0.02, 120, 4096)
+    registry.record_request_error("findCards")
+    registry.record_coalesced("findCards")
+    registry.record_tool("find-cards", 0.03)
+    registry.record_stage("find_notes.format", 0.002)
+
+    result = await get_server_metrics()
+
+    text = result[0].text
+    assert "findCards: 2 requests, 1 errors, 1 coalesced" in text
+    assert "240 B sent, 6.0 KB received" in text
+    assert "find-cards: 1 calls, 0 errors" in text
+    assert "find_notes.format: 1 runs" in text
+    assert "Anki Connect circuit: closed" in text
+
+
+@pytest.mark.asyncio
+async def test_get_server_metrics_empty(registry):
+    """Test the report before any request was made."""
+    result = await get_server_metrics()
+
+    text = result[0].text
+    assert "Anki Connect actions:\n  (none)" in text
+    assert "Tools:\n  (none)" in text
+    assert "Stages:" not in text
+
+
+@pytest.mark.asyncio
+async def test_get_server_metrics_reset(registry):
+    """Test that metrics can be cleared after reporting."""
+    registry.record_request("deckNames", 0.01, 50, 100)
+
+    result = await get_server_metrics(reset=True)
+
+    assert "deckNames: 1 requests" in result[0].text
+    assert "Metrics have been reset." in result[0].text
+    assert registry.snapshot()["actions"] == {}
+
+
+def test_histogram_quantiles():
+    """Test that quantiles are estimated from bucket bounds."""
+    registry = MetricsRegistry()
+    for seconds in [0.002] * 90 + [0.2] * 10:
+        registry.record_request("notesInfo", seconds, 0, 0)
+
+    summary = registry.snapshot()["actions"]["notesInfo"]
+
+    assert summary["count"] == 100
+    assert summary["p50_seconds"] == 0.005
+    assert summary["p99_seconds"] == 0.25
+
+
+def test_render_prometheus():
+    """Test the Prometheus text exposition output."""
+    registry = MetricsRegistry()
+    registry.record_request("deckNames", 0.003, 40, 60)
+    registry.record_tool("get-collection-overview", 0.5, error=True)
+
+    text = registry.render_prometheus({"anki_mcp_scheduler_in_flight": 1})
+
+    assert '# TYPE anki_mcp_anki_connect_request_duration_seconds histogram' in text
+    assert 'anki_mcp_anki_connect_request_duration_seconds_bucket{action="deckNames",le="0.005"} 1' in text
+    assert 'anki_mcp_anki_connect_request_duration_seconds_bucket{action="deckNames",le="+Inf"} 1' in text
+    assert 'anki_mcp_anki_connect_request_duration_seconds_count{action="deckNames"} 1' in text
+    assert 'anki_mcp_anki_connect_response_bytes_total{action="deckNames"} 60' in text
+    assert 'anki_mcp_tool_errors_total{tool="get-collection-overview"} 1' in text
+    assert "anki_mcp_scheduler_in_flight 1" in text
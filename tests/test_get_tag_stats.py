@@ -0,0 +1,122 @@
+import json
+
+import pytest
+from anki_mcp.tools.cache import collection_cache
+from anki_mcp.tools.get_tag_stats import get_tag_stats
+from anki_mcp.tools.output import set_output_format
+from anki_mcp.tools.records import NoteInfo
+from anki_mcp.tools.tag_index import get_tag_index
+
+
+TAGS = ["lang::es", "lang::es::verbs", "lang::fr", "todo"]
+
+NOTES = [
+    {"noteId": 1, "modelName": "Basic", "tags": ["lang::es", "lang::es::verbs"], "fields": {}},
+    {"noteId": 2, "modelName": "Basic", "tags": ["lang::es::verbs"], "fields": {}},
+    {"noteId": 3, "modelName": "Basic", "tags": ["lang::fr", "todo"], "fields": {}},
+    {"noteId": 4, "modelName": "Basic", "tags": [], "fields": {}},
+]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    collection_cache.invalidate()
+    yield
+    collection_cache.invalidate()
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    requests = []
+
+    async def mock_anki_request(action, **kwargs):
+        requests.append(action)
+        assert action == "getTags"
+        return {"success": True, "result": TAGS}
+
+    async def mock_stream(action, **kwargs):
+        requests.append(action)
+        assert action == "notesInfo"
+        assert kwargs["query"] == "deck:*"
+        for note in NOTES:
+            yield NoteInfo.from_anki(note)
+
+    monkeypatch.setattr("anki_mcp.tools.tag_index.make_anki_request", mock_anki_request)
+    monkeypatch.setattr("anki_mcp.tools.tag_index.stream_anki_request", mock_stream)
+    return requests
+
+
+@pytest.mark.asyncio
+async def test_tag_index_counts_notes_once_per_tag(requests):
+    """Test that a note is counted once for each tag it has or is below, and the index is cached."""
+    index = await get_tag_index()
+
+    assert (index.notes, index.tagged_notes) == (4, 3)
+    assert [node.name for node in index.roots] == ["lang", "todo"]
+    lang = index.tags["lang"]
+    assert (lang.own_notes, lang.notes) == (0, 3)
+    assert (index.tags["lang::es"].own_notes, index.tags["lang::es"].notes) == (1, 2)
+    assert (index.tags["lang::es::verbs"].own_notes, index.tags["lang::es::verbs"].notes) == (2, 2)
+    assert [child.short_name for child in lang.children] == ["es", "fr"]
+
+    assert await get_tag_index() is index
+    assert requests == ["getTags", "notesInfo"]
+
+
+@pytest.mark.asyncio
+async def test_get_tag_stats(requests):
+    """Test the tag tree, most used tags first."""
+    result = await get_tag_stats()
+
+    assert result[0].text == (
+        "Tags (5 tags, 3 of 4 notes tagged), most used first:\n"
+        "- lang: 3 notes\n"
+        "  - es: 2 notes (1 tagged directly)\n"
+        "    - verbs: 2 notes\n"
+        "  - fr: 1 notes\n"
+        "- todo: 1 notes"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_tag_stats_subtree_depth_and_limit(requests):
+    """Test selecting a subtree, limiting the depth and the number of tags shown."""
+    result = await get_tag_stats(tag="lang", max_depth=1)
+    assert result[0].text == (
+        "Tag 'lang' (4 tags, 3 notes), most used first:\n"
+        "- lang: 3 notes\n"
+        "  - es: 2 notes (1 tagged directly)\n"
+        "  - fr: 1 notes"
+    )
+
+    result = await get_tag_stats(limit=2)
+    assert result[0].text.splitlines()[1:] == [
+        "- lang: 3 notes",
+        "  - es: 2 notes (1 tagged directly)",
+        "... more tags not shown (increase limit or select a tag to see them)",
+    ]
+
+    result = await get_tag_stats(tag="missing")
+    assert result[0].text == "Tag not found: 'missing'"
+
+
+@pytest.mark.asyncio
+async def test_get_tag_stats_json(requests):
+    """Test that the JSON output nests the shown tags."""
+    set_output_format("json")
+    try:
+        result = await get_tag_stats(max_depth=0)
+    finally:
+        set_output_format("text")
+
+    data = json.loads(result.content[0].text)
+    assert data == {
+        "notes": 4,
+        "tagged_notes": 3,
+        "tags": 5,
+        "shown": 2,
+        "tree": [
+            {"name": "lang", "full_name": "lang", "notes": 3, "own_notes": 0, "children": []},
+            {"name": "todo", "full_name": "todo", "notes": 1, "own_notes": 1, "children": []},
+        ],
+    }
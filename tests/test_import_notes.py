@@ -0,0 +1,183 @@
+import json
+
+import pytest
+from anki_mcp.tools.config import settings
+from anki_mcp.tools.import_notes import CHECKPOINT_DIR, import_notes
+
+
+@pytest.fixture
+def checkpoints(monkeypatch, tmp_path):
+    """Directory the checkpoints are saved in, next to a journal in a temporary directory."""
+    state = tmp_path / "state"
+    monkeypatch.setattr(settings, "journal", state / "journal.jsonl")
+    return state / CHECKPOINT_DIR
+
+
+@pytest.fixture
+def anki(monkeypatch, checkpoints):
+    """Record the notes added through multi and fail the notes listed in `failing`."""
+    state = {"added": [], "chunks": [], "failing": set(), "down_after_chunks": None}
+
+    async def mock_anki_request(action, **kwargs):
+        if action == "modelFieldNames":
+            return {"success": True, "result": ["Front", "Back"]}
+        if action == "multi":
+            if state["down_after_chunks"] is not None and len(state["chunks"]) >= state["down_after_chunks"]:
+                return {"success": False, "error": "connection refused"}
+            state["chunks"].append(len(kwargs["actions"]))
+            outcomes = []
+            for request in kwargs["actions"]:
+                note = request["params"]["note"]
+                if note["fields"]["Front"] in state["failing"]:
+                    outcome = {"result": None, "error": "cannot create note because it is a duplicate"}
+                else:
+                    state["added"].append(note)
+                    outcome = {"result": len(state["added"]), "error": None}
+                # Like Anki Connect, actions without a version of at least 5 only return their result
+                outcomes.append(outcome if request.get("version", 4) >= 5 else outcome["result"])
+            return {"success": True, "result": outcomes}
+        return {"success": False, "error": "Unexpected action"}
+
+    monkeypatch.setattr("anki_mcp.tools.import_notes.make_anki_request", mock_anki_request)
+    monkeypatch.setattr(settings, "import_batch_size", 3)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_import_csv(anki, checkpoints, tmp_path):
+    """Test that CSV columns are matched to fields by name and added in chunks."""
+    path = tmp_path / "notes.csv"
+    path.write_text("front,back,tags\n" + "".join(f"q{i},a{i},vocab lesson{i}\n" for i in range(7)))
+
+    result = await import_notes(str(path), deck="Spanish", tags=["imported"])
+
+    text = result[0].text
+    assert "Imported notes.csv into deck 'Spanish'" in text
+    assert "Rows processed: 7, notes added: 7, failed: 0" in text
+    assert anki["chunks"] == [3, 3, 1]
+    assert anki["added"][0] == {
+        "deckName": "Spanish",
+        "modelName": "Basic",
+        "fields": {"Front": "q0", "Back": "a0"},
+        "tags": ["imported", "vocab", "lesson0"],
+        "options": {"allowDuplicate": False},
+    }
+    assert not list(checkpoints.glob("*"))
+
+
+@pytest.mark.asyncio
+async def test_import_jsonl_with_field_map(anki, tmp_path):
+    """Test that JSONL rows are imported with an explicit column mapping."""
+    path = tmp_path / "notes.jsonl"
+    path.write_text("\n".join(json.dumps({"word": f"w{i}", "meaning": f"m{i}", "extra": i}) for i in range(2)))
+
+    result = await import_notes(str(path), field_map={"word": "Front", "meaning": "Back"})
+
+    assert "notes added: 2" in result[0].text
+    assert [note["fields"] for note in anki["added"]] == [
+        {"Front": "w0", "Back": "m0"},
+        {"Front": "w1", "Back": "m1"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_rows_are_reported(anki, tmp_path):
+    """Test that notes Anki rejects are counted and listed without stopping the import."""
+    path = tmp_path / "notes.tsv"
+    path.write_text("Front\tBack\n" + "".join(f"q{i}\ta{i}\n" for i in range(5)))
+    anki["failing"] = {"q1", "q4"}
+
+    result = await import_notes(str(path))
+
+    text = result[0].text
+    assert "notes added: 3, failed: 2" in text
+    assert "Row 2: cannot create note because it is a duplicate" in text
+    assert "Row 5: cannot create note" in text
+
+
+@pytest.mark.asyncio
+async def test_interrupted_import_resumes(anki, checkpoints, tmp_path):
+    """Test that an import stopped by an Anki Connect failure resumes after the last saved chunk."""
+    path = tmp_path / "notes.csv"
+    path.write_text("Front,Back\n" + "".join(f"q{i},a{i}\n" for i in range(8)))
+    anki["down_after_chunks"] = 2
+
+    first = await import_notes(str(path))
+
+    assert "stopped after 6 rows: connection refused" in first[0].text
+    assert "resume from row 7" in first[0].text
+    assert [checkpoint.name.split(".")[:2] for checkpoint in checkpoints.glob("*")] == [["notes", "csv"]]
+    assert not list(tmp_path.glob("notes.csv.*"))
+
+    anki["down_after_chunks"] = None
+    second = await import_notes(str(path))
+
+    assert "Resumed from row 7." in second[0].text
+    assert "Rows processed: 8, notes added: 8" in second[0].text
+    assert [note["fields"]["Front"] for note in anki["added"]] == [f"q{i}" for i in range(8)]
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_ignored_when_file_changes(anki, tmp_path):
+    """Test that a checkpoint doesn't apply once the file was modified."""
+    path = tmp_path / "notes.csv"
+    path.write_text("Front,Back\n" + "".join(f"q{i},a{i}\n" for i in range(4)))
+    anki["down_after_chunks"] = 1
+    await import_notes(str(path))
+
+    path.write_text("Front,Back\n" + "".join(f"r{i},a{i}\n" for i in range(4)))
+    anki["down_after_chunks"] = None
+    result = await import_notes(str(path))
+
+    assert "Resumed" not in result[0].text
+    assert [note["fields"]["Front"] for note in anki["added"][3:]] == ["r0", "r1", "r2", "r3"]
+
+
+@pytest.mark.asyncio
+async def test_unwritable_checkpoint_is_reported(anki, monkeypatch, tmp_path):
+    """Test that a checkpoint that can't be written stops the import with the number of notes already added."""
+    blocked = tmp_path / "blocked"
+    blocked.write_text("")
+    monkeypatch.setattr(settings, "journal", blocked / "journal.jsonl")
+    path = tmp_path / "notes.csv"
+    path.write_text("Front,Back\n" + "".join(f"q{i},a{i}\n" for i in range(5)))
+
+    result = await import_notes(str(path))
+
+    text = result[0].text
+    assert text.startswith("Stopped importing notes.csv: could not write checkpoint")
+    assert "3 notes were already added" in text
+    assert "Failed to read" not in text
+    assert anki["chunks"] == [3]
+
+
+@pytest.mark.asyncio
+async def test_rows_longer_than_the_header(anki, tmp_path):
+    """Test that extra values of a row without a column are ignored."""
+    path = tmp_path / "notes.csv"
+    path.write_text("Front,Back\na,b,EXTRA\nc,d\n")
+
+    result = await import_notes(str(path))
+
+    assert "notes added: 2" in result[0].text
+    assert [note["fields"] for note in anki["added"]] == [{"Front": "a", "Back": "b"}, {"Front": "c", "Back": "d"}]
+
+
+@pytest.mark.asyncio
+async def test_unmatched_columns(anki, tmp_path):
+    """Test that a file without columns for the model's fields is rejected."""
+    path = tmp_path / "notes.csv"
+    path.write_text("word,meaning\nhola,hello\n")
+
+    result = await import_notes(str(path))
+
+    assert "No columns of notes.csv match the fields of model 'Basic' (Front, Back)" in result[0].text
+    assert anki["chunks"] == []
+
+
+@pytest.mark.asyncio
+async def test_unsupported_file_type(anki, tmp_path):
+    """Test that unknown file extensions are rejected."""
+    result = await import_notes(str(tmp_path / "notes.xlsx"))
+
+    assert "Unsupported file type '.xlsx'" in result[0].text
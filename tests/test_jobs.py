@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from anki_mcp.tools.jobs import CANCELLED, FAILED, SUCCEEDED, JobManager
+from anki_mcp.tools.progress import report_progress
+from anki_mcp.tools.scheduler import Priority, minimum_priority
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_background():
+    """Test that submitting returns at once and the job records its result."""
+    manager = JobManager()
+    release = asyncio.Event()
+
+    async def work(value):
+        await release.wait()
+        return value * 2
+
+    job = manager.submit("work", work, 21)
+    await asyncio.sleep(0)
+    assert job.status == "running"
+
+    release.set()
+    await job.task
+
+    assert job.status == SUCCEEDED
+    assert job.result == 42
+    assert manager.get(job.id) is job
+
+
+@pytest.mark.asyncio
+async def test_job_progress_and_priority():
+    """Test that jobs record reported progress and schedule their requests as bulk work."""
+    manager = JobManager()
+    seen = {}
+
+    async def work():
+        seen["priority"] = minimum_priority.get()
+        await report_progress(3, 10, "Processed 3 of 10")
+
+    job = manager.submit("work", work)
+    await job.task
+
+    assert seen["priority"] == Priority.BULK
+    assert (job.progress, job.total, job.message) == (3, 10, "Processed 3 of 10")
+    assert minimum_priority.get() == Priority.INTERACTIVE
+
+
+@pytest.mark.asyncio
+async def test_failed_job():
+    """Test that exceptions are recorded as the job's error."""
+    manager = JobManager()
+
+    async def work():
+        raise RuntimeError("Anki is closed")
+
+    job = manager.submit("work", work)
+    await job.task
+
+    assert job.status == FAILED
+    assert job.error == "Anki is closed"
+
+
+@pytest.mark.asyncio
+async def test_cancel_job():
+    """Test that running and queued jobs can be cancelled."""
+    manager = JobManager(max_running=1)
+
+    async def work():
+        await asyncio.sleep(60)
+
+    running = manager.submit("work", work)
+    queued = manager.submit("work", work)
+    await asyncio.sleep(0)
+    assert queued.status == "queued"
+
+    assert manager.cancel(queued.id)
+    assert manager.cancel(running.id)
+    await asyncio.gather(running.task, queued.task)
+
+    assert running.status == CANCELLED
+    assert queued.status == CANCELLED
+    assert not manager.cancel(running.id)
+
+
+@pytest.mark.asyncio
+async def test_running_jobs_are_limited():
+    """Test that at most max_running jobs run at once."""
+    manager = JobManager(max_running=2)
+    running = 0
+    peak = 0
+
+    async def work():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    submitted = [manager.submit("work", work) for _ in range(5)]
+    await asyncio.gather(*(job.task for job in submitted))
+
+    assert peak == 2
+    assert all(job.status == SUCCEEDED for job in submitted)
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_are_evicted():
+    """Test that only the most recent finished jobs are kept."""
+    manager = JobManager(max_finished=2)
+
+    async def work():
+        return None
+
+    submitted = []
+    for _ in range(4):
+        job = manager.submit("work", work)
+        await job.task
+        submitted.append(job)
+    manager.submit("work", work)
+
+    assert manager.get(submitted[0].id) is None
+    assert manager.get(submitted[1].id) is None
+    assert manager.get(submitted[3].id) is submitted[3]
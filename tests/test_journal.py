@@ -0,0 +1,56 @@
+from anki_mcp.tools import journal as journal_module
+from anki_mcp.tools.journal import WriteJournal
+
+
+def test_entries_survive_reload(tmp_path):
+    """Test that intents and completed writes are read back from the file."""
+    path = tmp_path / "journal.jsonl"
+    journal = WriteJournal(path)
+    journal.record_intent(["a", "b"])
+    journal.record_done("a", 1234, "added")
+
+    reloaded = WriteJournal(path)
+
+    assert reloaded.completed("a") == {"key": "a", "state": "done", "note_id": 1234, "action": "added"}
+    assert reloaded.completed("b") is None
+    assert reloaded.in_doubt("b")
+    assert not reloaded.in_doubt("c")
+
+
+def test_intent_not_recorded_for_completed_keys(tmp_path):
+    """Test that completed keys stay completed when submitted again."""
+    journal = WriteJournal(tmp_path / "journal.jsonl")
+    journal.record_done("a", 1, "added")
+
+    journal.record_intent(["a"])
+
+    assert journal.completed("a")["note_id"] == 1
+
+
+def test_corrupt_line_is_ignored(tmp_path):
+    """Test that a line cut off by a crash doesn't prevent loading the journal."""
+    path = tmp_path / "journal.jsonl"
+    path.write_text('{"key": "a", "state": "done", "note_id": 1, "action": "added"}\n{"key": "b", "sta')
+
+    journal = WriteJournal(path)
+
+    assert journal.completed("a")["note_id"] == 1
+    assert not journal.in_doubt("b")
+
+    journal.record_done("c", 3, "added")
+    assert WriteJournal(path).completed("c")["note_id"] == 3
+
+
+def test_journal_is_compacted(tmp_path, monkeypatch):
+    """Test that superseded entries are dropped when the journal is loaded."""
+    monkeypatch.setattr(journal_module, "COMPACT_MIN_LINES", 10)
+    path = tmp_path / "journal.jsonl"
+    journal = WriteJournal(path)
+    for i in range(10):
+        journal.record_intent([f"key-{i}"])
+        journal.record_done(f"key-{i}", i, "added")
+
+    reloaded = WriteJournal(path)
+
+    assert reloaded.completed("key-9")["note_id"] == 9
+    assert len(path.read_text().splitlines()) == 10
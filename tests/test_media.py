@@ -0,0 +1,99 @@
+import asyncio
+import base64
+import hashlib
+
+import pytest
+from anki_mcp.tools import media
+from anki_mcp.tools.config import settings
+from anki_mcp.tools.media import MediaFile, MediaManifest, store_media_files
+
+
+@pytest.fixture
+def anki(monkeypatch):
+    """Fake media folder, recording the requests sent."""
+    state = {"files": {"mcp-existing.png": b""}, "requests": [], "in_flight": 0, "max_in_flight": 0}
+
+    async def mock_anki_request(action, **kwargs):
+        state["requests"].append(action)
+        if action == "getMediaFilesNames":
+            assert kwargs["pattern"] == "mcp-*"
+            return {"success": True, "result": list(state["files"])}
+        assert action == "storeMediaFile"
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        state["files"][kwargs["filename"]] = base64.b64decode(kwargs["data"])
+        return {"success": True, "result": kwargs["filename"]}
+
+    monkeypatch.setattr("anki_mcp.tools.media.make_anki_request", mock_anki_request)
+    monkeypatch.setattr(media, "media_manifest", MediaManifest())
+    return state
+
+
+def _name(content: bytes, suffix: str) -> str:
+    return f"mcp-{hashlib.blake2b(content, digest_size=16).hexdigest()}{suffix}"
+
+
+@pytest.mark.asyncio
+async def test_store_media_names_files_by_content(anki, tmp_path):
+    """Test that files are named by content, so the same content is uploaded once."""
+    image = tmp_path / "Cat.PNG"
+    image.write_bytes(b"cat picture")
+    data = base64.b64encode(b"cat picture").decode()
+
+    results = await store_media_files([
+        MediaFile(path=str(image)),
+        MediaFile(data=data, filename="other.png"),
+        MediaFile(data=base64.b64encode(b"meow").decode(), filename="meow.mp3"),
+    ])
+
+    name = _name(b"cat picture", ".png")
+    assert [result.filename for result in results] == [name, name, _name(b"meow", ".mp3")]
+    assert [result.reference for result in results] == [
+        f'<img src="{name}">', f'<img src="{name}">', f"[sound:{_name(b'meow', '.mp3')}]",
+    ]
+    assert all(result.uploaded and result.error is None for result in results)
+    assert anki["files"][name] == b"cat picture"
+    assert anki["requests"] == ["getMediaFilesNames", "storeMediaFile", "storeMediaFile"]
+
+
+@pytest.mark.asyncio
+async def test_store_media_skips_files_in_the_manifest(anki):
+    """Test that the cached manifest skips files already stored, without listing them again."""
+    file = MediaFile(data=base64.b64encode(b"dog").decode(), filename="dog.jpg")
+
+    first = await store_media_files([file])
+    second = await store_media_files([file])
+
+    assert first[0].uploaded and not second[0].uploaded
+    assert second[0].error is None
+    assert anki["requests"] == ["getMediaFilesNames", "storeMediaFile"]
+
+
+@pytest.mark.asyncio
+async def test_store_media_bounds_parallel_uploads(anki, monkeypatch):
+    """Test that at most max_parallel_uploads files are uploaded at the same time."""
+    monkeypatch.setattr(settings, "max_parallel_uploads", 3)
+    files = [MediaFile(data=base64.b64encode(str(i).encode()).decode(), filename=f"{i}.png") for i in range(10)]
+
+    results = await store_media_files(files)
+
+    assert all(result.uploaded for result in results)
+    assert anki["max_in_flight"] == 3
+
+
+@pytest.mark.asyncio
+async def test_store_media_errors_are_per_file(anki, tmp_path):
+    """Test that a file that can't be read doesn't fail the others."""
+    results = await store_media_files([
+        MediaFile(path=str(tmp_path / "missing.png")),
+        MediaFile(data="not base64!"),
+        MediaFile(),
+        MediaFile(data=base64.b64encode(b"ok").decode(), filename="ok.gif"),
+    ])
+
+    assert results[0].error.startswith("could not read the file")
+    assert results[1].error == "data is not valid base64"
+    assert results[2].error == "provide either path or data"
+    assert results[3].error is None and results[3].uploaded
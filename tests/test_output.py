@@ -0,0 +1,168 @@
+import json
+
+import mcp.types as types
+import pytest
+from mcp.server.fastmcp.exceptions import ToolError
+
+from anki_mcp.server import app, register_tools
+from anki_mcp.tools import get_job_status as get_job_status_module
+from anki_mcp.tools import output
+from anki_mcp.tools.find_cards import find_cards
+from anki_mcp.tools.get_job_status import get_job_status
+from anki_mcp.tools.jobs import JobManager
+
+
+@pytest.fixture
+def json_mode():
+    output.set_output_format("json")
+    register_tools()
+    yield
+    output.set_output_format("text")
+    register_tools()
+
+
+def _structured(result):
+    assert isinstance(result, types.CallToolResult)
+    data = result.structuredContent
+    assert json.loads(result.content[0].text) == data
+    return data
+
+
+def test_structured_includes_json_text():
+    """Test that structured results carry the same data as compact JSON text."""
+    result = output.structured({"card_ids": [1, 2]})
+
+    assert result.structuredContent == {"card_ids": [1, 2]}
+    assert result.content[0].text == '{"card_ids":[1,2]}'
+
+
+def test_unknown_output_format():
+    """Test that unknown output formats are rejected."""
+    with pytest.raises(ValueError, match="Unknown output format"):
+        output.set_output_format("xml")
+
+
+@pytest.mark.asyncio
+async def test_failure_raises_in_json_mode(json_mode, monkeypatch):
+    """Test that failed calls raise instead of returning unstructured text."""
+    async def mock_anki_request(action, **kwargs):
+        return {"success": False, "error": "collection is not available"}
+
+    monkeypatch.setattr("anki_mcp.tools.find_cards.make_anki_request", mock_anki_request)
+
+    with pytest.raises(ToolError, match="Failed to find cards: collection is not available"):
+        await find_cards("deck:Test")
+
+
+@pytest.mark.asyncio
+async def test_every_tool_declares_output_schema(json_mode):
+    """Test that all tools declare the schema of their structured content in json mode."""
+    tools = await app.list_tools()
+
+    assert all(tool.outputSchema for tool in tools)
+    schemas = {tool.name: tool.outputSchema for tool in tools}
+    assert schemas["get-collection-overview"]["properties"].keys() >= {"decks", "models", "tags", "next_cursor"}
+    assert "job_id" in schemas["import-notes"]["properties"]
+
+
+@pytest.mark.asyncio
+async def test_find_cards_structured(json_mode, monkeypatch):
+    """Test that find-cards returns the IDs as structured content."""
+    async def mock_anki_request(action, **kwargs):
+        return {"success": True, "result": [3, 1, 2]}
+
+    monkeypatch.setattr("anki_mcp.tools.find_cards.make_anki_request", mock_anki_request)
+
+    data = _structured(await app.call_tool("find-cards", {"query": "deck:Test", "limit": 2}))
+
+    next_cursor = data.pop("next_cursor")
+    assert data == {"query": "deck:Test", "total": 3, "truncated": True, "card_ids": [3, 1]}
+    assert next_cursor
+
+
+@pytest.mark.asyncio
+async def test_review_stats_structured(json_mode, monkeypatch):
+    """Test that review stats are returned as days and a total."""
+    async def mock_anki_request(action, **kwargs):
+        return {"success": True, "result": [("2024-01-02", 5), ("2024-01-01", 3)]}
+
+    monkeypatch.setattr("anki_mcp.tools.get_review_stats.make_anki_request", mock_anki_request)
+
+    data = _structured(await app.call_tool("get-review-stats", {"time_range": "all"}))
+
+    assert data["total"] == 8
+    assert data["days"] == [{"date": "2024-01-02", "count": 5}, {"date": "2024-01-01", "count": 3}]
+
+
+@pytest.mark.asyncio
+async def test_collection_overview_structured(json_mode, monkeypatch):
+    """Test that the overview maps each model to its fields."""
+    responses = {
+        "deckNames": ["Default"],
+        "modelNames": ["Basic"],
+        "getTags": ["verb"],
+        "modelFieldNames": ["Front", "Back"],
+        "modelFieldDescriptions": ["", "Answer"],
+    }
+
+    async def mock_anki_request(action, **kwargs):
+        return {"success": True, "result": responses[action]}
+
+    monkeypatch.setattr("anki_mcp.tools.get_collection_overview.make_anki_request", mock_anki_request)
+
+    data = _structured(await app.call_tool("get-collection-overview", {}))
+
+    assert data == {
+        "decks": ["Default"],
+        "models": {"Basic": {"fields": ["Front", "Back"], "descriptions": ["", "Answer"]}},
+        "tags": ["verb"],
+        "tags_total": 1,
+        "more_tags": {},
+        "next_cursor": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_background_job_structured(json_mode, monkeypatch):
+    """Test that a background call returns its job ID, and the job status its structured result."""
+    manager = JobManager()
+    monkeypatch.setattr(get_job_status_module, "jobs", manager)
+    monkeypatch.setattr("anki_mcp.server.jobs", manager)
+
+    async def mock_anki_request(action, **kwargs):
+        return {"success": True, "result": True}
+
+    monkeypatch.setattr("anki_mcp.tools.suspend_cards.make_anki_request", mock_anki_request)
+
+    started = _structured(await app.call_tool("suspend-cards", {"card_ids": [1, 2], "background": True}))
+
+    job = manager.list()[0]
+    assert started == {"job_id": job.id}
+    await job.task
+
+    result = await get_job_status(job.id)
+    assert isinstance(result, types.CallToolResult)
+    status = result.structuredContent["jobs"][0]
+    assert status["status"] == "succeeded"
+    assert status["result"] == {"cards": 2, "changed": True}
+
+
+@pytest.mark.asyncio
+async def test_fan_out_structured(json_mode, monkeypatch):
+    """Test that a read-only tool run on several profiles returns the result of each."""
+    monkeypatch.setattr("anki_mcp.tools.backends.backend_urls", {"es": "http://es", "fr": "http://fr"})
+
+    async def mock_anki_request(action, **kwargs):
+        from anki_mcp.tools.backends import selected_backend
+        if selected_backend() == "fr":
+            return {"success": False, "error": "Anki is closed"}
+        return {"success": True, "result": [1, 2]}
+
+    monkeypatch.setattr("anki_mcp.tools.find_cards.make_anki_request", mock_anki_request)
+
+    data = _structured(await app.call_tool("find-cards", {"query": "deck:*", "profile": "*"}))
+
+    assert data["profiles"]["es"]["card_ids"] == [1, 2]
+    assert data["profile_errors"] == {"fr": "Failed to find cards: Anki is closed"}
+    schema = app._tool_manager.get_tool("find-cards").output_schema
+    assert "profiles" in schema["properties"]
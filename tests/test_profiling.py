@@ -0,0 +1,123 @@
+import asyncio
+import json
+import pstats
+
+import pytest
+from anki_mcp.profiling import ToolProfiler
+from anki_mcp.tools.metrics import metrics
+
+
+async def _slow_tool(query: str, limit: int = 20):
+    metrics.record_request("findNotes", 0.01, 10, 20)
+    with metrics.timed("find_notes.format"):
+        await asyncio.sleep(0.02)
+    return f"{query}:{limit}"
+
+
+def test_profiler_disabled_by_default():
+    """Test that profiling is off unless configured."""
+    assert not ToolProfiler().enabled
+
+
+@pytest.mark.asyncio
+async def test_profiler_dumps_profile_per_call(tmp_path):
+    """Test that every call writes a loadable cProfile dump."""
+    profiler = ToolProfiler()
+    profiler.configure(tmp_path)
+
+    result = await profiler.run("find-notes", _slow_tool, query="deck:Test")
+
+    assert result == "deck:Test:20"
+    dumps = list(tmp_path.glob("*-find-notes.prof"))
+    assert len(dumps) == 1
+    assert pstats.Stats(str(dumps[0])).total_calls > 0
+    assert not (tmp_path / "slow_calls.jsonl").exists()
+
+
+@pytest.mark.asyncio
+async def test_profiler_logs_slow_calls_with_breakdown(tmp_path):
+    """Test that calls above the threshold are logged with arguments and timings."""
+    profiler = ToolProfiler()
+    profiler.configure(tmp_path, slow_call_ms=1)
+
+    await profiler.run("find-notes", _slow_tool, query="deck:Test", limit=5)
+
+    entries = [json.loads(line) for line in (tmp_path / "slow_calls.jsonl").read_text().splitlines()]
+    assert len(entries) == 1
+    entry = entries[0]
+    assert entry["tool"] == "find-notes"
+    assert entry["threshold_ms"] == 1
+    assert entry["arguments"] == {"query": "deck:Test", "limit": 5}
+    assert entry["duration_ms"] >= 20
+    assert entry["breakdown_ms"]["anki_connect.request"] == 10
+    assert entry["breakdown_ms"]["find_notes.format"] >= 20
+    assert "other" in entry["breakdown_ms"]
+    assert entry["profile"].endswith("-find-notes.prof")
+
+
+@pytest.mark.asyncio
+async def test_profiler_skips_fast_calls(tmp_path):
+    """Test that calls below the threshold are not logged."""
+    profiler = ToolProfiler()
+    profiler.configure(tmp_path, slow_call_ms=60_000)
+
+    await profiler.run("find-notes", _slow_tool, query="deck:Test")
+
+    assert not (tmp_path / "slow_calls.jsonl").exists()
+
+
+@pytest.mark.asyncio
+async def test_profiler_logs_without_directory(caplog):
+    """Test that slow calls are logged when no profile directory is configured."""
+    profiler = ToolProfiler()
+    profiler.configure(slow_call_ms=1)
+
+    with caplog.at_level("WARNING", logger="anki_mcp.profiling"):
+        await profiler.run("find-notes", _slow_tool, query="x" * 500)
+
+    assert "Slow tool call" in caplog.text
+    assert "x" * 500 not in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_profiler_profiles_one_call_at_a_time(tmp_path):
+    """Test that overlapping calls do not fight over the profiler."""
+    profiler = ToolProfiler()
+    profiler.configure(tmp_path)
+
+    await asyncio.gather(*(profiler.run("find-notes", _slow_tool, query=str(i)) for i in range(3)))
+
+    assert len(list(tmp_path.glob("*.prof"))) == 1
+
+
+@pytest.mark.asyncio
+async def test_profiler_failures_do_not_replace_the_result(tmp_path, caplog):
+    """Test that a profile or log that can't be written doesn't change the call's outcome."""
+    profiler = ToolProfiler()
+    profiler.configure(tmp_path / "profiles", slow_call_ms=1)
+    (tmp_path / "profiles").rmdir()
+
+    async def failing_tool():
+        await asyncio.sleep(0.01)
+        raise ValueError("tool failed")
+
+    with caplog.at_level("ERROR", logger="anki_mcp.profiling"):
+        result = await profiler.run("find-notes", _slow_tool, query="deck:Test")
+        with pytest.raises(ValueError, match="tool failed"):
+            await profiler.run("find-notes", failing_tool)
+
+    assert result == "deck:Test:20"
+    assert "Could not write the profile of a find-notes call" in caplog.text
+    assert "Could not log a slow find-notes call" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_profiler_logs_arguments_that_are_not_json(tmp_path):
+    """Test that arguments JSON can't encode are logged as text."""
+    profiler = ToolProfiler()
+    profiler.configure(tmp_path, slow_call_ms=1)
+
+    await profiler.run("find-notes", _slow_tool, query="deck:Test", limit={5})
+
+    entry = json.loads((tmp_path / "slow_calls.jsonl").read_text())
+    assert entry["arguments"]["limit"] == "{5}"
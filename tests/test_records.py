@@ -0,0 +1,79 @@
+import json
+import tracemalloc
+
+from anki_mcp.testing.collection import FakeCollection, note_info
+from anki_mcp.tools.records import RECORD_DECODERS, CardInfo, NoteInfo, ReviewDay
+
+
+def test_note_from_anki():
+    """Test that notesInfo items are decoded with fields in field order."""
+    note = NoteInfo.from_anki({
+        "noteId": 1234,
+        "modelName": "Basic",
+        "tags": ["a", "b"],
+        "fields": {"Back": {"value": "answer", "order": 1}, "Front": {"value": "question", "order": 0}},
+        "mod": 1700000000,
+        "cards": [5678],
+    })
+
+    assert note == NoteInfo(1234, "Basic", ("Front", "Back"), ("question", "answer"), ("a", "b"), 1700000000, (5678,))
+    assert note.fields == {"Front": "question", "Back": "answer"}
+
+
+def test_missing_records_decode_to_none():
+    """Test that the empty dicts Anki Connect returns for unknown IDs become None."""
+    assert NoteInfo.from_anki({}) is None
+    assert CardInfo.from_anki({}) is None
+
+
+def test_field_names_are_shared():
+    """Test that notes of the same model share one field name tuple."""
+    data = {"noteId": 1, "modelName": "Basic", "tags": [], "mod": 0,
+            "fields": {"Front": {"value": "q", "order": 0}, "Back": {"value": "a", "order": 1}}}
+
+    first = NoteInfo.from_anki(json.loads(json.dumps(data)))
+    second = NoteInfo.from_anki(json.loads(json.dumps(data)))
+
+    assert first.field_names is second.field_names
+
+
+def test_card_from_anki():
+    """Test that cardsInfo items keep the scheduling state."""
+    card = CardInfo.from_anki({
+        "cardId": 1, "note": 2, "deckName": "Default", "modelName": "Basic", "question": "<div>q</div>",
+        "answer": "<div>a</div>", "ord": 0, "type": 2, "queue": -1, "due": 10, "interval": 3,
+        "factor": 2500, "reps": 7, "lapses": 1, "mod": 1700000000,
+    })
+
+    assert card.card_id == 1
+    assert card.note_id == 2
+    assert card.factor == 2500
+    assert card.suspended
+    assert not hasattr(card, "__dict__")
+
+
+def test_review_days():
+    """Test that review entries decode to (date, count) tuples."""
+    day = RECORD_DECODERS["getNumCardsReviewedByDay"](["2026-01-01", 12])
+
+    assert day == ReviewDay("2026-01-01", 12)
+    assert day.count == 12
+
+
+def test_notes_use_less_memory_than_dicts():
+    """Test that decoded notes take a fraction of the memory of Anki Connect's dicts."""
+    collection = FakeCollection.generate(2000)
+    body = json.dumps([note_info(note) for note in collection.notes.values()])
+
+    tracemalloc.start()
+    raw = json.loads(body)
+    raw_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    records = [NoteInfo.from_anki(item) for item in json.loads(body)]
+    record_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert len(records) == len(raw)
+    assert record_size * 2 < raw_size
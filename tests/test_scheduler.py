@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+from anki_mcp.tools.scheduler import Priority, RequestScheduler, current_client
+
+
+async def _run(scheduler, order, name, priority=Priority.INTERACTIVE, client="default", hold=None):
+    async with scheduler.slot(priority, client):
+        order.append(name)
+        if hold is not None:
+            await hold.wait()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_limits_in_flight_requests():
+    """Test that no more than max_in_flight requests run at once."""
+    scheduler = RequestScheduler(max_in_flight=2)
+    running = 0
+    peak = 0
+
+    async def request():
+        nonlocal running, peak
+        async with scheduler.slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(request() for _ in range(10)))
+
+    assert peak == 2
+    assert scheduler.stats()["granted"] == 10
+    assert scheduler.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_serves_interactive_before_bulk():
+    """Test that queued interactive requests are granted ahead of queued bulk requests."""
+    scheduler = RequestScheduler(max_in_flight=1)
+    order = []
+    hold = asyncio.Event()
+
+    blocker = asyncio.create_task(_run(scheduler, order, "blocker", hold=hold))
+    await asyncio.sleep(0)
+    bulk = asyncio.create_task(_run(scheduler, order, "bulk", Priority.BULK))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(_run(scheduler, order, "interactive"))
+    await asyncio.sleep(0)
+
+    hold.set()
+    await asyncio.gather(blocker, bulk, interactive)
+
+    assert order == ["blocker", "interactive", "bulk"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_round_robins_between_clients():
+    """Test that a client with many queued requests does not starve another client."""
+    scheduler = RequestScheduler(max_in_flight=1)
+    order = []
+    hold = asyncio.Event()
+
+    tasks = [asyncio.create_task(_run(scheduler, order, "blocker", hold=hold))]
+    await asyncio.sleep(0)
+    for i in range(3):
+        tasks.append(asyncio.create_task(_run(scheduler, order, f"a{i}", client="a")))
+        await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(_run(scheduler, order, "b0", client="b")))
+    await asyncio.sleep(0)
+
+    hold.set()
+    await asyncio.gather(*tasks)
+
+    assert order == ["blocker", "a0", "b0", "a1", "a2"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_uses_current_client():
+    """Test that the client defaults to the current_client context variable."""
+    scheduler = RequestScheduler(max_in_flight=1)
+    order = []
+    hold = asyncio.Event()
+
+    async def as_client(client, name):
+        current_client.set(client)
+        async with scheduler.slot():
+            order.append(name)
+
+    tasks = [asyncio.create_task(_run(scheduler, order, "blocker", hold=hold))]
+    await asyncio.sleep(0)
+    for name, client in [("a0", "a"), ("a1", "a"), ("b0", "b")]:
+        tasks.append(asyncio.create_task(as_client(client, name)))
+        await asyncio.sleep(0)
+
+    hold.set()
+    await asyncio.gather(*tasks)
+
+    assert order == ["blocker", "a0", "b0", "a1"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_cancelled_waiter_releases_queue():
+    """Test that cancelling a queued request removes it without leaking a slot."""
+    scheduler = RequestScheduler(max_in_flight=1)
+    order = []
+    hold = asyncio.Event()
+
+    blocker = asyncio.create_task(_run(scheduler, order, "blocker", hold=hold))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(_run(scheduler, order, "cancelled"))
+    await asyncio.sleep(0)
+    assert scheduler.stats()["queue_depth"] == 1
+
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert scheduler.stats()["queue_depth"] == 0
+
+    hold.set()
+    await blocker
+    await _run(scheduler, order, "after")
+
+    assert order == ["blocker", "after"]
+    assert scheduler.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_records_wait_metrics():
+    """Test that queue depth and wait times are tracked."""
+    scheduler = RequestScheduler(max_in_flight=1)
+
+    async def request():
+        async with scheduler.slot():
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(request() for _ in range(3)))
+
+    stats = scheduler.stats()
+    assert stats["max_queue_depth"] == 2
+    assert stats["max_wait_seconds"] >= 0.01
+    assert stats["average_wait_seconds"] > 0
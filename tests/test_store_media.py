@@ -0,0 +1,56 @@
+import base64
+import re
+
+import pytest
+from anki_mcp.tools import media
+from anki_mcp.tools.media import MediaFile, MediaManifest
+from anki_mcp.tools.store_media import store_media
+
+
+@pytest.fixture(autouse=True)
+def manifest(monkeypatch):
+    monkeypatch.setattr(media, "media_manifest", MediaManifest())
+
+
+@pytest.mark.asyncio
+async def test_store_media(monkeypatch):
+    """Test that stored files are listed with their references and failures."""
+    async def mock_anki_request(action, **kwargs):
+        if action == "getMediaFilesNames":
+            return {"success": True, "result": []}
+        return {"success": True, "result": kwargs["filename"]}
+
+    monkeypatch.setattr("anki_mcp.tools.media.make_anki_request", mock_anki_request)
+
+    result = await store_media([
+        MediaFile(data=base64.b64encode(b"woof").decode(), filename="dog.ogg"),
+        MediaFile(data=base64.b64encode(b"notes").decode(), filename="notes.txt"),
+        MediaFile(path="/nonexistent/cat.png"),
+    ])
+
+    lines = result[0].text.splitlines()
+    assert re.fullmatch(r"Uploaded dog\.ogg as (mcp-\w+\.ogg), referenced as \[sound:\1\]", lines[0])
+    assert lines[1].startswith("Uploaded notes.txt as mcp-") and "referenced" not in lines[1]
+    assert lines[2].startswith("Failed to store /nonexistent/cat.png: could not read the file")
+
+
+@pytest.mark.asyncio
+async def test_store_media_manifest_failure(monkeypatch):
+    """Test that files aren't uploaded when the media folder can't be listed."""
+    async def mock_anki_request(action, **kwargs):
+        assert action == "getMediaFilesNames"
+        return {"success": False, "error": "Anki is busy"}
+
+    monkeypatch.setattr("anki_mcp.tools.media.make_anki_request", mock_anki_request)
+
+    result = await store_media([MediaFile(data=base64.b64encode(b"x").decode(), filename="x.png")])
+
+    assert result[0].text == "Failed to store x.png: could not list the media files: Anki is busy"
+
+
+@pytest.mark.asyncio
+async def test_store_media_no_files():
+    """Test that an empty request is rejected."""
+    result = await store_media([])
+
+    assert result[0].text == "No files provided. Please specify at least one file to store."
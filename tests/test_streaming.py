@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from anki_mcp.tools.streaming import ResultStreamDecoder
+
+
+def decode(chunks):
+    decoder = ResultStreamDecoder()
+    items = []
+    for chunk in chunks:
+        items.extend(decoder.feed(chunk))
+    items.extend(decoder.close())
+    return items, decoder
+
+
+def test_decodes_result_items():
+    """Test that the items of the result array are returned in order."""
+    body = json.dumps({"result": [{"noteId": 1}, {"noteId": 2}], "error": None}).encode()
+
+    items, decoder = decode([body])
+
+    assert items == [{"noteId": 1}, {"noteId": 2}]
+    assert decoder.error is None
+
+
+def test_items_split_across_chunks():
+    """Test every possible split point, including inside numbers and multi-byte characters."""
+    result = [1234, -5.5e3, "naïve ☃", {"fields": {"Front": {"value": "[1, 2]"}}}, [], True, None, 10]
+    body = json.dumps({"result": result, "error": None}, ensure_ascii=False).encode()
+
+    for split in range(1, len(body)):
+        items, _ = decode([body[:split], body[split:]])
+        assert items == result, split
+
+    items, _ = decode([body[i:i + 1] for i in range(len(body))])
+    assert items == result
+
+
+def test_items_returned_before_response_is_complete():
+    """Test that complete items are returned without waiting for the rest."""
+    decoder = ResultStreamDecoder()
+
+    assert decoder.feed(b'{"result": [{"a": 1}, {"b"') == [{"a": 1}]
+    assert decoder.feed(b': 2}]') == [{"b": 2}]
+    assert decoder.feed(b', "error": null}') == []
+    assert decoder.close() == []
+
+
+def test_error_response():
+    """Test that the error of a failed request is recorded."""
+    items, decoder = decode([b'{"result": null, "error": "collection is not available"}'])
+
+    assert items == []
+    assert decoder.result is None
+    assert decoder.error == "collection is not available"
+
+
+def test_non_list_result():
+    """Test that a result that isn't an array is kept instead of yielded."""
+    items, decoder = decode([b'{"error": null, "result": 6}'])
+
+    assert items == []
+    assert decoder.result == 6
+
+
+def test_truncated_response():
+    """Test that a response cut off mid-way is reported."""
+    decoder = ResultStreamDecoder()
+    decoder.feed(b'{"result": [1, 2')
+
+    with pytest.raises(ValueError):
+        decoder.close()
+
+
+def test_not_an_object():
+    """Test that a response that isn't a JSON object is rejected."""
+    with pytest.raises(ValueError):
+        ResultStreamDecoder().feed(b"<html>")
@@ -0,0 +1,100 @@
+import pytest
+from anki_mcp.tools.config import settings
+from anki_mcp.tools.tag_notes import add_tags, remove_tags, rename_tag
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    requests = []
+
+    async def mock_anki_request(action, **kwargs):
+        requests.append((action, kwargs))
+        if action == "findNotes":
+            return {"success": True, "result": [1, 2, 3]}
+        if action == "getTags":
+            return {"success": True, "result": ["Lang", "lang::es", "lang::es::verbs", "language", "todo"]}
+        return {"success": True, "result": None}
+
+    monkeypatch.setattr("anki_mcp.tools.tag_notes.make_anki_request", mock_anki_request)
+    return requests
+
+
+@pytest.mark.asyncio
+async def test_add_tags_by_query_in_chunks(requests, monkeypatch):
+    """Test that the notes matching a query are tagged in chunks."""
+    monkeypatch.setattr(settings, "tag_batch_size", 2)
+
+    result = await add_tags(["lang::es", "todo"], query="deck:Spanish")
+
+    assert result[0].text == "Added lang::es, todo to 3 note(s)."
+    assert requests == [
+        ("findNotes", {"query": "deck:Spanish"}),
+        ("addTags", {"notes": [1, 2], "tags": "lang::es todo"}),
+        ("addTags", {"notes": [3], "tags": "lang::es todo"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_remove_tags_by_id(requests):
+    """Test removing tags from notes given by ID."""
+    result = await remove_tags(["todo"], note_ids=[5, 6])
+
+    assert result[0].text == "Removed todo from 2 note(s)."
+    assert requests == [("removeTags", {"notes": [5, 6], "tags": "todo"})]
+
+
+@pytest.mark.asyncio
+async def test_tag_notes_validation(requests):
+    """Test that the selection and the tags are checked before any request."""
+    result = await add_tags(["todo"])
+    assert result[0].text == "Provide either note_ids or query."
+
+    result = await add_tags(["todo"], note_ids=[1], query="deck:*")
+    assert result[0].text == "Provide either note_ids or query."
+
+    result = await add_tags(["two words"], note_ids=[1])
+    assert "Invalid tags: 'two words'" in result[0].text
+
+    result = await remove_tags([], note_ids=[1])
+    assert "No tags provided" in result[0].text
+    assert requests == []
+
+
+@pytest.mark.asyncio
+async def test_add_tags_failure(monkeypatch):
+    """Test that a failed chunk is reported with how far it got."""
+    async def mock_anki_request(action, **kwargs):
+        if kwargs["notes"][0] == 3:
+            return {"success": False, "error": "collection is locked"}
+        return {"success": True, "result": None}
+
+    monkeypatch.setattr("anki_mcp.tools.tag_notes.make_anki_request", mock_anki_request)
+    monkeypatch.setattr(settings, "tag_batch_size", 2)
+
+    result = await add_tags(["todo"], note_ids=[1, 2, 3])
+
+    assert result[0].text == "Failed to add tags after 2 of 3 notes: collection is locked"
+
+
+@pytest.mark.asyncio
+async def test_rename_tag_with_subtags(requests):
+    """Test that a tag is renamed with its subtags, ignoring case, but not tags it is a prefix of."""
+    result = await rename_tag("lang", "language", query="deck:Spanish")
+
+    assert result[0].text == "Renamed tag 'lang' to 'language' on 3 note(s), with 2 subtag(s)."
+    assert requests == [
+        ("getTags", {}),
+        ("findNotes", {"query": '"tag:lang" (deck:Spanish)'}),
+        ("replaceTags", {"notes": [1, 2, 3], "tag_to_replace": "Lang", "replace_with_tag": "language"}),
+        ("replaceTags", {"notes": [1, 2, 3], "tag_to_replace": "lang::es", "replace_with_tag": "language::es"}),
+        ("replaceTags", {"notes": [1, 2, 3], "tag_to_replace": "lang::es::verbs", "replace_with_tag": "language::es::verbs"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rename_tag_not_found(requests):
+    """Test renaming a tag that doesn't exist."""
+    result = await rename_tag("missing", "other")
+
+    assert result[0].text == "Tag not found: 'missing'"
+    assert requests == [("getTags", {})]
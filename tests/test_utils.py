@@ -0,0 +1,264 @@
+import asyncio
+import json
+from contextlib import aclosing
+
+import httpx
+import pytest
+from anki_mcp.tools import utils
+from anki_mcp.tools.circuit_breaker import CircuitBreaker
+from anki_mcp.tools.config import settings
+from anki_mcp.tools.scheduler import RequestScheduler
+from anki_mcp.tools.utils import AnkiConnectError, make_anki_request, stream_anki_request
+
+
+@pytest.fixture
+def anki_connect(monkeypatch):
+    """Serve Anki Connect requests from a handler instead of the network."""
+    calls = []
+    responses = {}
+
+    async def handler(request):
+        body = json.loads(request.content)
+        calls.append(body)
+        await asyncio.sleep(0.01)
+        action = body["action"]
+        response = responses.get(action, {"result": action, "error": None})
+        if isinstance(response, list):
+            # A sequence of responses, one per attempt
+            response = response.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        if isinstance(response, httpx.Response):
+            return response
+        return httpx.Response(200, json=response)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(utils, "_connections", {})
+    monkeypatch.setattr(utils.connection(), "client", lambda: client)
+    monkeypatch.setattr(settings, "backoff_base", 0)
+    return calls, responses
+
+
+@pytest.mark.asyncio
+async def test_make_anki_request_success(anki_connect):
+    """Test a successful request returns the result."""
+    calls, _ = anki_connect
+
+    result = await make_anki_request("findCards", query="deck:Test")
+
+    assert result == {"success": True, "result": "findCards"}
+    assert calls == [{"action": "findCards", "version": 6, "params": {"query": "deck:Test"}}]
+
+
+@pytest.mark.asyncio
+async def test_make_anki_request_anki_error(anki_connect):
+    """Test that Anki Connect errors are reported as failures."""
+    _, responses = anki_connect
+    responses["addNote"] = {"result": None, "error": "cannot create note because it is a duplicate"}
+
+    result = await make_anki_request("addNote", note={})
+
+    assert result == {"success": False, "error": "cannot create note because it is a duplicate"}
+
+
+@pytest.mark.asyncio
+async def test_identical_reads_are_coalesced(anki_connect):
+    """Test that concurrent identical read requests share one HTTP request."""
+    calls, _ = anki_connect
+
+    results = await asyncio.gather(*(make_anki_request("deckNames") for _ in range(5)))
+
+    assert len(calls) == 1
+    assert all(result == {"success": True, "result": "deckNames"} for result in results)
+
+
+@pytest.mark.asyncio
+async def test_reads_with_different_params_are_not_coalesced(anki_connect):
+    """Test that reads only coalesce when their params match."""
+    calls, _ = anki_connect
+
+    await asyncio.gather(
+        make_anki_request("findCards", query="deck:A"),
+        make_anki_request("findCards", query="deck:B"),
+        make_anki_request("findCards", query="deck:A"),
+    )
+
+    assert sorted(call["params"]["query"] for call in calls) == ["deck:A", "deck:B"]
+
+
+@pytest.mark.asyncio
+async def test_writes_are_never_coalesced(anki_connect):
+    """Test that identical concurrent write requests are all sent."""
+    calls, _ = anki_connect
+
+    await asyncio.gather(*(make_anki_request("suspend", cards=[1]) for _ in range(3)))
+
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_sequential_reads_are_not_cached(anki_connect):
+    """Test that a read issued after the previous one finished is sent again."""
+    calls, _ = anki_connect
+
+    await make_anki_request("deckNames")
+    await make_anki_request("deckNames")
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_read(anki_connect):
+    """Test that cancelling one caller leaves the shared request running for the others."""
+    calls, _ = anki_connect
+
+    first = asyncio.create_task(make_anki_request("modelNames"))
+    second = asyncio.create_task(make_anki_request("modelNames"))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == {"success": True, "result": "modelNames"}
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_read_retried_after_transient_error(anki_connect):
+    """Test that reads are retried after a timeout."""
+    calls, responses = anki_connect
+    responses["deckNames"] = [httpx.ReadTimeout("timed out"), {"result": ["Default"], "error": None}]
+
+    result = await make_anki_request("deckNames")
+
+    assert result == {"success": True, "result": ["Default"]}
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_read_gives_up_after_retry_attempts(anki_connect):
+    """Test that a read fails once all attempts are used up."""
+    calls, responses = anki_connect
+    responses["deckNames"] = [httpx.ReadTimeout("timed out")] * settings.retry_attempts
+
+    result = await make_anki_request("deckNames")
+
+    assert result == {"success": False, "error": "timed out"}
+    assert len(calls) == settings.retry_attempts
+
+
+@pytest.mark.asyncio
+async def test_write_not_retried_after_read_timeout(anki_connect):
+    """Test that writes are not retried once Anki may have received them."""
+    calls, responses = anki_connect
+    responses["addNote"] = [httpx.ReadTimeout("timed out"), {"result": 1, "error": None}]
+
+    result = await make_anki_request("addNote", note={})
+
+    assert result["success"] is False
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_write_retried_after_connect_error(anki_connect):
+    """Test that writes are retried when the connection could not be established."""
+    calls, responses = anki_connect
+    responses["addNote"] = [httpx.ConnectError("connection refused"), {"result": 1, "error": None}]
+
+    result = await make_anki_request("addNote", note={})
+
+    assert result == {"success": True, "result": 1}
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast(anki_connect, monkeypatch):
+    """Test that requests fail without contacting Anki Connect while it is down."""
+    calls, responses = anki_connect
+    monkeypatch.setattr(utils.connection(), "breaker", CircuitBreaker(failure_threshold=2, recovery_timeout=60))
+    responses["deckNames"] = [httpx.ConnectError("connection refused")] * 2
+
+    first = await make_anki_request("deckNames")
+    second = await make_anki_request("deckNames")
+
+    assert first == {"success": False, "error": "connection refused"}
+    assert second["success"] is False
+    assert "Anki Connect is unavailable" in second["error"]
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_anki_request_yields_items(anki_connect):
+    """Test that streamed requests yield the items of the result."""
+    calls, responses = anki_connect
+    responses["findCards"] = {"result": [1, 2], "error": None}
+
+    items = [item async for item in stream_anki_request("findCards", query="deck:Test")]
+
+    assert items == [1, 2]
+    assert calls == [{"action": "findCards", "version": 6, "params": {"query": "deck:Test"}}]
+
+
+@pytest.mark.asyncio
+async def test_stream_anki_request_error(anki_connect):
+    """Test that Anki Connect errors are raised from streamed requests."""
+    _, responses = anki_connect
+    responses["notesInfo"] = {"result": None, "error": "invalid search"}
+
+    with pytest.raises(AnkiConnectError, match="invalid search"):
+        [item async for item in stream_anki_request("notesInfo", query="(")]
+
+
+@pytest.mark.asyncio
+async def test_stream_anki_request_retried_before_first_item(anki_connect):
+    """Test that streamed reads are retried after transient errors."""
+    calls, responses = anki_connect
+    responses["findCards"] = [httpx.ReadError("connection reset"), {"result": [1], "error": None}]
+
+    items = [item async for item in stream_anki_request("findCards", query="deck:Test")]
+
+    assert items == [1]
+    assert len(calls) == 2
+
+
+class _DroppedStream(httpx.AsyncByteStream):
+    """A response body cut off after its first bytes."""
+
+    async def __aiter__(self):
+        yield b'{"result": [1, '
+        raise httpx.ReadError("connection reset")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("response", [
+    httpx.Response(500, text="Internal Server Error"),
+    httpx.Response(200, stream=_DroppedStream()),
+], ids=["server-error", "dropped"])
+async def test_stream_anki_request_success_needs_full_response(anki_connect, monkeypatch, response):
+    """Test that a streamed request only counts as a success for the circuit breaker once read in full."""
+    _, responses = anki_connect
+    successes = []
+    monkeypatch.setattr(utils.connection().breaker, "record_success", lambda: successes.append(True))
+    monkeypatch.setattr(settings, "retry_attempts", 1)
+    responses["findCards"] = [response, {"result": [1, 2], "error": None}]
+
+    with pytest.raises(AnkiConnectError):
+        [item async for item in stream_anki_request("findCards", query="deck:Test")]
+    assert successes == []
+
+    assert [item async for item in stream_anki_request("findCards", query="deck:Test")] == [1, 2]
+    assert successes == [True]
+
+
+@pytest.mark.asyncio
+async def test_stream_anki_request_releases_slot_when_closed_early(anki_connect, monkeypatch):
+    """Test that closing a stream early frees its scheduler slot."""
+    _, responses = anki_connect
+    scheduler = RequestScheduler(max_in_flight=1)
+    monkeypatch.setattr(utils.connection(), "scheduler", scheduler)
+    responses["findCards"] = {"result": list(range(100)), "error": None}
+
+    async with aclosing(stream_anki_request("findCards", query="deck:Test")) as stream:
+        async for item in stream:
+            assert scheduler.stats()["in_flight"] == 1
+            break
+
+    assert scheduler.stats()["in_flight"] == 0